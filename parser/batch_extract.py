@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Извлечение цены из текстов карточек по одним правилам для всех парсеров.
+
+Пробелы (включая неразрывные и узкие) трактуются одинаково, поэтому
+"от 53 900 руб." и "53900₽" дают одну и ту же цену. extract_price_info
+возвращает цену вместе с признаком "от" и валютой; price_infos и
+prices_or_none разбирают колонку текстов: каждая уникальная строка -
+один раз, повторы берутся из словаря.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# \s в str-регулярках покрывает и неразрывные (U+00A0), и узкие (U+202F) пробелы.
+# Поиск якорится на цифре, а "от" проверяется lookbehind'ом: так regex не
+# примеряет необязательную группу в каждой позиции строки.
+PRICE_PATTERN = (
+    r'(?=\d)(?P<price_from>(?<=[оО]т\s)|(?<=[оО]т))?'
+    r'(?P<amount>\d{1,3}(?:\s\d{3})+|\d+)'
+    r'\s*(?P<currency>[рР]уб|₽|[рР]\.)'
+)
+
+_price_re = re.compile(PRICE_PATTERN)
+_spaces_re = re.compile(r'\s+')
+
+# Все варианты записи ("руб", "₽", "р.") - рубли
+CURRENCY = 'RUB'
+
+PriceInfo = Tuple[Optional[int], bool, Optional[str]]
+NO_PRICE: PriceInfo = (None, False, None)
+
+
+def extract_price_info(text: str) -> PriceInfo:
+    """
+    Цена из одной строки: (цена, признак "от", валюта).
+    Если цены в тексте нет - (None, False, None).
+    """
+    if not text:
+        return NO_PRICE
+    match = _price_re.search(text)
+    if not match:
+        return NO_PRICE
+    return (int(_spaces_re.sub('', match.group('amount'))),
+            match.group('price_from') is not None,
+            CURRENCY)
+
+
+def extract_price(text: str) -> Optional[int]:
+    """Цена из одной строки (None, если цены в тексте нет)"""
+    return extract_price_info(text)[0]
+
+
+def price_infos(texts: Iterable) -> List[PriceInfo]:
+    """
+    Колонка (цена, "от", валюта) для записи обратно в словари:
+    каждая уникальная строка разбирается один раз, повторы берутся из словаря.
+    """
+    parsed: Dict[str, PriceInfo] = {}
+    infos = []
+    for text in texts:
+        if not isinstance(text, str):
+            infos.append(NO_PRICE)
+            continue
+        if text not in parsed:
+            parsed[text] = extract_price_info(text)
+        infos.append(parsed[text])
+    return infos
+
+
+def prices_or_none(texts: Iterable) -> list:
+    """Колонка цен в виде списка int/None (см. price_infos)"""
+    return [price for price, _, _ in price_infos(texts)]
+
+
+def _benchmark(texts: list, repeat: int = 50):
+    import time
+
+    legacy_re = re.compile(r'(\d+[\s\d]*)\s*руб')
+
+    def legacy(items):
+        result = []
+        for text in items:
+            match = legacy_re.search(text.replace(' ', '')) if text else None
+            result.append(int(match.group(1).replace(' ', '')) if match else None)
+        return result
+
+    timings = {}
+    for name, fn in (('цикл re.search', lambda: legacy(texts)),
+                     ('prices_or_none', lambda: prices_or_none(texts))):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return timings
+
+
+if __name__ == '__main__':
+    import glob
+    import json
+    import sys
+
+    # Замер на реальных выгрузках как есть, без размножения строк
+    files = sys.argv[1:] or sorted(glob.glob('labirint_*.json'))
+    texts = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.extend(d.get('name') or '' for d in json.load(f))
+    if not texts:
+        print("❌ Нет данных: укажите labirint_*.json")
+        sys.exit(1)
+
+    print(f"📄 Файлов: {len(files)}, строк: {len(texts)}, уникальных: {len(set(texts))}\n")
+    for name, seconds in _benchmark(texts).items():
+        print(f"   {name:16s} {seconds * 1e6:8.1f} µs")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение обычного и облегченного (lean) Chrome на страницах каталога.
+
+Для каждого режима: время driver.get, loadEventEnd из Navigation Timing,
+число запросов и переданные байты (performance API), а также суммарная
+память (RSS) всех процессов Chrome. Для RSS нужен psutil.
+
+    python bench_browser.py
+    python bench_browser.py https://labirintdoors.ru/katalog2 --runs 5
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from browser import create_driver
+
+
+DEFAULT_URLS = ['https://labirintdoors.ru/katalog2']
+
+METRICS_JS = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = resources.reduce(function (sum, r) { return sum + (r.transferSize || 0); },
+                             nav.transferSize || 0);
+return {load_ms: nav.loadEventEnd || 0, requests: resources.length + 1, bytes: bytes};
+"""
+
+
+def chrome_rss(driver) -> Optional[int]:
+    """RSS chromedriver и всех дочерних процессов Chrome, байт"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.Error, AttributeError):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def measure(urls: List[str], lean: bool, runs: int) -> Dict:
+    driver = create_driver(lean=lean)
+    try:
+        samples = []
+        for _ in range(runs):
+            for url in urls:
+                # Пустая страница между замерами, чтобы не мерить навигацию по кэшу bfcache
+                driver.get('about:blank')
+                start = time.perf_counter()
+                driver.get(url)
+                wall_ms = (time.perf_counter() - start) * 1000
+                metrics = driver.execute_script(METRICS_JS)
+                metrics['wall_ms'] = wall_ms
+                samples.append(metrics)
+        rss = chrome_rss(driver)
+    finally:
+        driver.quit()
+
+    return {
+        'wall_ms': statistics.median(s['wall_ms'] for s in samples),
+        'load_ms': statistics.median(s['load_ms'] for s in samples),
+        'requests': statistics.median(s['requests'] for s in samples),
+        'bytes': statistics.median(s['bytes'] for s in samples),
+        'rss': rss,
+    }
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Обычный Chrome против lean-режима")
+    argparser.add_argument('urls', nargs='*', default=DEFAULT_URLS)
+    argparser.add_argument('--runs', type=int, default=3, help="повторов на страницу (медиана)")
+    args = argparser.parse_args()
+
+    print(f"🌐 Страниц: {len(args.urls)}, повторов: {args.runs}\n")
+    results = {}
+    for name, lean in (('обычный', False), ('lean', True)):
+        print(f"⏳ {name}...")
+        results[name] = measure(args.urls, lean, args.runs)
+
+    print(f"\n{'режим':10s} {'get, ms':>9s} {'load, ms':>9s} {'запросов':>9s} {'KB':>9s} {'RSS, MB':>9s}")
+    for name, r in results.items():
+        rss = f"{r['rss'] / 1024 / 1024:9.0f}" if r['rss'] is not None else f"{'-':>9s}"
+        print(f"{name:10s} {r['wall_ms']:9.0f} {r['load_ms']:9.0f} {r['requests']:9.0f} "
+              f"{r['bytes'] / 1024:9.0f} {rss}")
+    if results['обычный']['rss'] is None:
+        print("\n💡 Для замера памяти: pip install psutil")
+
+
+if __name__ == '__main__':
+    main()
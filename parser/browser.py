@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Запуск headless Chrome с общими для всех парсеров настройками.
+
+Облегченный режим (lean=True) не загружает картинки, видео, шрифты и
+сторонние скрипты (аналитика, виджеты): картинки отключаются настройкой
+профиля, остальное блокируется через CDP Network.setBlockedURLs. Атрибуты
+src / data-src в DOM остаются, фото потом скачиваются через requests.
+Сравнение времени загрузки и памяти Chrome: python bench_browser.py
+"""
+
+from typing import Iterable, Optional
+
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+                      'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0 Safari/537.36')
+PAGE_LOAD_TIMEOUT = 30
+
+# Блокировка по шаблонам URL (* - любая подстрока). Расширение якорится на
+# конце адреса или на query-строке: '*.jpg' и '*.jpg?*' ловят x.jpg и
+# x.jpg?v=2, но не /static/.jpgs/ или /icons.icon-set/
+MEDIA_EXTENSIONS = ['mp4', 'webm', 'ogg', 'mp3']
+FONT_EXTENSIONS = ['woff', 'woff2', 'ttf', 'otf', 'eot']
+# Картинки - на случай, если настройка профиля не сработала для CSS
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico']
+BLOCKED_RESOURCES = [pattern for ext in MEDIA_EXTENSIONS + FONT_EXTENSIONS + IMAGE_EXTENSIONS
+                     for pattern in (f'*.{ext}', f'*.{ext}?*')]
+BLOCKED_HOSTS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*mc.yandex.ru*', '*an.yandex.ru*', '*yandex.ru/metrika*', '*top-fwz1.mail.ru*',
+    '*vk.com*', '*facebook.net*', '*connect.facebook*',
+    '*jivosite.com*', '*jivo.ru*', '*callibri.ru*', '*calltouch.ru*', '*bitrix24*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+]
+
+
+def chrome_options(headless: bool = True, user_agent: Optional[str] = DEFAULT_USER_AGENT,
+                   extra_args: Iterable[str] = (), lean: bool = False):
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    if user_agent:
+        options.add_argument(f'--user-agent={user_agent}')
+    if lean:
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+    for arg in extra_args:
+        options.add_argument(arg)
+    return options
+
+
+def block_resources(driver, patterns: Iterable[str] = None):
+    """Блокировка запросов по шаблонам URL через Chrome DevTools Protocol"""
+    patterns = list(patterns) if patterns is not None else BLOCKED_RESOURCES + BLOCKED_HOSTS
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def create_driver(headless: bool = True, user_agent: Optional[str] = DEFAULT_USER_AGENT,
+                  extra_args: Iterable[str] = (), page_load_timeout: int = PAGE_LOAD_TIMEOUT,
+                  lean: bool = False):
+    """Новый Chrome; зависшая страница обрывается через page_load_timeout секунд"""
+    from selenium import webdriver
+
+    driver = webdriver.Chrome(options=chrome_options(headless, user_agent, extra_args, lean))
+    driver.set_page_load_timeout(page_load_timeout)
+    if lean:
+        block_resources(driver)
+    return driver
+
+
+def add_browser_arguments(argparser):
+    """Общий флаг --lean для скриптов на Selenium"""
+    argparser.add_argument(
+        '--lean', action='store_true',
+        help="облегченный Chrome: без картинок, шрифтов, медиа и сторонних скриптов",
+    )
+    return argparser
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Генерация src/catalogData.js для сайта.
+
+Значения сериализуются через json.dumps, поэтому кавычки, обратные слэши
+и переводы строк в названиях не ломают модуль. Фронтенду уходят только
+поля, которые читает src/Catalog.jsx (FRONTEND_FIELDS).
+
+Два режима:
+- один модуль (по умолчанию): catalogData.doors - все двери
+- split=True: catalogData.js - маленький индекс (категории, число дверей
+  и первые preview дверей для стартового экрана "Все"), двери каждой
+  категории - отдельный модуль в src/catalogData-chunks/, который Vite
+  выносит в свой чанк и грузит только при открытии категории
+
+В обоих режимах модуль экспортирует loadCategory(id, {all}) -> Promise<двери>,
+так что Catalog.jsx не зависит от режима. loadCategory('all') при split
+отдает только первые двери из индекса, без загрузки чанков; все чанки
+грузятся по {all: true} (кнопка "Показать все"). minify=True - без отступов.
+
+    write_catalog(doors, split=True, minify=True)
+
+Двери пишутся по одной (CatalogWriter.add), файлы заменяются атомарно
+при close() - Vite не подхватит недописанный модуль.
+"""
+
+import argparse
+import json
+import os
+import re
+import textwrap
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from categories import CATALOG_CATEGORIES, category_id
+
+
+DEFAULT_JS_PATH = Path(__file__).resolve().parent.parent / 'src' / 'catalogData.js'
+CHUNKS_SUFFIX = '-chunks'
+OTHER_CHUNK = 'other'
+# Сколько дверей индекс split-режима отдает на стартовый экран "Все"
+DEFAULT_PREVIEW = 12
+
+# Поля двери, которые читает фронтенд (src/Catalog.jsx)
+FRONTEND_FIELDS = ('id', 'name', 'category', 'price', 'image', 'srcSet', 'srcSetAvif', 'features',
+                   'acoustic', 'size', 'material', 'popular', 'new')
+
+SINGLE_LOADER = """
+export function loadCategory(id, options = {}) {
+  const doors = id === 'all' ? catalogData.doors : catalogData.doors.filter((door) => door.category === id);
+  return Promise.resolve(doors);
+}
+"""
+
+SPLIT_LOADER = """
+export function loadCategory(id, { all = false } = {}) {
+  // Стартовый экран "Все" - первые двери из индекса, чанки не грузятся
+  if (id === 'all' && !all) return Promise.resolve(catalogData.doors);
+  const ids = id === 'all' ? Object.keys(chunks) : [id].filter((key) => chunks[key]);
+  return Promise.all(ids.map((key) => chunks[key]().then((module) => module.default)))
+    .then((parts) => parts.flat());
+}
+"""
+
+
+def frontend_door(record: Dict, default_id: int) -> Dict:
+    """Запись двери -> объект для фронтенда (категория - id, пустые поля опускаются)"""
+    door = {field: record[field] for field in FRONTEND_FIELDS if record.get(field) is not None}
+    door.setdefault('id', default_id)
+    if 'category' in door:
+        door['category'] = category_id(door['category'])
+    return door
+
+
+def chunk_name(category: Optional[str]) -> str:
+    """Имя модуля категории: только безопасные для пути и import() символы"""
+    return re.sub(r'[^A-Za-z0-9_-]', '_', category) if category else OTHER_CHUNK
+
+
+class _Module:
+    """JS-модуль, который пишется во временный файл и заменяет старый при commit()"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp = path.with_name(path.name + '.tmp')
+        self.file = open(self.tmp, 'w', encoding='utf-8')
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.tmp, self.path)
+
+    def discard(self):
+        self.file.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+class CatalogWriter:
+    """
+    Потоковая запись catalogData.js.
+    path - файл модуля (индекса при split)
+    header - комментарий в начале файла
+    preview - сколько первых дверей split-индекс кладет в catalogData.doors
+    """
+
+    def __init__(self, path=DEFAULT_JS_PATH, split: bool = False, minify: bool = False,
+                 header: str = "Данные с labirintdoors.ru", preview: int = DEFAULT_PREVIEW):
+        self.path = Path(path)
+        self.split = split
+        self.minify = minify
+        self.header = header
+        self.preview = preview
+        self._preview: List[Dict] = []
+        self.chunks_dir = self.path.with_name(self.path.stem + CHUNKS_SUFFIX)
+        self.count = 0
+        self.counts: Dict[str, int] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._chunks: Dict[str, _Module] = {}
+        self._index = _Module(self.path)
+        if not split:
+            self._index.file.write(self._preamble() + "export const catalogData = {"
+                                   + self._nl(1) + "categories: " + self._dumps(self._categories(), 1)
+                                   + "," + self._nl(1) + "doors: [")
+
+    def _dumps(self, value, level: int = 0) -> str:
+        if self.minify:
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+        text = json.dumps(value, ensure_ascii=False, indent=2, default=str)
+        return textwrap.indent(text, '  ' * level)[2 * level:]
+
+    def _nl(self, level: int) -> str:
+        return '' if self.minify else '\n' + '  ' * level
+
+    def _preamble(self) -> str:
+        return f"// {self.header}: {time.strftime('%Y-%m-%d %H:%M:%S')}\n" + ('' if self.minify else '\n')
+
+    @staticmethod
+    def _categories() -> List[Dict]:
+        return [{'id': c.id, 'name': c.name} for c in CATALOG_CATEGORIES]
+
+    def add(self, record: Dict) -> Dict:
+        """Одна дверь; возвращает объект, который ушел во фронтенд"""
+        door = frontend_door(record, self.count + 1)
+        if self.split:
+            name = chunk_name(door.get('category'))
+            module = self._chunks.get(name)
+            if module is None:
+                self.chunks_dir.mkdir(exist_ok=True)
+                module = self._chunks[name] = _Module(self.chunks_dir / f'{name}.js')
+                module.file.write("export default [")
+                first = True
+            else:
+                first = False
+            module.file.write(('' if first else ',') + self._nl(1) + self._dumps(door, 1))
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if len(self._preview) < self.preview:
+                self._preview.append(door)
+        else:
+            self._index.file.write(('' if self.count == 0 else ',') + self._nl(2) + self._dumps(door, 2))
+        self.count += 1
+        return door
+
+    def _write_index_tail(self):
+        f = self._index.file
+        if not self.split:
+            f.write(self._nl(1) + "]" + self._nl(0) + "};\n" + SINGLE_LOADER)
+            return
+
+        prefix = f"./{self.chunks_dir.name}/"
+        index = {'categories': self._categories(), 'counts': self.counts, 'total': self.count,
+                 'doors': self._preview}
+        f.write(self._preamble() + "export const catalogData = " + self._dumps(index) + ";\n\n")
+        f.write("const chunks = {")
+        for i, name in enumerate(self._chunks):
+            # Статическая строка в import() - Vite делает из каждой категории свой чанк
+            f.write(('' if i == 0 else ',') + self._nl(1)
+                    + f"{json.dumps(name)}: () => import({json.dumps(prefix + name + '.js')})")
+        f.write(self._nl(0) + "};\n" + SPLIT_LOADER)
+
+    def close(self) -> List[str]:
+        """Дописывает и атомарно заменяет файлы; чанки прошлого запуска удаляются"""
+        try:
+            for module in self._chunks.values():
+                module.file.write(self._nl(0) + "];\n")
+            self._write_index_tail()
+        except BaseException:
+            self.discard()
+            raise
+
+        written = []
+        for module in self._chunks.values():
+            module.commit()
+            written.append(str(module.path))
+        self._index.commit()
+        written.append(str(self.path))
+
+        keep = {module.path.name for module in self._chunks.values()}
+        if self.chunks_dir.exists():
+            for stale in self.chunks_dir.glob('*.js'):
+                if stale.name not in keep:
+                    stale.unlink()
+        return written
+
+    def discard(self):
+        """Прерванная запись: временные файлы удаляются, старый каталог остается"""
+        for module in [self._index] + list(self._chunks.values()):
+            module.discard()
+
+    def print_report(self):
+        sizes = [os.path.getsize(self.path)] + [os.path.getsize(m.path) for m in self._chunks.values()]
+        if self.split:
+            print(f"🧩 {self.path.name}: индекс {sizes[0] / 1024:.1f} KB, "
+                  f"{len(self._chunks)} чанков по категориям, {sum(sizes[1:]) / 1024:.1f} KB")
+        else:
+            print(f"💾 {self.path.name}: {self.count} дверей, {sizes[0] / 1024:.1f} KB")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+def write_catalog(doors: Iterable[Dict], path=DEFAULT_JS_PATH, split: bool = False,
+                  minify: bool = False, header: str = "Данные с labirintdoors.ru") -> List[str]:
+    """Все двери в catalogData.js (и чанки при split); возвращает записанные файлы"""
+    writer = CatalogWriter(path, split=split, minify=minify, header=header)
+    try:
+        for door in doors:
+            writer.add(door)
+    except BaseException:
+        writer.discard()
+        raise
+    written = writer.close()
+    writer.print_report()
+    return written
+
+
+def add_catalog_arguments(argparser):
+    """Общие флаги --split и --minify для скриптов, которые пишут catalogData.js"""
+    argparser.add_argument('--split', action='store_true',
+                           help="catalogData.js - индекс, двери каждой категории - отдельный модуль")
+    argparser.add_argument('--minify', action='store_true', help="catalogData.js без отступов")
+    return argparser
+
+
+def main():
+    argparser = add_catalog_arguments(argparse.ArgumentParser(
+        description="catalogData.js из SQLite-каталога (catalog_store)"))
+    argparser.add_argument('--out', default=str(DEFAULT_JS_PATH))
+    args = argparser.parse_args()
+
+    from catalog_store import CatalogStore
+
+    with CatalogStore() as store:
+        write_catalog(store.iter_rows(), args.out, split=args.split, minify=args.minify)
+
+
+if __name__ == '__main__':
+    main()
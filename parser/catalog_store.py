@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Каталог дверей в SQLite вместо россыпи labirint_<время>.json/.csv/.xlsx.
+
+Все парсеры и скрипты пишут результат сюда (upsert по стабильному ключу -
+каноническому URL двери, иначе названию). Изменение цены попадает в
+таблицу price_history. JSON/CSV/Excel - выгрузка из представления catalog,
+по умолчанию только двери, найденные в текущем запуске.
+
+Порядок загрузки не важен: запись старше текущей (импорт прошлых выгрузок
+после живого обхода) не затирает цену и поля, а встает в историю цен на
+свое время.
+
+    store = CatalogStore()
+    run = store.upsert(doors, source='labirint_parser')
+    store.export('labirint_catalog', seen_since=run)
+    store.find(category='thermo', max_price=50000, dropped_since=month_ago)
+
+Из командной строки:
+
+    python catalog_store.py import labirint_*.json     # загрузить старые выгрузки
+    python catalog_store.py find --category thermo --max-price 50000 --dropped-days 30
+    python catalog_store.py export labirint_catalog
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from categories import CATEGORIES_BY_ID, category_id
+from delta import card_key
+from exporter import export_records
+
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parent / 'catalog.sqlite'
+
+# Поля, у которых есть своя колонка; остальное хранится JSON в data
+COLUMNS = ('name', 'category', 'price', 'image', 'url')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS doors (
+    key        TEXT PRIMARY KEY,
+    name       TEXT,
+    category   TEXT,
+    price      INTEGER,
+    image      TEXT,
+    url        TEXT,
+    source     TEXT,
+    data       TEXT NOT NULL DEFAULT '{}',
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS doors_category_price ON doors (category, price);
+CREATE INDEX IF NOT EXISTS doors_price ON doors (price);
+CREATE INDEX IF NOT EXISTS doors_name ON doors (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS doors_last_seen ON doors (last_seen);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    key     TEXT NOT NULL,
+    price   INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (key, seen_at)
+);
+CREATE INDEX IF NOT EXISTS price_history_seen_at ON price_history (seen_at);
+
+-- Каждая смена цены: прошлая и новая цена, когда замечена
+CREATE VIEW IF NOT EXISTS price_changes AS
+SELECT key, old_price, price, seen_at FROM (
+    SELECT key, price, seen_at,
+           LAG(price) OVER (PARTITION BY key ORDER BY seen_at) AS old_price
+    FROM price_history
+)
+WHERE old_price IS NOT NULL AND old_price != price;
+
+-- Источник всех выгрузок
+CREATE VIEW IF NOT EXISTS catalog AS
+SELECT key, name, category, price, image, url, source, data, first_seen, last_seen
+FROM doors
+ORDER BY first_seen, rowid;
+"""
+
+
+class CatalogStore:
+    """Каталог дверей и история цен"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self.last_upsert = {'inserted': 0, 'updated': 0, 'repriced': 0, 'skipped': 0}
+
+    def _execute(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def upsert(self, doors: Iterable[Dict], source: str, seen_at: Optional[float] = None,
+               batch: int = 500) -> float:
+        """
+        Добавление или обновление дверей пачками по batch записей
+        (doors может быть генератором, например iter_jsonl - весь каталог
+        в памяти не собирается). Пустые поля новой записи не затирают уже
+        известные. Возвращает время запуска (seen_at) - для export(seen_since=...).
+        """
+        seen_at = seen_at or time.time()
+        self.last_upsert = {'inserted': 0, 'updated': 0, 'repriced': 0, 'skipped': 0}
+        chunk = []
+        for door in doors:
+            chunk.append(door)
+            if len(chunk) >= batch:
+                self._upsert_batch(chunk, source, seen_at)
+                chunk = []
+        if chunk:
+            self._upsert_batch(chunk, source, seen_at)
+        return seen_at
+
+    def _upsert_batch(self, doors: List[Dict], source: str, seen_at: float):
+        rows = {}
+        skipped = 0
+        for door in doors:
+            door = dict(door)
+            door.setdefault('url', door.get('source_url'))
+            key = card_key(door)
+            if not key:
+                skipped += 1
+                continue
+            extra = {k: v for k, v in door.items() if k not in COLUMNS and v is not None}
+            rows[key] = (key, door.get('name'), category_id(door.get('category')), door.get('price'),
+                         door.get('image'), door.get('url'), source,
+                         json.dumps(extra, ensure_ascii=False, default=str), seen_at, seen_at)
+
+        with self._lock:
+            with self._conn:
+                known = self._known_keys(list(rows))
+                # Запись новее текущей заменяет поля; старая (импорт прошлых выгрузок
+                # после живого обхода) только заполняет пустые
+                self._conn.executemany("""
+                    INSERT INTO doors (key, name, category, price, image, url, source, data,
+                                       first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        name = CASE WHEN excluded.last_seen >= last_seen
+                                    THEN COALESCE(excluded.name, name) ELSE COALESCE(name, excluded.name) END,
+                        category = CASE WHEN excluded.last_seen >= last_seen
+                                        THEN COALESCE(excluded.category, category)
+                                        ELSE COALESCE(category, excluded.category) END,
+                        price = CASE WHEN excluded.last_seen >= last_seen
+                                     THEN COALESCE(excluded.price, price) ELSE COALESCE(price, excluded.price) END,
+                        image = CASE WHEN excluded.last_seen >= last_seen
+                                     THEN COALESCE(excluded.image, image) ELSE COALESCE(image, excluded.image) END,
+                        url = CASE WHEN excluded.last_seen >= last_seen
+                                   THEN COALESCE(excluded.url, url) ELSE COALESCE(url, excluded.url) END,
+                        source = CASE WHEN excluded.last_seen >= last_seen THEN excluded.source ELSE source END,
+                        data = CASE WHEN excluded.last_seen >= last_seen
+                                    THEN json_patch(data, excluded.data) ELSE json_patch(excluded.data, data) END,
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen)
+                """, rows.values())
+                repriced = self._add_history([(key, row[3]) for key, row in rows.items()
+                                              if row[3] is not None], seen_at)
+
+        inserted = sum(1 for key in rows if key not in known)
+        self.last_upsert['inserted'] += inserted
+        self.last_upsert['updated'] += len(rows) - inserted
+        self.last_upsert['repriced'] += repriced
+        self.last_upsert['skipped'] += skipped
+
+    def _add_history(self, prices: List, seen_at: float) -> int:
+        """
+        История: первая цена и каждое ее изменение, по времени seen_at, а не по
+        порядку загрузки. Цена сравнивается с ближайшей более ранней записью
+        истории; следующая запись, ставшая повтором, удаляется.
+        Возвращает число смен цены.
+        """
+        repriced = 0
+        for key, price in prices:
+            before = self._conn.execute(
+                'SELECT price FROM price_history WHERE key = ? AND seen_at < ? '
+                'ORDER BY seen_at DESC LIMIT 1', (key, seen_at)).fetchone()
+            if before is not None and before[0] == price:
+                continue
+            self._conn.execute('INSERT OR REPLACE INTO price_history (key, price, seen_at) VALUES (?, ?, ?)',
+                               (key, price, seen_at))
+            after = self._conn.execute(
+                'SELECT price, seen_at FROM price_history WHERE key = ? AND seen_at > ? '
+                'ORDER BY seen_at LIMIT 1', (key, seen_at)).fetchone()
+            if after is not None and after[0] == price:
+                self._conn.execute('DELETE FROM price_history WHERE key = ? AND seen_at = ?', (key, after[1]))
+            if before is not None:
+                repriced += 1
+        return repriced
+
+    def _known_keys(self, keys: List[str]) -> set:
+        known = set()
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            known.update(key for key, in self._conn.execute(
+                f'SELECT key FROM doors WHERE key IN ({marks})', chunk))
+        return known
+
+    @staticmethod
+    def _door(row: sqlite3.Row) -> Dict:
+        door = json.loads(row['data'])
+        door.update({column: row[column] for column in COLUMNS if row[column] is not None})
+        category = CATEGORIES_BY_ID.get(row['category'])
+        if category is not None:
+            door['category_name'] = category.name
+        door['key'] = row['key']
+        return door
+
+    @staticmethod
+    def _where(seen_since: Optional[float], source: Optional[str]):
+        sql = ' WHERE 1 = 1'
+        params = []
+        if seen_since is not None:
+            sql += ' AND last_seen >= ?'
+            params.append(seen_since)
+        if source is not None:
+            sql += ' AND source = ?'
+            params.append(source)
+        return sql, params
+
+    def iter_rows(self, seen_since: Optional[float] = None,
+                  source: Optional[str] = None) -> Iterator[Dict]:
+        """Двери из представления catalog по одной (курсор, без загрузки всего списка)"""
+        where, params = self._where(seen_since, source)
+        for row in self._conn.execute('SELECT * FROM catalog' + where, params):
+            yield self._door(row)
+
+    def rows(self, seen_since: Optional[float] = None, source: Optional[str] = None) -> List[Dict]:
+        """Двери из представления catalog (seen_since - найденные не раньше этого времени)"""
+        return list(self.iter_rows(seen_since, source))
+
+    def find(self, category: Optional[str] = None, min_price: Optional[int] = None,
+             max_price: Optional[int] = None, name: Optional[str] = None,
+             dropped_since: Optional[float] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Поиск по индексированным колонкам.
+        dropped_since - только двери, подешевевшие после этого времени
+        (в записи появляются old_price и price_changed_at).
+        """
+        sql = 'SELECT d.*'
+        joins = ''
+        where = []
+        params: List = []
+        if dropped_since is not None:
+            sql += ', c.old_price, c.price_changed_at'
+            # Последнее снижение цены каждой двери (SQLite берет old_price из строки с MAX)
+            joins = (' JOIN (SELECT key, old_price, MAX(seen_at) AS price_changed_at'
+                     ' FROM price_changes WHERE seen_at >= ? AND price < old_price'
+                     ' GROUP BY key) c ON c.key = d.key')
+            params.append(dropped_since)
+        if category is not None:
+            where.append('d.category = ?')
+            params.append(category_id(category))
+        if min_price is not None:
+            where.append('d.price >= ?')
+            params.append(min_price)
+        if max_price is not None:
+            where.append('d.price <= ?')
+            params.append(max_price)
+        if name is not None:
+            where.append('d.name LIKE ?')
+            params.append(f'%{name}%')
+        sql += ' FROM doors d' + joins
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY d.price'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        doors = []
+        for row in self._execute(sql, params):
+            door = self._door(row)
+            if dropped_since is not None:
+                door['old_price'] = row['old_price']
+                door['price_changed_at'] = row['price_changed_at']
+            doors.append(door)
+        return doors
+
+    def price_history(self, key: str) -> List[Dict]:
+        rows = self._execute('SELECT price, seen_at FROM price_history WHERE key = ? ORDER BY seen_at',
+                             (key,))
+        return [dict(row) for row in rows]
+
+    def export(self, prefix: str, seen_since: Optional[float] = None,
+               formats: Iterable[str] = ('json', 'csv', 'xlsx')) -> Dict[str, str]:
+        """
+        Выгрузка каталога в <prefix>.json/.csv/.xlsx (файлы перезаписываются):
+        курсор читается по одной записи, форматы пишутся параллельно (см. exporter).
+        """
+        where, params = self._where(seen_since, None)
+        if not self._execute('SELECT 1 FROM doors' + where + ' LIMIT 1', params):
+            print("⚠️  Нет данных для сохранения")
+            return {}
+        return export_records(lambda: self.iter_rows(seen_since), prefix, formats)
+
+    def counts(self) -> Dict[str, int]:
+        doors, = self._execute('SELECT COUNT(*) FROM doors')[0]
+        history, = self._execute('SELECT COUNT(*) FROM price_history')[0]
+        return {'doors': doors, 'history': history}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_report(self):
+        u = self.last_upsert
+        c = self.counts()
+        print(f"🗄️  Каталог: новых {u['inserted']}, обновлено {u['updated']}, "
+              f"сменили цену {u['repriced']}"
+              + (f", без ключа {u['skipped']}" if u['skipped'] else "")
+              + f" | всего дверей {c['doors']}, записей цен {c['history']} ({self.path.name})")
+
+
+def _file_time(path: Path) -> float:
+    """Время выгрузки из имени labirint_20251210_165906.json, иначе mtime файла"""
+    match = re.search(r'(\d{8}_\d{6})', path.name)
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+    return path.stat().st_mtime
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Каталог дверей в SQLite")
+    argparser.add_argument('--db', default=str(DEFAULT_STORE_PATH), help="файл базы")
+    commands = argparser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('import', help="загрузить старые JSON-выгрузки (по времени файла)")
+    load.add_argument('files', nargs='+')
+
+    search = commands.add_parser('find', help="поиск дверей")
+    search.add_argument('--category')
+    search.add_argument('--min-price', type=int)
+    search.add_argument('--max-price', type=int)
+    search.add_argument('--name')
+    search.add_argument('--dropped-days', type=int, help="подешевели за последние N дней")
+    search.add_argument('--limit', type=int)
+
+    dump = commands.add_parser('export', help="выгрузить каталог в JSON/CSV/Excel")
+    dump.add_argument('prefix')
+
+    args = argparser.parse_args()
+    with CatalogStore(args.db) as store:
+        if args.command == 'import':
+            for path in sorted(map(Path, args.files), key=_file_time):
+                with open(path, encoding='utf-8') as f:
+                    doors = json.load(f)
+                store.upsert(doors, source=path.stem, seen_at=_file_time(path))
+                print(f"📥 {path.name}: {len(doors)} записей")
+            store.print_report()
+
+        elif args.command == 'find':
+            since = time.time() - args.dropped_days * 86400 if args.dropped_days else None
+            start = time.perf_counter()
+            doors = store.find(args.category, args.min_price, args.max_price, args.name, since, args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for door in doors:
+                drop = f" (было {door['old_price']:,})" if door.get('old_price') else ""
+                print(f"   {door.get('price') or 0:>8,} ₽{drop}  {door.get('name')}")
+            print(f"🔎 Найдено: {len(doors)} за {elapsed:.1f} мс")
+
+        elif args.command == 'export':
+            store.export(args.prefix)
+
+
+if __name__ == '__main__':
+    main()
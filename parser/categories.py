@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Единые правила категоризации дверей для всех парсеров.
+
+Таблица правил компилируется в одно регулярное выражение: название
+просматривается за один проход, из всех найденных ключевых слов побеждает
+правило с наивысшим приоритетом (порядок в таблице). Ключевые слова
+ищутся в каждой позиции (lookahead), поэтому пересекающиеся совпадения
+("ROYALEO" - ROYAL и LEO) не теряются.
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, Iterable, Optional
+
+
+Category = namedtuple('Category', ['id', 'name'])
+
+# Порядок важен: первое правило имеет наивысший приоритет.
+# Ключевые слова ищутся как подстроки без учета регистра.
+CATEGORY_RULES = [
+    (Category('invisible', 'Новинки 2025'), ['LEO', 'SKY', 'EVO', 'SMART']),
+    (Category('veneer', 'Хиты продаж'), ['PIANO', 'ROYAL', 'ISSIDA', 'STORM']),
+    (Category('thermo', 'С терморазрывом'), ['термо', 'NORD', 'TUNDRA', 'ATLANTIC', 'атлантик', 'FROST']),
+    (Category('glass', 'Белые двери'), ['WHITE', 'VERSAL', 'TRENDO', 'бел']),
+]
+DEFAULT_CATEGORY = Category('entrance', 'Основной каталог')
+
+CATEGORIES_BY_ID = {category.id: category for category, _ in CATEGORY_RULES}
+CATEGORIES_BY_ID[DEFAULT_CATEGORY.id] = DEFAULT_CATEGORY
+CATEGORY_IDS_BY_NAME = {category.name: category.id for category in CATEGORIES_BY_ID.values()}
+
+# Категории для фильтра в catalogData.js (порядок вкладок на сайте)
+CATALOG_CATEGORIES = [Category('all', 'Все двери')] + [
+    CATEGORIES_BY_ID[category_id]
+    for category_id in ('invisible', 'veneer', 'glass', 'entrance', 'thermo')
+]
+
+
+class CategoryMatcher:
+    """Скомпилированная таблица правил"""
+
+    def __init__(self, rules=CATEGORY_RULES, default: Category = DEFAULT_CATEGORY):
+        self.default = default
+        self._categories = [category for category, _ in rules]
+        self._priority: Dict[str, int] = {}
+        for priority, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                self._priority.setdefault(keyword.lower(), priority)
+        # Поиск с захватом внутри lookahead срабатывает в каждой позиции строки,
+        # поэтому пересекающиеся ключи тоже находятся. В одной позиции
+        # альтернатива берет первый подходящий ключ - сортируем по приоритету.
+        keywords = sorted(self._priority, key=self._priority.get)
+        self._pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(k) for k in keywords) + '))', re.IGNORECASE)
+
+    def classify(self, text: str) -> Category:
+        """Категория по названию или тексту карточки"""
+        if not text:
+            return self.default
+        best = None
+        for match in self._pattern.finditer(text):
+            priority = self._priority[match.group(1).lower()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return self.default if best is None else self._categories[best]
+
+    def classify_many(self, texts: Iterable):
+        """
+        Пакетная категоризация. Каждое уникальное значение классифицируется
+        один раз. Для pandas Series возвращается DataFrame с колонками
+        category (id) и category_name, для остального - список Category.
+        """
+        if hasattr(texts, 'map') and hasattr(texts, 'index'):
+            import pandas as pd
+
+            lookup = {text: self.classify(text) for text in texts.dropna().unique()}
+            return pd.DataFrame({
+                'category': texts.map({t: c.id for t, c in lookup.items()}).fillna(self.default.id),
+                'category_name': texts.map({t: c.name for t, c in lookup.items()}).fillna(self.default.name),
+            }, index=texts.index)
+
+        texts = list(texts)
+        lookup = {text: self.classify(text) for text in set(texts)}
+        return [lookup[text] for text in texts]
+
+
+_default_matcher = CategoryMatcher()
+
+
+def classify(text: str) -> Category:
+    return _default_matcher.classify(text)
+
+
+def classify_many(texts: Iterable):
+    return _default_matcher.classify_many(texts)
+
+
+def category_id(value: Optional[str]) -> Optional[str]:
+    """Скрипты пишут то id ('thermo'), то название категории - приводим к id"""
+    if value in CATEGORIES_BY_ID or value is None:
+        return value
+    return CATEGORY_IDS_BY_NAME.get(value, value)
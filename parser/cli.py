@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Единая точка входа: загрузка → разбор → детали → фото → выгрузка одним конвейером.
+
+Этапы работают одновременно и соединены ограниченными очередями (см.
+pipeline): листинг N разбирается, пока грузится N+1, детальные страницы
+грузятся по мере появления карточек, фото качаются параллельно с ними,
+готовые двери сразу пишутся в JSONL-поток и в памяти не копятся:
+статистика считается счетчиками, итоги для Delta сразу уходят на диск.
+Все этапы используют одну requests.Session (один пул соединений), один
+лимит запросов на хост и один браузер (только в --hybrid и только там,
+где статики не хватило).
+
+    python cli.py                          # каталог, одна страница
+    python cli.py --discover --deep        # весь сайт с деталями
+    python cli.py --deep --images --js     # + фото в public/catalog-images и catalogData.js
+    python cli.py --replay latest --deep   # без сети, из снимка
+
+Прошлый запуск учитывается: карточки без изменений берут детали из
+parser/delta/ (--full - загрузить все), прерванный детальный обход
+продолжается с --resume.
+"""
+
+import argparse
+import threading
+from typing import Dict, Optional
+
+from requests.adapters import HTTPAdapter
+
+from catalog_js import DEFAULT_JS_PATH, add_catalog_arguments
+from crawl_state import CrawlState, add_resume_argument
+from delta import Delta, add_delta_argument
+from frontier import Frontier, SingleFlight, crawl, normalize_url
+from html_backends import BACKENDS, DEFAULT_BACKEND
+from image_sync import image_filename
+from image_variants import PUBLIC_DIR
+from jsonl_sink import JsonlSink
+from labirint_parser import CatalogSummary, LabirintParser, save_stream
+from pipeline import Pipeline, Stage
+from rate_limiter import HostRateLimiter
+from snapshots import add_replay_argument
+
+
+IMAGES_DIR = PUBLIC_DIR / 'catalog-images'
+IMAGES_URL = '/catalog-images'
+
+
+class CatalogPipeline:
+    """
+    Этапы конвейера поверх LabirintParser.
+
+    deep - загружать детальные страницы
+    images - синхронизировать фото в public/catalog-images (см. image_sync)
+    """
+
+    def __init__(self, parser: LabirintParser, sink: JsonlSink, deep: bool = False,
+                 images: bool = False, image_workers: int = 8, queue_size: int = 64):
+        self.parser = parser
+        self.sink = sink
+        self.deep = deep
+        self.queue_size = queue_size
+
+        self._lock = threading.Lock()
+        self._seen = set()
+        self.summary = CatalogSummary()
+        self.done: Dict[str, object] = {}
+
+        self.image_sync = None
+        # Одно фото у нескольких дверей скачивается один раз
+        self._images = SingleFlight(lambda url: self.image_sync.sync_one(url, image_filename(url)), keep=None)
+        if images:
+            from image_sync import ImageSync
+
+            # Свой лимит для фото (как sleep(0.2) в исходных скриптах): общий лимит
+            # страниц - 1 запрос/с, фото через него шли бы на порядок дольше
+            self.image_sync = ImageSync(IMAGES_DIR, workers=image_workers, timeout=10,
+                                        rate_limiter=HostRateLimiter(rate=5.0, burst=5),
+                                        session=parser.session)
+        self.image_workers = image_workers
+
+        # Один пул соединений на детали и фото: иначе urllib3 выбрасывает лишние соединения
+        pool = parser.workers + (image_workers if images else 0)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool)
+        parser.session.mount('https://', adapter)
+        parser.session.mount('http://', adapter)
+
+    # --- источник: листинги ---
+
+    def listings(self, discover: bool):
+        """Источник конвейера: (url, html) страниц каталога по мере загрузки"""
+        fetch = self.parser.hybrid.fetch if self.parser.hybrid else self.parser.fetch_html
+
+        def source(emit):
+            if discover:
+                _, self.parser.frontier = crawl(
+                    fetch, [self.parser.catalog_url], Frontier(max_depth=2),
+                    workers=self.parser.workers, on_page=lambda url, html: emit((url, html)))
+                self.parser.frontier.print_report()
+                return
+            html = fetch(self.parser.catalog_url)
+            if html:
+                emit((self.parser.catalog_url, html))
+            else:
+                print("❌ Не удалось загрузить каталог")
+        return source
+
+    # --- этапы ---
+
+    def parse(self, page):
+        """Листинг -> новые карточки (повторы с других листингов отбрасываются)"""
+        _, html = page
+        for door in self.parser.parse_catalog_page(html):
+            key = normalize_url(door.get('url')) or door['name']
+            with self._lock:
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+            delta = self.parser.delta
+            index, carried = delta.track(door) if delta is not None else (None, None)
+            yield index, door, carried
+
+    def details(self, job):
+        """Детали двери: из прошлого запуска, из состояния обхода или со страницы"""
+        index, door, carried = job
+        url = door.get('url')
+        if carried:
+            result = carried
+        elif url:
+            state = self.parser.state
+            if state is not None:
+                state.add([url])
+            result = self.done.get(url) or self.parser.detail(url)
+        else:
+            result = None
+        if result:
+            door.update(result)
+            if index is not None and not carried:
+                # Перенесенные из прошлого запуска Delta возьмет сама
+                self.parser.delta.record(index, result)
+        return door
+
+    def image(self, door):
+        url = door.get('image')
+        if not url or not url.startswith('http'):
+            return door
+        result = self._images.get(url)
+        if result['ok']:
+            door['image_url'] = url
+            door['image'] = f"{IMAGES_URL}/{result['filename']}"
+        return door
+
+    # --- запуск ---
+
+    def stages(self):
+        stages = [Stage('parse', self.parse, fanout=True)]
+        if self.deep:
+            stages.append(Stage('details', self.details, workers=self.parser.workers))
+        else:
+            stages.append(Stage('cards', lambda job: job[1]))
+        if self.image_sync is not None:
+            stages.append(Stage('images', self.image, workers=self.image_workers))
+        stages.append(Stage('export', lambda door: self.sink.write(self.summary.add(door))))
+        return stages
+
+    def run(self, discover: bool = False) -> Pipeline:
+        if self.deep and self.parser.state is not None:
+            # Страницы, разобранные до прерывания, повторно не загружаются
+            self.done = self.parser.state.payloads()
+            if self.done:
+                print(f"⏭️  Уже разобрано в прошлый раз: {len(self.done)}")
+
+        pipeline = Pipeline(self.stages(), queue_size=self.queue_size)
+        try:
+            pipeline.run(self.listings(discover))
+        finally:
+            if self.parser.hybrid:
+                self.parser.hybrid.close()
+                self.parser.hybrid.print_report()
+            if self.image_sync is not None:
+                self.image_sync.save()
+
+        delta = self.parser.delta
+        if delta is not None:
+            delta.commit()
+            delta.print_report()
+        if self.image_sync is not None:
+            self.image_sync.print_report()
+        if self.parser.state is not None:
+            self.parser.state.print_report()
+        pipeline.print_report()
+        return pipeline
+
+
+def main():
+    argparser = add_replay_argument(argparse.ArgumentParser(
+        description="Каталог Лабиринт: загрузка, разбор, фото и выгрузка одним конвейером"))
+    argparser.add_argument('--discover', action='store_true',
+                           help="обойти все разделы, фильтры и пагинацию каталога")
+    argparser.add_argument('--deep', action='store_true',
+                           help="загрузить детальную страницу каждой двери")
+    argparser.add_argument('--images', action='store_true',
+                           help="синхронизировать фото в public/catalog-images")
+    argparser.add_argument('--hybrid', action='store_true',
+                           help="догружать в браузере листинги, где статики не хватило")
+    argparser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                           help="бэкенд разбора листингов")
+    argparser.add_argument('--workers', type=int, default=8,
+                           help="потоков на детальные страницы (и на фото)")
+    argparser.add_argument('--queue-size', type=int, default=64,
+                           help="емкость очереди между этапами")
+    argparser.add_argument('--js', nargs='?', const=str(DEFAULT_JS_PATH), metavar='PATH',
+                           help="выгрузить catalogData.js для сайта (по умолчанию src/catalogData.js)")
+    argparser.add_argument('--parquet', action='store_true',
+                           help="дописать запуск в историю parser/history/ (нужен pyarrow)")
+    add_catalog_arguments(add_delta_argument(add_resume_argument(argparser)))
+    args = argparser.parse_args()
+
+    state: Optional[CrawlState] = CrawlState('labirint_details', resume=args.resume) if args.deep else None
+    sink = JsonlSink('labirint_catalog.jsonl')
+    parser = LabirintParser(workers=args.workers, replay=args.replay, backend=args.backend,
+                            hybrid=args.hybrid, state=state,
+                            delta=Delta('labirint_parser', full=args.full), sink=sink)
+    pipeline = CatalogPipeline(parser, sink, deep=args.deep, images=args.images,
+                               image_workers=args.workers, queue_size=args.queue_size)
+    try:
+        pipeline.run(discover=args.discover)
+    finally:
+        sink.close()
+
+    pipeline.summary.print()
+    if save_stream(sink, source='cli', js_path=args.js, parquet=args.parquet,
+                   js_options={'split': args.split, 'minify': args.minify}, seen_at=parser.pages.seen_at):
+        print("\n✅ Готово")
+    else:
+        print("\n❌ Не удалось извлечь данные")
+
+
+if __name__ == '__main__':
+    main()
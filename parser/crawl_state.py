@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Состояние обхода в SQLite: можно прервать длинный парсинг и продолжить.
+
+Для каждого URL задания (job) хранится статус (pending / done / failed),
+число попыток, последняя ошибка и извлеченные данные (JSON). Каждое
+изменение сразу коммитится, поэтому после падения скрипта в базе остается
+все, что успели обработать. С флагом --resume готовые URL не загружаются
+повторно, а в работу идут только pending и failed.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_STATE_PATH = Path(__file__).resolve().parent / 'crawl_state.sqlite'
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    job        TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    status     TEXT NOT NULL DEFAULT 'pending',
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    payload    TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job, url)
+);
+CREATE INDEX IF NOT EXISTS urls_status ON urls (job, status);
+"""
+
+
+class CrawlState:
+    """Статусы URL одного задания (например, 'parse_deep')"""
+
+    def __init__(self, job: str, path=DEFAULT_STATE_PATH, resume: bool = False):
+        self.job = job
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # Одно соединение на все потоки пула, доступ через _lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        if not resume:
+            self.reset()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(sql, params).fetchall()
+
+    def reset(self):
+        """Новый обход с нуля: забываем прошлые результаты задания"""
+        self._execute('DELETE FROM urls WHERE job = ?', (self.job,))
+
+    def add(self, urls: Iterable[str]):
+        """Регистрация URL; уже известные не меняются"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO urls (job, url, updated_at) VALUES (?, ?, ?)',
+                    [(self.job, url, now) for url in urls],
+                )
+
+    def mark_done(self, url: str, payload=None):
+        self._execute(
+            'UPDATE urls SET status = ?, attempts = attempts + 1, last_error = NULL, '
+            'payload = ?, updated_at = ? WHERE job = ? AND url = ?',
+            (DONE, json.dumps(payload, ensure_ascii=False), time.time(), self.job, url),
+        )
+
+    def mark_failed(self, url: str, error):
+        self._execute(
+            'UPDATE urls SET status = ?, attempts = attempts + 1, last_error = ?, '
+            'updated_at = ? WHERE job = ? AND url = ?',
+            (FAILED, str(error)[:500], time.time(), self.job, url),
+        )
+
+    def is_done(self, url: str) -> bool:
+        rows = self._execute('SELECT 1 FROM urls WHERE job = ? AND url = ? AND status = ?',
+                             (self.job, url, DONE))
+        return bool(rows)
+
+    def payloads(self) -> Dict[str, object]:
+        """url -> сохраненные данные для всех готовых URL"""
+        rows = self._execute('SELECT url, payload FROM urls WHERE job = ? AND status = ?',
+                             (self.job, DONE))
+        return {url: json.loads(payload) if payload else None for url, payload in rows}
+
+    def todo(self, max_attempts: Optional[int] = None) -> List[str]:
+        """pending и failed URL (failed - не больше max_attempts попыток)"""
+        sql = 'SELECT url FROM urls WHERE job = ? AND status != ?'
+        params = [self.job, DONE]
+        if max_attempts is not None:
+            sql += ' AND attempts < ?'
+            params.append(max_attempts)
+        return [url for (url,) in self._execute(sql, params)]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._execute('SELECT status, COUNT(*) FROM urls WHERE job = ? GROUP BY status',
+                             (self.job,))
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def print_report(self):
+        c = self.counts()
+        print(f"💾 Состояние обхода '{self.job}': готово {c[DONE]}, ошибок {c[FAILED]}, "
+              f"в очереди {c[PENDING]} ({self.path.name})")
+
+
+def add_resume_argument(argparser):
+    """Общий флаг --resume для скриптов"""
+    argparser.add_argument(
+        '--resume', action='store_true',
+        help="продолжить прерванный обход: готовые URL не загружать повторно",
+    )
+    return argparser
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Инкрементальный обход: детальные страницы - только для новых и измененных карточек.
+
+Для каждой карточки листинга считается отпечаток (sha1 от названия, цены
+и фото) и сравнивается с отпечатком прошлого запуска. Если карточка не
+изменилась и в прошлый раз ее детальная страница была разобрана, запись
+переносится из прошлого результата без загрузки. Если не изменилось ничего,
+ночное обновление стоит одной загрузки листинга.
+
+Состояние задания хранится в parser/delta/<job>.json, журнал изменений
+(добавлены, удалены, изменилась цена) дописывается в
+parser/delta/<job>_changelog.jsonl - одна строка на запуск.
+
+    delta = Delta('labirint_parser')
+    carried = delta.plan(cards)     # прошлая запись или None для каждой карточки
+    ...                             # загрузка деталей там, где None
+    delta.commit(records)           # records[i] - итог по cards[i] или None
+    delta.print_report()
+
+Карточки можно передавать и по одной (delta.track(card)), когда листинги
+разбираются потоком и полного списка заранее нет. Тогда и итоги можно
+отдавать по одной (delta.record(index, record)): они сразу дописываются
+в parser/delta/<job>_records.jsonl, а delta.commit() без аргументов
+собирает состояние из этого файла - держать все двери в памяти не нужно.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from frontier import normalize_url
+
+
+DEFAULT_DELTA_DIR = Path(__file__).resolve().parent / 'delta'
+
+# Поля карточки листинга, изменение которых требует повторной загрузки деталей
+FINGERPRINT_FIELDS = ('name', 'price', 'image')
+
+
+def card_key(card: Dict) -> Optional[str]:
+    """Стабильный ключ карточки: канонический URL, иначе название"""
+    return normalize_url(card.get('url')) or card.get('name')
+
+
+def fingerprint(card: Dict, fields: Iterable[str] = FINGERPRINT_FIELDS) -> str:
+    data = json.dumps([card.get(field) for field in fields], ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class Delta:
+    """
+    Сравнение карточек текущего запуска с прошлым.
+
+    job - имя задания (свой файл состояния)
+    full - игнорировать прошлый запуск и загрузить все детали заново
+           (журнал изменений при этом все равно пишется)
+    readonly - сравнивать, но не сохранять состояние и журнал (разбор
+               старого снимка, --replay, не должен затирать текущие отпечатки)
+    """
+
+    def __init__(self, job: str, directory=DEFAULT_DELTA_DIR,
+                 fields: Iterable[str] = FINGERPRINT_FIELDS, full: bool = False,
+                 readonly: bool = False):
+        self.job = job
+        self.directory = Path(directory)
+        self.fields = tuple(fields)
+        self.full = full
+        self.readonly = readonly
+        self.path = self.directory / f'{job}.json'
+        self.changelog_path = self.directory / f'{job}_changelog.jsonl'
+        self.records_path = self.directory / f'{job}_records.jsonl'
+
+        self.previous: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self.previous = json.loads(self.path.read_text(encoding='utf-8'))['items']
+            except (ValueError, KeyError) as e:
+                print(f"⚠️  Состояние {self.path.name} повреждено, начинаю с нуля: {e}")
+
+        self._cards: List[Dict] = []
+        self._keys: List[Optional[str]] = []
+        self._fingerprints: List[str] = []
+        self._lock = threading.Lock()
+        self._records_file = None
+        self.stats = {'new': 0, 'changed': 0, 'carried': 0}
+        self.changes: Optional[Dict] = None
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def plan(self, cards: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Для каждой карточки - запись прошлого запуска, если карточка не
+        изменилась и детали уже были разобраны, иначе None (нужна загрузка).
+        """
+        self._cards, self._keys, self._fingerprints = [], [], []
+        return [self.track(card)[1] for card in cards]
+
+    def track(self, card: Dict) -> Tuple[int, Optional[Dict]]:
+        """
+        Одна карточка (потокобезопасно): ее номер для commit(records) и
+        запись прошлого запуска или None, как в plan().
+        """
+        key = card_key(card)
+        fp = fingerprint(card, self.fields)
+        old = self.previous.get(key) if key else None
+        with self._lock:
+            self._cards.append({field: card.get(field) for field in ('url',) + self.fields})
+            self._keys.append(key)
+            self._fingerprints.append(fp)
+            if old is None:
+                self.stats['new'] += 1
+                record = None
+            elif old['fingerprint'] != fp or old.get('record') is None or self.full:
+                self.stats['changed'] += 1
+                record = None
+            else:
+                self.stats['carried'] += 1
+                record = old['record']
+            return len(self._cards) - 1, record
+
+    def record(self, index: int, record: Optional[Dict]):
+        """
+        Итог по карточке index (номер из track) - сразу на диск, для
+        commit() без аргументов. При readonly ничего не пишется.
+        """
+        if not record or self.readonly:
+            return
+        line = json.dumps([index, record], ensure_ascii=False, default=str)
+        with self._lock:
+            if self._records_file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._records_file = open(self.records_path, 'w', encoding='utf-8')
+            self._records_file.write(line + '\n')
+
+    def _recorded(self) -> List[Optional[Dict]]:
+        """Итоги, записанные через record(), по номерам карточек"""
+        records: List[Optional[Dict]] = [None] * len(self._cards)
+        with self._lock:
+            if self._records_file is None:
+                return records
+            self._records_file.close()
+            self._records_file = None
+        with open(self.records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    index, record = json.loads(line)
+                except ValueError:
+                    continue
+                if 0 <= index < len(records):
+                    records[index] = record
+        return records
+
+    def diff(self) -> Dict[str, List]:
+        """Добавленные, удаленные, с новой ценой и прочие измененные карточки"""
+        current = {key: (card, fp) for key, card, fp
+                   in zip(self._keys, self._cards, self._fingerprints) if key}
+        changes = {'added': [], 'removed': [], 'repriced': [], 'changed': []}
+        for key, (card, fp) in current.items():
+            old = self.previous.get(key)
+            if old is None:
+                changes['added'].append(card)
+            elif old['card'].get('price') != card.get('price'):
+                changes['repriced'].append({**card, 'old_price': old['card'].get('price')})
+            elif old['fingerprint'] != fp:
+                changes['changed'].append(card)
+        for key, old in self.previous.items():
+            if key not in current:
+                changes['removed'].append(old['card'])
+        return changes
+
+    def commit(self, records: Optional[List[Optional[Dict]]] = None) -> Dict[str, List]:
+        """
+        Сохранение отпечатков и записей текущего запуска, запись журнала.
+        records[i] - итоговая запись по cards[i]; None - деталей нет (не
+        разбирались или ошибка): для неизмененной карточки остается прошлая
+        запись, иначе в следующий раз карточка загрузится снова.
+        Без records берутся итоги, переданные через record().
+        При readonly - только сравнение, файлы не меняются.
+        """
+        records = records if records is not None else self._recorded()
+        self.changes = self.diff()
+        if self.readonly:
+            return self.changes
+
+        items = {}
+        for key, card, fp, record in zip(self._keys, self._cards, self._fingerprints, records):
+            if not key:
+                continue
+            old = self.previous.get(key)
+            if not record and old is not None and old['fingerprint'] == fp:
+                # Детали в этот раз не разбирались, но прошлые для той же карточки верны
+                record = old.get('record')
+            items[key] = {'fingerprint': fp, 'card': card, 'record': record or None}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'saved_at': time.time(), 'items': items},
+                                  ensure_ascii=False), encoding='utf-8')
+        tmp.replace(self.path)
+
+        with open(self.changelog_path, 'a', encoding='utf-8') as f:
+            entry = {'at': time.strftime('%Y-%m-%d %H:%M:%S'), 'total': len(items), **self.changes}
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        if self.records_path.exists():
+            self.records_path.unlink()
+        return self.changes
+
+    def print_report(self, limit: int = 10):
+        s = self.stats
+        print(f"🔄 Карточек: {len(self._cards)}, без изменений (перенесено): {s['carried']}, "
+              f"новых: {s['new']}, измененных: {s['changed']}"
+              + (" (--full: загружаю все)" if self.full else "")
+              + (" (снимок: состояние не сохраняется)" if self.readonly else ""))
+        if self.changes is None:
+            return
+        c = self.changes
+        print(f"📝 Изменения: добавлено {len(c['added'])}, удалено {len(c['removed'])}, "
+              f"цена изменилась {len(c['repriced'])}, прочее {len(c['changed'])}")
+        for card in c['added'][:limit]:
+            print(f"   + {card.get('name')} - {card.get('price')}")
+        for card in c['removed'][:limit]:
+            print(f"   - {card.get('name')}")
+        for card in c['repriced'][:limit]:
+            print(f"   ₽ {card.get('name')}: {card.get('old_price')} → {card.get('price')}")
+
+
+def add_delta_argument(argparser):
+    """Общий флаг --full для скриптов с инкрементальным обходом"""
+    argparser.add_argument(
+        '--full', action='store_true',
+        help="загрузить детали всех карточек, а не только новых и измененных",
+    )
+    return argparser
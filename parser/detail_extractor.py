@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Извлечение характеристик, описания и галереи со страницы двери.
+
+Все страницы дверей собраны по одному шаблону сайта. Первая страница
+разбирается общим поиском по регулярным выражениям классов (как раньше),
+при этом запоминается, какие теги и классы реально сработали. Из них
+один раз компилируется набор XPath-запросов, и следующие страницы
+разбираются уже им. Шаблон учится по частям (характеристики, описание,
+галерея): если часть не выучена или шаблон ее на странице не нашел,
+эта часть ищется общим поиском и переучивается, остальные берутся из
+шаблона. Первая страница без галереи не оставляет все следующие без фото.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from html_backends import parse_document, visible_text
+
+
+SPEC_RE = re.compile(r'spec|characteristic|param')
+KEY_RE = re.compile(r'key|label|name')
+VALUE_RE = re.compile(r'value|data')
+DESCRIPTION_RE = re.compile(r'description|about')
+GALLERY_RE = re.compile(r'gallery|product')
+
+SPEC_TAGS = ['div', 'li', 'tr']
+KEY_TAGS = ['span', 'td', 'dt']
+VALUE_TAGS = ['span', 'td', 'dd']
+DESCRIPTION_TAGS = ['div', 'p']
+
+
+def _matched_class(tag, pattern) -> Optional[str]:
+    """Первый класс тега, подходящий под pattern (так же ищет BeautifulSoup)"""
+    for cls in tag.get('class') or []:
+        if pattern.search(cls):
+            return cls
+    return None
+
+
+def _has_class(tag: str, cls: str) -> str:
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+
+# Части страницы; шаблон учится и промахивается по каждой отдельно
+PARTS = ('characteristics', 'description', 'images')
+
+
+def extract_generic(soup: BeautifulSoup, parts=PARTS) -> Tuple[Dict, Dict]:
+    """
+    Общий поиск по регулярным выражениям классов.
+    Возвращает данные и сработавшие (тег, класс) для обучения шаблона.
+    parts - какие части искать (остальные в данных не появляются).
+    """
+    detail_data = {}
+    seen = {'rows': Counter(), 'keys': Counter(), 'values': Counter(),
+            'description': None, 'images': Counter()}
+
+    if 'characteristics' in parts:
+        characteristics = {}
+        for spec in soup.find_all(SPEC_TAGS, class_=SPEC_RE):
+            key_elem = spec.find(KEY_TAGS, class_=KEY_RE)
+            val_elem = spec.find(VALUE_TAGS, class_=VALUE_RE)
+
+            if key_elem and val_elem:
+                characteristics[key_elem.get_text(strip=True)] = val_elem.get_text(strip=True)
+                seen['rows'][(spec.name, _matched_class(spec, SPEC_RE))] += 1
+                seen['keys'][(key_elem.name, _matched_class(key_elem, KEY_RE))] += 1
+                seen['values'][(val_elem.name, _matched_class(val_elem, VALUE_RE))] += 1
+        detail_data['characteristics'] = characteristics
+
+    if 'description' in parts:
+        description = soup.find(DESCRIPTION_TAGS, class_=DESCRIPTION_RE)
+        if description:
+            detail_data['description'] = description.get_text(strip=True)
+            seen['description'] = (description.name, _matched_class(description, DESCRIPTION_RE))
+
+    if 'images' in parts:
+        images = []
+        for img in soup.find_all('img', class_=GALLERY_RE):
+            src = img.get('src') or img.get('data-src')
+            if src:
+                images.append(src)
+                seen['images'][_matched_class(img, GALLERY_RE)] += 1
+        detail_data['images'] = images
+
+    return detail_data, seen
+
+
+def _learned_parts(seen: Dict) -> set:
+    """Части, для которых из seen можно собрать XPath (у тегов был класс)"""
+    parts = set()
+    if all(any(cls for _, cls in seen[part]) for part in ('rows', 'keys', 'values')):
+        parts.add('characteristics')
+    if seen['description'] and seen['description'][1]:
+        parts.add('description')
+    if any(seen['images']):
+        parts.add('images')
+    return parts
+
+
+class DetailTemplate:
+    """Скомпилированные XPath-запросы для шаблона страницы двери (по частям)"""
+
+    def __init__(self, seen: Dict):
+        from lxml import etree
+
+        def union(pairs, prefix):
+            return ' | '.join(f"{prefix}{_has_class(tag, cls)}" for tag, cls in pairs if cls)
+
+        self.seen = seen
+        self.parts = _learned_parts(seen)
+
+        self.rows = None
+        if 'characteristics' in self.parts:
+            self.rows = etree.XPath(union(seen['rows'], '//'))
+            self.key = etree.XPath(f"({union(seen['keys'], './/')})[1]")
+            self.value = etree.XPath(f"({union(seen['values'], './/')})[1]")
+
+        self.description = None
+        if 'description' in self.parts:
+            self.description = etree.XPath(f"(//{_has_class(*seen['description'])})[1]")
+
+        self.images = None
+        if 'images' in self.parts:
+            self.images = etree.XPath(' | '.join(f"//{_has_class('img', cls)}" for cls in seen['images'] if cls))
+
+    @classmethod
+    def learn(cls, seen: Dict, base: Optional['DetailTemplate'] = None) -> Optional['DetailTemplate']:
+        """
+        Новый шаблон: части, найденные в seen, заменяют части base,
+        остальные берутся из base. None - учиться не на чем.
+        """
+        found = _learned_parts(seen)
+        if not found:
+            return None
+        merged = dict(base.seen) if base is not None else {
+            'rows': Counter(), 'keys': Counter(), 'values': Counter(),
+            'description': None, 'images': Counter()}
+        if 'characteristics' in found:
+            merged.update(rows=seen['rows'], keys=seen['keys'], values=seen['values'])
+        if 'description' in found:
+            merged['description'] = seen['description']
+        if 'images' in found:
+            merged['images'] = seen['images']
+        return cls(merged)
+
+    @staticmethod
+    def _text(elem) -> str:
+        return visible_text(elem)
+
+    def extract(self, root) -> Tuple[Dict, set]:
+        """
+        Данные и промахи: части, которых шаблон не знает или не нашел
+        на этой странице (их нужно искать общим поиском).
+        """
+        detail_data = {'characteristics': {}, 'images': []}
+        missed = set(PARTS) - self.parts
+
+        if self.rows is not None:
+            for row in self.rows(root):
+                key_elem = self.key(row)
+                val_elem = self.value(row)
+                if key_elem and val_elem:
+                    detail_data['characteristics'][self._text(key_elem[0])] = self._text(val_elem[0])
+            if not detail_data['characteristics']:
+                missed.add('characteristics')
+
+        if self.description is not None:
+            found = self.description(root)
+            if found:
+                detail_data['description'] = self._text(found[0])
+            else:
+                missed.add('description')
+
+        if self.images is not None:
+            for img in self.images(root):
+                src = img.get('src') or img.get('data-src')
+                if src:
+                    detail_data['images'].append(src)
+            if not detail_data['images']:
+                missed.add('images')
+        return detail_data, missed
+
+
+class DetailExtractor:
+    """Разбор страниц дверей с кэшированием шаблона"""
+
+    def __init__(self):
+        self.template: Optional[DetailTemplate] = None
+        # fallback - страницы, где часть пришлось искать общим поиском
+        self.stats = {'template': 0, 'fallback': 0, 'generic': 0, 'learned': 0}
+        self._lock = threading.Lock()
+
+    def extract(self, html) -> Dict:
+        template = self.template
+        if template is None:
+            # Первая страница - общий поиск и обучение
+            detail_data, seen = extract_generic(BeautifulSoup(html, 'lxml'))
+            self._learn(seen, 'generic')
+            return detail_data
+
+        detail_data, missed = template.extract(parse_document(html))
+        if not missed:
+            with self._lock:
+                self.stats['template'] += 1
+            return detail_data
+
+        # Промах по части - только она ищется общим поиском и переучивается
+        found, seen = extract_generic(BeautifulSoup(html, 'lxml'), missed)
+        for part, value in found.items():
+            if value:
+                detail_data[part] = value
+        self._learn(seen, 'fallback')
+        return detail_data
+
+    def _learn(self, seen: Dict, kind: str):
+        with self._lock:
+            self.stats[kind] += 1
+            learned = DetailTemplate.learn(seen, self.template)
+            if learned is not None:
+                self.template = learned
+                self.stats['learned'] += 1
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Извлечение данных из DOM одним вызовом execute_script.
+
+Каждый elem.text / get_attribute / find_element - отдельный HTTP-запрос к
+chromedriver. Здесь все карточки страницы собираются одним скриптом и
+возвращаются списком словарей:
+
+    {'text': ..., 'href': ..., 'src': ..., 'data_src': ..., 'img': ...}
+
+text - видимый текст (innerText, как у WebElement.text), href и src -
+абсолютные URL (как отдает get_attribute), img - src или data-src первой
+картинки внутри карточки.
+
+cards_from_html / first_image_from_html - то же по сохраненному HTML
+(page_source из снимка, --replay), без браузера.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+
+CARDS_JS = """
+var limit = arguments[1];
+var nodes = document.querySelectorAll(arguments[0]);
+var cards = [];
+for (var i = 0; i < nodes.length && (!limit || cards.length < limit); i++) {
+  var el = nodes[i];
+  var img = el.querySelector('img');
+  var src = img ? (img.src || null) : null;
+  var dataSrc = img ? img.getAttribute('data-src') : null;
+  cards.push({
+    text: (el.innerText || '').trim(),
+    href: el.href || el.getAttribute('href'),
+    src: src,
+    data_src: dataSrc,
+    img: src || dataSrc
+  });
+}
+return cards;
+"""
+
+FIRST_IMAGE_JS = """
+var found = null;
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+  var img = document.querySelector(selectors[i]);
+  if (!img) continue;
+  found = img.src || img.getAttribute('data-src');
+  if (found && found.indexOf('http') === 0) break;
+}
+return found;
+"""
+
+
+def extract_cards(driver, selector: str, limit: Optional[int] = None) -> List[Dict]:
+    """Все карточки по CSS-селектору за один запрос к браузеру"""
+    return driver.execute_script(CARDS_JS, selector, limit or 0) or []
+
+
+def first_image(driver, selectors: Iterable[str]) -> Optional[str]:
+    """
+    URL первой картинки по списку селекторов (по убыванию точности).
+    Как и поэлементный поиск: первый http-URL, иначе последний найденный.
+    """
+    return driver.execute_script(FIRST_IMAGE_JS, list(selectors))
+
+
+def cards_from_html(html, selector: str, base_url: str, limit: Optional[int] = None) -> List[Dict]:
+    """extract_cards по HTML страницы: те же поля, URL - относительно base_url"""
+    cards = []
+    for el in BeautifulSoup(html, 'lxml').select(selector, limit=limit or None):
+        img = el.find('img')
+        src = urljoin(base_url, img['src']) if img is not None and img.get('src') else None
+        data_src = img.get('data-src') if img is not None else None
+        href = el.get('href')
+        cards.append({
+            'text': el.get_text(' ', strip=True),
+            'href': urljoin(base_url, href) if href else None,
+            'src': src,
+            'data_src': data_src,
+            'img': src or data_src,
+        })
+    return cards
+
+
+def first_image_from_html(html, selectors: Iterable[str], base_url: str) -> Optional[str]:
+    """first_image по HTML страницы"""
+    soup = BeautifulSoup(html, 'lxml')
+    found = None
+    for selector in selectors:
+        img = soup.select_one(selector)
+        if img is None:
+            continue
+        found = urljoin(base_url, img['src']) if img.get('src') else img.get('data-src')
+        if found and found.startswith('http'):
+            break
+    return found
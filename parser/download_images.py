@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Скачивает изображения для существующих данных каталога"""
 
-import requests
 import json
 from pathlib import Path
-import time
+
+from image_downloader import ImageDownloader
+from rate_limiter import HostRateLimiter
 
 # Папка для изображений
 IMAGES_DIR = Path('../public/catalog-images')
@@ -39,40 +40,30 @@ doors_to_download = [
     {"id": 8, "name": "SKYLAB", "search": "skylab"},
 ]
 
-def download_image(url, filename):
-    """Скачивает изображение"""
-    try:
-        print(f"   📥 Загружаю: {url[:60]}...")
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code == 200:
-            filepath = IMAGES_DIR / filename
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            print(f"   ✅ Сохранено: {filepath}")
-            return True
-        else:
-            print(f"   ❌ Ошибка: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"   ⚠️  {str(e)[:50]}")
-        return False
+downloader = ImageDownloader(IMAGES_DIR, workers=8, headers=HEADERS, timeout=10,
+                             rate_limiter=HostRateLimiter(rate=5.0, burst=5))
 
 # Скачиваем плейсхолдеры
 print("📸 Создаю изображения для каталога...\n")
 
+# Плейсхолдер с текстом для каждой двери
+jobs = [
+    (f"https://via.placeholder.com/800x600/1a1a26/60a5fa?text={door['search'].upper()}",
+     f"door-{door['id']:02d}.jpg")
+    for door in doors_to_download
+]
+
 success = 0
-for door in doors_to_download:
-    filename = f"door-{door['id']:02d}.jpg"
-    print(f"{door['id']}. {door['name']}")
-    
-    # Пробуем скачать плейсхолдер с текстом
-    url = f"https://via.placeholder.com/800x600/1a1a26/60a5fa?text={door['search'].upper()}"
-    
-    if download_image(url, filename):
+for door, result in zip(doors_to_download, downloader.download_many(jobs)):
+    if result['ok']:
         success += 1
-    
-    time.sleep(0.2)
-    print()
+        print(f"{door['id']}. {door['name']}: ✅ {result['path']}")
+    else:
+        print(f"{door['id']}. {door['name']}: ❌ {result['error']}")
+
+print()
+downloader.print_report()
+print()
 
 print("="*60)
 print(f"✅ Загружено: {success}/{len(doors_to_download)}")
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Пул браузеров для параллельного обхода страниц.
+
+Каждый поток пула владеет своим Chrome (WebDriver не потокобезопасен) и
+берет задачи из общей очереди, поэтому медленная страница не тормозит
+остальные. Перед каждой задачей драйвер проверяется простым
+execute_script; упавший или зависший Chrome перезапускается, а задача
+повторяется на свежем драйвере.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from browser import create_driver
+
+
+class DriverPool:
+    """
+    pool.map(fn, items) вызывает fn(driver, item) для всех items и
+    возвращает список (результат, ошибка) в порядке items.
+    """
+
+    def __init__(self, size: int = 4, factory: Callable = create_driver, retries: int = 1,
+                 max_pages_per_driver: Optional[int] = None):
+        self.size = max(1, size)
+        self.factory = factory
+        self.retries = retries
+        # Долгоживущий Chrome пухнет по памяти - можно перезапускать через N страниц
+        self.max_pages_per_driver = max_pages_per_driver
+
+        self._drivers: List = [None] * self.size
+        self._pages = [0] * self.size
+        self._lock = threading.Lock()
+        self.stats = {'pages': 0, 'failed': 0, 'restarts': 0, 'health_failures': 0}
+
+    # --- драйверы ---
+
+    def _healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _quit(self, slot: int):
+        driver, self._drivers[slot] = self._drivers[slot], None
+        self._pages[slot] = 0
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _driver(self, slot: int):
+        """Живой драйвер для слота: создается лениво, больной перезапускается"""
+        driver = self._drivers[slot]
+        if driver is not None:
+            expired = (self.max_pages_per_driver is not None
+                       and self._pages[slot] >= self.max_pages_per_driver)
+            if expired or not self._healthy(driver):
+                with self._lock:
+                    self.stats['restarts'] += 1
+                    if not expired:
+                        self.stats['health_failures'] += 1
+                self._quit(slot)
+                driver = None
+        if driver is None:
+            driver = self.factory()
+            self._drivers[slot] = driver
+        return driver
+
+    # --- обход ---
+
+    def _run(self, slot: int, fn: Callable, item) -> Tuple:
+        error = None
+        for _ in range(self.retries + 1):
+            try:
+                driver = self._driver(slot)
+                result = fn(driver, item)
+                self._pages[slot] += 1
+                with self._lock:
+                    self.stats['pages'] += 1
+                return result, None
+            except Exception as e:
+                error = e
+                # Ошибка могла оставить Chrome в неизвестном состоянии
+                if self._drivers[slot] is not None and not self._healthy(self._drivers[slot]):
+                    with self._lock:
+                        self.stats['restarts'] += 1
+                        self.stats['health_failures'] += 1
+                    self._quit(slot)
+        with self._lock:
+            self.stats['failed'] += 1
+        return None, error
+
+    def _worker(self, slot: int, tasks: queue.Queue, fn: Callable, results: List):
+        while True:
+            try:
+                index, item = tasks.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = self._run(slot, fn, item)
+
+    def map(self, fn: Callable, items: Iterable) -> List[Tuple]:
+        items = list(items)
+        tasks = queue.Queue()
+        for index, item in enumerate(items):
+            tasks.put((index, item))
+        results: List[Tuple] = [(None, None)] * len(items)
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._worker, args=(slot, tasks, fn, results), daemon=True)
+            for slot in range(min(self.size, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats['seconds'] = time.perf_counter() - start
+        return results
+
+    def close(self):
+        for slot in range(self.size):
+            self._quit(slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_report(self):
+        s = self.stats
+        print(f"🌐 Пул браузеров ({self.size}): страниц {s['pages']}, ошибок {s['failed']}, "
+              f"перезапусков {s['restarts']}, {s.get('seconds', 0):.1f} s")
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Выгрузка каталога сразу в несколько форматов: JSON, CSV, Excel, catalogData.js.
+
+Каждая запись приводится к строке таблицы один раз (характеристики -
+отдельные колонки characteristics.<название>, списки - через '; ', цена и
+флаги - числами и bool), после чего пара (запись, строка) раздается
+писателям форматов. Каждый писатель работает в своем потоке и читает из
+своей ограниченной очереди, так что в памяти не больше queue_size записей
+на формат. Excel пишется в write-only режиме openpyxl: строки уходят на
+диск, книга целиком не строится.
+
+print_report() показывает, сколько времени каждый писатель реально писал
+(без ожидания очереди) - видно, какой формат тормозит выгрузку.
+
+    exporter = Exporter(Exporter.scan(records))
+    exporter.export(records, 'labirint_catalog', formats=('json', 'csv', 'xlsx'))
+    exporter.print_report()
+"""
+
+import csv
+import json
+import queue
+import textwrap
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from catalog_js import DEFAULT_JS_PATH, CatalogWriter
+
+
+FORMATS = ('json', 'csv', 'xlsx', 'js')
+
+CHARACTERISTICS_PREFIX = 'characteristics.'
+# Колонки с числовым форматом в Excel
+NUMBER_FORMATS = {'price': '#,##0', 'old_price': '#,##0'}
+
+_DONE = object()
+
+
+def cell_value(value):
+    """Значение ячейки CSV/Excel: числа и bool как есть, списки через '; ', словари - JSON"""
+    if isinstance(value, (list, tuple)):
+        if all(isinstance(item, str) for item in value):
+            return '; '.join(value)
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class _JsonWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[')
+        self._count = 0
+
+    def write(self, record: Dict, row: Tuple):
+        text = json.dumps(record, ensure_ascii=False, indent=2, default=str)
+        self._file.write((',\n' if self._count else '\n') + textwrap.indent(text, '  '))
+        self._count += 1
+
+    def close(self):
+        self._file.write('\n]\n' if self._count else ']\n')
+        self._file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: List[str]):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, record: Dict, row: Tuple):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str, columns: List[str]):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        self.path = path
+        self._cell = WriteOnlyCell
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet('Каталог')
+        self._formats = {i: NUMBER_FORMATS[c] for i, c in enumerate(columns) if c in NUMBER_FORMATS}
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(self._sheet, value=column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet.freeze_panes = 'A2'
+
+    def write(self, record: Dict, row: Tuple):
+        if not self._formats:
+            self._sheet.append(row)
+            return
+        cells = list(row)
+        for i, number_format in self._formats.items():
+            if isinstance(cells[i], (int, float)):
+                cell = self._cell(self._sheet, value=cells[i])
+                cell.number_format = number_format
+                cells[i] = cell
+        self._sheet.append(cells)
+
+    def close(self):
+        self._workbook.save(self.path)
+
+
+class _JsWriter:
+    """catalogData.js для фронтенда (см. catalog_js)"""
+
+    def __init__(self, path, **options):
+        self._writer = CatalogWriter(path, **options)
+        self.path = str(self._writer.path)
+
+    def write(self, record: Dict, row: Tuple):
+        self._writer.add(record)
+
+    def close(self):
+        self._writer.close()
+
+
+class Exporter:
+    """
+    columns - колонки CSV/Excel (Exporter.scan собирает их по записям)
+    queue_size - сколько записей может ждать каждого писателя
+    js_options - split/minify для catalogData.js (см. catalog_js)
+    """
+
+    def __init__(self, columns: List[str], queue_size: int = 256, js_options: Optional[Dict] = None):
+        self.columns = list(columns)
+        self.queue_size = queue_size
+        self.js_options = js_options or {}
+        self.timings: Dict[str, float] = {}
+        self.files: Dict[str, str] = {}
+        self.wall = 0.0
+        self.count = 0
+
+    @staticmethod
+    def scan(records: Iterable[Dict]) -> List[str]:
+        """Колонки в порядке появления; характеристики - отдельными колонками"""
+        columns: Dict[str, None] = {}
+        characteristics: Dict[str, None] = {}
+        for record in records:
+            for key, value in record.items():
+                if key == 'characteristics' and isinstance(value, dict):
+                    characteristics.update(dict.fromkeys(value))
+                else:
+                    columns[key] = None
+        return list(columns) + [CHARACTERISTICS_PREFIX + key for key in characteristics]
+
+    def row(self, record: Dict) -> Tuple:
+        characteristics = record.get('characteristics') or {}
+        values = []
+        for column in self.columns:
+            if column.startswith(CHARACTERISTICS_PREFIX):
+                values.append(characteristics.get(column[len(CHARACTERISTICS_PREFIX):]))
+            else:
+                values.append(cell_value(record.get(column)))
+        return tuple(values)
+
+    def _open(self, fmt: str, prefix: str, js_path: Optional[str]):
+        if fmt == 'json':
+            return _JsonWriter(f'{prefix}.json')
+        if fmt == 'csv':
+            return _CsvWriter(f'{prefix}.csv', self.columns)
+        if fmt == 'xlsx':
+            return _XlsxWriter(f'{prefix}.xlsx', self.columns)
+        if fmt == 'js':
+            return _JsWriter(js_path or DEFAULT_JS_PATH, **self.js_options)
+        raise ValueError(f"Неизвестный формат: {fmt} (есть: {', '.join(FORMATS)})")
+
+    def _run(self, fmt: str, writer, items: queue.Queue, errors: Dict[str, BaseException]):
+        busy = 0.0
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if fmt in errors:
+                continue  # формат уже сломан: только освобождаем очередь
+            start = time.perf_counter()
+            try:
+                writer.write(*item)
+            except Exception as e:
+                errors[fmt] = e
+            busy += time.perf_counter() - start
+        start = time.perf_counter()
+        try:
+            writer.close()
+        except Exception as e:
+            errors.setdefault(fmt, e)
+        self.timings[fmt] += busy + time.perf_counter() - start
+
+    def export(self, records: Iterable[Dict], prefix: str,
+               formats: Iterable[str] = ('json', 'csv', 'xlsx'),
+               js_path: Optional[str] = None) -> Dict[str, str]:
+        """
+        Все форматы одновременно за один проход по records.
+        Возвращает {формат: файл}; ошибка любого писателя пробрасывается
+        после того, как остальные закончат.
+        """
+        wall_start = time.perf_counter()
+        writers = {}
+        for fmt in dict.fromkeys(formats):
+            start = time.perf_counter()
+            writers[fmt] = self._open(fmt, prefix, js_path)
+            self.timings[fmt] = time.perf_counter() - start
+
+        errors: Dict[str, BaseException] = {}
+        queues = {fmt: queue.Queue(maxsize=self.queue_size) for fmt in writers}
+        threads = [threading.Thread(target=self._run, args=(fmt, writer, queues[fmt], errors),
+                                    name=f'export-{fmt}', daemon=True)
+                   for fmt, writer in writers.items()]
+        for thread in threads:
+            thread.start()
+
+        self.timings['rows'] = 0.0
+        try:
+            for record in records:
+                start = time.perf_counter()
+                item = (record, self.row(record))
+                self.timings['rows'] += time.perf_counter() - start
+                for items in queues.values():
+                    items.put(item)
+                self.count += 1
+        finally:
+            for items in queues.values():
+                items.put(_DONE)
+            for thread in threads:
+                thread.join()
+        self.wall = time.perf_counter() - wall_start
+
+        if errors:
+            fmt, error = next(iter(errors.items()))
+            raise RuntimeError(f"Выгрузка {fmt} не удалась: {error}") from error
+        self.files = {fmt: writer.path for fmt, writer in writers.items()}
+        for path in self.files.values():
+            print(f"💾 {path}")
+        return self.files
+
+    def print_report(self):
+        parts = [f"{fmt} {seconds * 1000:.0f} мс" for fmt, seconds in self.timings.items()]
+        print(f"⏱️  Выгрузка {self.count} записей за {self.wall * 1000:.0f} мс: " + ', '.join(parts))
+
+
+def export_records(records_factory, prefix: str, formats: Iterable[str] = ('json', 'csv', 'xlsx'),
+                   js_path=None, js_options: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Колонки по первому проходу, выгрузка - по второму.
+    records_factory() каждый раз возвращает новый итератор записей
+    (например, lambda: iter_jsonl(path)), так что весь каталог в памяти не держится.
+    """
+    exporter = Exporter(Exporter.scan(records_factory()), js_options=js_options)
+    files = exporter.export(records_factory(), prefix, formats, js_path)
+    exporter.print_report()
+    return files
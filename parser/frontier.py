@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Очередь обхода сайта (frontier).
+
+- normalize_url: https, хост в нижнем регистре, без www, фрагмента,
+  utm/yclid/gclid-меток и завершающего слэша, параметры отсортированы -
+  одна страница дает один ключ
+- classify_url: тип страницы и приоритет: коллекции, затем разделы
+  каталога, затем фильтры и пагинация, затем информационные страницы
+- Frontier: дедупликация за O(1) (set), очередь с приоритетом (heap),
+  метрики: размер очереди, повторные ссылки, отброшенные по глубине
+- SingleFlight: один URL за запуск загружается один раз, параллельные
+  запросы того же URL ждут первую загрузку; тела страниц не копятся
+- crawl: ограниченный обход в ширину по разделам, фильтрам и пагинации
+"""
+
+import heapq
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+
+BASE_URL = 'https://labirintdoors.ru'
+
+TRACKING_PARAMS = {'yclid', 'gclid', 'fbclid', 'ysclid', '_openstat', 'from', 'ref', 'clear_cache'}
+PAGINATION_RE = re.compile(r'(^|&)(PAGEN_\d+|page)=|/page-\d+$', re.IGNORECASE)
+SKIP_SCHEMES = ('tel:', 'mailto:', 'javascript:', 'whatsapp:', 'viber:')
+SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.pdf', '.zip', '.doc', '.docx', '.xls', '.xlsx')
+
+# Меньше - раньше
+PRIORITY = {
+    'collection': 0,
+    'category': 1,
+    'filter': 2,
+    'pagination': 2,
+    'info': 3,
+}
+LISTING_KINDS = ('category', 'filter', 'pagination')
+
+
+def normalize_url(url: str, base: str = BASE_URL) -> Optional[str]:
+    """Канонический вид URL или None для ссылок, которые не ведут на страницу"""
+    if not url:
+        return None
+    url = url.strip()
+    if url.startswith(SKIP_SCHEMES) or url.startswith('#'):
+        return None
+
+    parts = urlsplit(urljoin(base + '/', url))
+    if parts.scheme not in ('http', 'https'):
+        return None
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS]
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+def classify_url(url: str) -> str:
+    """Тип страницы: collection, category, filter, pagination или info"""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split('/') if s]
+    if PAGINATION_RE.search(parts.query) or PAGINATION_RE.search(parts.path):
+        return 'pagination'
+    if parts.query or 'filter' in segments:
+        return 'filter'
+    if len(segments) == 2 and segments[0] == 'katalog':
+        return 'collection'
+    if len(segments) == 1 and re.search(r'katalog|dver|sale', segments[0]):
+        return 'category'
+    return 'info'
+
+
+def extract_links(html, base_url: str) -> List[str]:
+    """Все href страницы (lxml, без построения дерева BeautifulSoup)"""
+    from html_backends import parse_document
+
+    root = parse_document(html)
+    return [urljoin(base_url, href) for href in root.xpath('//a/@href')]
+
+
+class Frontier:
+    """Очередь URL с дедупликацией и приоритетами"""
+
+    def __init__(self, allowed_hosts: Iterable[str] = ('labirintdoors.ru',), max_depth: int = 2,
+                 queue_kinds: Iterable[str] = LISTING_KINDS, classify: Callable = classify_url):
+        self.allowed_hosts = set(allowed_hosts)
+        self.max_depth = max_depth
+        self.queue_kinds = set(queue_kinds)
+        self.classify = classify
+
+        self._heap: List[Tuple] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        # url -> (тип, глубина) для всего найденного, в том числе не поставленного в очередь
+        self.discovered: Dict[str, Tuple[str, int]] = {}
+        self.metrics = Counter()
+
+    def push(self, url: str, depth: int = 0, force: bool = False) -> bool:
+        """
+        Добавление ссылки. Возвращает True, если URL новый и встал в очередь.
+        force - поставить в очередь независимо от типа (стартовые страницы).
+        """
+        key = normalize_url(url)
+        with self._lock:
+            self.metrics['links'] += 1
+            if key is None:
+                self.metrics['skipped_invalid'] += 1
+                return False
+            if urlsplit(key).hostname not in self.allowed_hosts:
+                self.metrics['skipped_external'] += 1
+                return False
+            if urlsplit(key).path.lower().endswith(SKIP_EXTENSIONS):
+                self.metrics['skipped_files'] += 1
+                return False
+            if key in self.discovered:
+                self.metrics['dedup_hits'] += 1
+                return False
+
+            kind = 'category' if force else self.classify(key)
+            self.discovered[key] = (kind, depth)
+            self.metrics[f'found_{kind}'] += 1
+            if not force and (kind not in self.queue_kinds or depth > self.max_depth):
+                if kind in self.queue_kinds:
+                    self.metrics['skipped_depth'] += 1
+                return False
+
+            heapq.heappush(self._heap, (PRIORITY.get(kind, 9), depth, self._seq, key, kind))
+            self._seq += 1
+            self.metrics['enqueued'] += 1
+            self.metrics['peak_size'] = max(self.metrics['peak_size'], len(self._heap))
+            return True
+
+    def pop(self) -> Optional[Tuple[str, int, str]]:
+        """Следующий URL по приоритету: (url, глубина, тип) или None"""
+        with self._lock:
+            if not self._heap:
+                return None
+            _, depth, _, url, kind = heapq.heappop(self._heap)
+            return url, depth, kind
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def urls(self, kind: str) -> List[str]:
+        """Найденные URL данного типа в порядке обнаружения"""
+        return [url for url, (k, _) in self.discovered.items() if k == kind]
+
+    def print_report(self):
+        m = self.metrics
+        found = ', '.join(f"{kind} {m[f'found_{kind}']}" for kind in PRIORITY if m[f'found_{kind}'])
+        print(f"🧭 Ссылок: {m['links']}, уникальных страниц: {len(self.discovered)} ({found})")
+        print(f"   повторов: {m['dedup_hits']}, внешних: {m['skipped_external']}, "
+              f"за пределом глубины: {m['skipped_depth']}, в очереди сейчас: {len(self)}, "
+              f"максимум: {m['peak_size']}")
+
+
+class SingleFlight:
+    """
+    Загрузка каждого URL не больше одного раза за запуск.
+    Параллельный запрос того же URL ждет уже идущую загрузку;
+    неудачная загрузка (None или исключение) не запоминается.
+
+    Результат держится, только пока его ждут параллельные запросы, и в
+    небольшом LRU на keep последних URL (keep=None - все результаты): тела
+    страниц не копятся за весь обход. Для дедупликации хранится только
+    множество загруженных URL; повторный запрос URL, вытесненного из LRU,
+    загружает его снова (metrics['refetched']).
+    """
+
+    def __init__(self, fetch: Optional[Callable[[str], object]] = None, keep: Optional[int] = 16):
+        self.fetch = fetch
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._running: Dict[str, Future] = {}
+        self._results: 'OrderedDict[str, object]' = OrderedDict()
+        self.done = set()
+        self.metrics = Counter()
+
+    def get(self, url: str, fetch: Optional[Callable[[str], object]] = None):
+        key = normalize_url(url) or url
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.metrics['cached'] += 1
+                return self._results[key]
+            future = self._running.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._running[key] = future
+                self.metrics['refetched' if key in self.done else 'fetched'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = (fetch or self.fetch)(url)
+        except BaseException as e:
+            with self._lock:
+                del self._running[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # Ждущие уже держат future; после set_result ссылка на результат остается только в LRU
+            del self._running[key]
+            if result is not None:
+                self.done.add(key)
+                if self.keep is None or self.keep > 0:
+                    self._results[key] = result
+                    if self.keep is not None and len(self._results) > self.keep:
+                        self._results.popitem(last=False)
+        future.set_result(result)
+        return result
+
+
+def crawl(fetch: Callable[[str], object], seeds: Iterable[str], frontier: Optional[Frontier] = None,
+          max_pages: int = 200, workers: int = 4,
+          on_page: Optional[Callable[[str, object], None]] = None) -> Tuple[Dict[str, object], Frontier]:
+    """
+    Ограниченный обход в ширину: загружаются страницы из очереди frontier
+    (по умолчанию разделы, фильтры и пагинация), ссылки с них снова идут
+    во frontier. Остановка - очередь пуста или загружено max_pages страниц.
+    on_page(url, html) вызывается для каждой страницы сразу после загрузки,
+    пока остальные еще грузятся (так разбор идет параллельно с обходом).
+    Возвращает {url: html} загруженных страниц и сам frontier; с on_page
+    страницы не накапливаются (словарь пуст, счет - в frontier.metrics).
+    """
+    frontier = frontier or Frontier()
+    for seed in seeds:
+        frontier.push(seed, 0, force=True)
+
+    pages: Dict[str, object] = {}
+    fetched = 0
+    running: Dict[Future, Tuple[str, int]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(running) < workers and fetched + len(running) < max_pages:
+                task = frontier.pop()
+                if task is None:
+                    break
+                url, depth, _ = task
+                running[executor.submit(fetch, url)] = (url, depth)
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                url, depth = running.pop(future)
+                try:
+                    html = future.result()
+                except Exception as e:
+                    print(f"⚠️  {url}: {str(e)[:80]}")
+                    frontier.metrics['failed'] += 1
+                    continue
+                if not html:
+                    frontier.metrics['failed'] += 1
+                    continue
+                fetched += 1
+                frontier.metrics['fetched'] += 1
+                if on_page is None:
+                    pages[url] = html
+                for link in extract_links(html, url):
+                    frontier.push(link, depth + 1)
+                if on_page is not None:
+                    on_page(url, html)
+    return pages, frontier
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Бэкенды разбора страницы каталога.
+
+Все бэкенды возвращают одинаковые "сырые" карточки:
+    {'href': ..., 'text': ..., 'img_src': ...}
+где text совпадает с BeautifulSoup get_text(strip=True), а img_src - это
+первое непустое из src / data-src / data-lazy первого <img> в карточке.
+
+    soup     - полное дерево BeautifulSoup (как раньше)
+    strainer - BeautifulSoup + SoupStrainer, строятся только карточки
+    lxml     - lxml.html + предкомпилированный XPath, без BeautifulSoup
+
+lxml сам по байтам без <meta charset> читает latin-1, поэтому байты
+сначала декодируются так же, как это делает BeautifulSoup (decode_html),
+а текст <script>/<style>/<template> в text не входит - как в get_text.
+"""
+
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+CARD_TAG = 'a'
+CARD_CLASS = 'product-sections-01-item'
+IMG_ATTRS = ('src', 'data-src', 'data-lazy')
+
+
+def _card_from_tag(item) -> Dict:
+    img_src = None
+    img = item.find('img')
+    if img:
+        img_src = next((img.get(attr) for attr in IMG_ATTRS if img.get(attr)), None)
+    return {
+        'href': item.get('href', ''),
+        'text': item.get_text(strip=True),
+        'img_src': img_src,
+    }
+
+
+def cards_from_soup(soup: BeautifulSoup) -> List[Dict]:
+    """Карточки из уже построенного дерева BeautifulSoup"""
+    return [_card_from_tag(item) for item in soup.find_all(CARD_TAG, class_=CARD_CLASS)]
+
+
+def soup_backend(html) -> List[Dict]:
+    return cards_from_soup(BeautifulSoup(html, 'lxml'))
+
+
+def _has_card_class(value) -> bool:
+    # SoupStrainer получает class одной строкой, find_all - списком
+    if not value:
+        return False
+    if isinstance(value, str):
+        value = value.split()
+    return CARD_CLASS in value
+
+
+def strainer_backend(html) -> List[Dict]:
+    strainer = SoupStrainer(CARD_TAG, class_=_has_card_class)
+    return cards_from_soup(BeautifulSoup(html, 'lxml', parse_only=strainer))
+
+
+# Видимый текст: без содержимого script/style/template (BeautifulSoup get_text их пропускает)
+TEXT_XPATH = './/text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+
+_xpath_cache = {}
+
+
+def _xpaths():
+    if not _xpath_cache:
+        from lxml import etree
+        _xpath_cache['cards'] = etree.XPath(
+            f"//{CARD_TAG}[contains(concat(' ', normalize-space(@class), ' '), ' {CARD_CLASS} ')]"
+        )
+        _xpath_cache['text'] = etree.XPath(TEXT_XPATH)
+        _xpath_cache['img'] = etree.XPath('.//img')
+    return _xpath_cache
+
+
+def decode_html(html, encoding: Optional[str] = None) -> str:
+    """
+    Байты страницы -> str. encoding - кодировка ответа, если известна;
+    иначе как в BeautifulSoup: BOM, <meta charset>, определение, utf-8.
+    """
+    if isinstance(html, str):
+        return html
+    if encoding:
+        return html.decode(encoding, errors='replace')
+    from bs4 import UnicodeDammit
+
+    dammit = UnicodeDammit(html, is_html=True)
+    if dammit.unicode_markup is None:
+        return html.decode('utf-8', errors='replace')
+    return dammit.unicode_markup
+
+
+def parse_document(html, encoding: Optional[str] = None):
+    """Дерево lxml.html из байтов или str с правильной кодировкой"""
+    import lxml.html
+
+    text = decode_html(html, encoding)
+    try:
+        return lxml.html.document_fromstring(text)
+    except ValueError:
+        # str с <?xml encoding=...?> lxml не принимает - отдаем уже перекодированные байты
+        return lxml.html.document_fromstring(text.encode('utf-8'),
+                                             parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+
+def visible_text(elem) -> str:
+    """Текст элемента как get_text(strip=True) в BeautifulSoup"""
+    return ''.join(s.strip() for s in _xpaths()['text'](elem))
+
+
+def lxml_backend(html) -> List[Dict]:
+    xp = _xpaths()
+    root = parse_document(html)
+    cards = []
+    for item in xp['cards'](root):
+        text = visible_text(item)
+        img_src = None
+        imgs = xp['img'](item)
+        if imgs:
+            img_src = next((imgs[0].get(attr) for attr in IMG_ATTRS if imgs[0].get(attr)), None)
+        cards.append({
+            'href': item.get('href', ''),
+            'text': text,
+            'img_src': img_src,
+        })
+    return cards
+
+
+BACKENDS: Dict[str, Callable] = {
+    'soup': soup_backend,
+    'strainer': strainer_backend,
+    'lxml': lxml_backend,
+}
+DEFAULT_BACKEND = 'lxml'
+
+
+def get_backend(name: Optional[str] = None) -> Callable:
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд '{name}', доступны: {', '.join(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def extract_cards(html, backend: Optional[str] = None) -> List[Dict]:
+    return get_backend(backend)(html)
+
+
+def benchmark(html, repeat: int = 5) -> Dict[str, Dict]:
+    """
+    Время разбора и пик памяти Python-аллокаций (tracemalloc) по бэкендам.
+    Память самого libxml2 tracemalloc не видит.
+    """
+    results = {}
+    reference = None
+    for name, backend in BACKENDS.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cards = backend(html)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        backend(html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if reference is None:
+            reference = cards
+        results[name] = {
+            'best_ms': min(timings) * 1000,
+            'peak_kb': peak / 1024,
+            'cards': len(cards),
+            'identical': cards == reference,
+        }
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'page.html'
+    with open(path, 'rb') as f:
+        data = f.read()
+    print(f"📄 {path}: {len(data):,} bytes\n")
+    results = benchmark(data)
+    for name, r in results.items():
+        print(f"   {name:9s} {r['best_ms']:8.1f} ms  пик {r['peak_kb']:9.0f} KB  "
+              f"карточек {r['cards']}  {'✅' if r['identical'] else '❌ отличается'}")
+    if not any(r['cards'] for r in results.values()):
+        print(f"\n⚠️  На странице нет карточек {CARD_TAG}.{CARD_CLASS}: "
+              f"сравнение бэкендов ничего не проверяет, нужна страница каталога с карточками")
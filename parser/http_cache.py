@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Дисковый HTTP-кэш с условными запросами (ETag / Last-Modified)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '.http_cache'
+# Вытеснение освобождает место с запасом, чтобы не сканировать кэш на каждой записи
+EVICT_TO = 0.9
+
+
+class HttpCache:
+    """
+    Хранит тело ответа и валидаторы (ETag, Last-Modified) на диске.
+    При повторном запросе отправляет If-None-Match / If-Modified-Since,
+    ответ 304 отдается с диска. Размер ограничен, вытесняются давно
+    не использованные записи (LRU по времени доступа).
+
+    Общий размер ведется в памяти (каталог сканируется один раз при
+    создании), так что запись - O(1). Каталог сканируется только когда
+    размер превысил max_bytes, и тогда вытесняется до EVICT_TO * max_bytes.
+    Сканирование идет вне общей блокировки - остальные потоки продолжают
+    читать и писать.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self.total_bytes = sum(size for _, size, _ in self._scan())
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.meta.json"
+
+    def _load(self, url: str) -> Optional[Dict]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not body_path.exists():
+            return None
+        return meta
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Заголовки для условного запроса по сохраненным валидаторам"""
+        meta = self._load(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def read(self, url: str) -> Optional[bytes]:
+        """Тело из кэша с обновлением времени доступа"""
+        body_path, _ = self._paths(url)
+        try:
+            body = body_path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return body
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        """Сохранение ответа; без валидаторов кэшировать нет смысла"""
+        if not etag and not last_modified:
+            return
+        body_path, meta_path = self._paths(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'size': len(body)}
+        # Данные пишутся во временные файлы без блокировки; замена и учет
+        # старого размера - под одной блокировкой, иначе параллельная запись
+        # того же ключа вычтет старый размер дважды
+        body_tmp = self._write_tmp(body)
+        try:
+            meta_tmp = self._write_tmp(json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        except BaseException:
+            os.unlink(body_tmp)
+            raise
+        with self._lock:
+            old_size = self._size(body_path)
+            os.replace(body_tmp, body_path)
+            os.replace(meta_tmp, meta_path)
+            self.total_bytes += len(body) - old_size
+            self.stats['stored'] += 1
+            over = self.total_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _write_tmp(self, data: bytes) -> str:
+        """Временный файл в папке кэша (для атомарной замены через os.replace)"""
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            return tmp
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _scan(self):
+        """(время доступа, размер, путь) всех тел в кэше"""
+        entries = []
+        for body_path in self.cache_dir.glob('*.body'):
+            try:
+                st = body_path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, body_path))
+        return entries
+
+    def _evict(self):
+        """Удаление самых старых по доступу записей, пока размер не опустится до EVICT_TO * max_bytes"""
+        # Вытесняет один поток; остальные не ждут - место освободится и так
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            target = int(self.max_bytes * EVICT_TO)
+            # Пока шло вытеснение, другие потоки могли дописать новые записи
+            while self.total_bytes > self.max_bytes:
+                evicted = 0
+                for _, _, body_path in sorted(self._scan()):
+                    meta_path = body_path.with_name(body_path.name[:-len('.body')] + '.meta.json')
+                    with self._lock:
+                        if self.total_bytes <= target:
+                            break
+                        size = self._size(body_path)
+                        for path in (body_path, meta_path):
+                            try:
+                                path.unlink()
+                            except OSError:
+                                pass
+                        self.total_bytes -= size
+                        self.stats['evicted'] += 1
+                        evicted += 1
+                if not evicted:
+                    break
+        finally:
+            self._evict_lock.release()
+
+    def get(self, session, url: str, headers: Optional[Dict] = None, timeout: int = 30) -> bytes:
+        """GET через кэш: условный запрос, 304 отдается с диска"""
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(url))
+
+        response = session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304:
+            body = self.read(url)
+            if body is not None:
+                with self._lock:
+                    self.stats['hits'] += 1
+                    self.stats['bytes_saved'] += len(body)
+                return body
+            # Запись пропала между проверкой и ответом - запрашиваем заново
+            response = session.get(url, headers=headers, timeout=timeout)
+
+        response.raise_for_status()
+        body = response.content
+        with self._lock:
+            self.stats['misses'] += 1
+        self.store(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Загрузка страниц каталога: сначала requests, браузер - только при нужде.
+
+Статический HTML проверяется на ожидаемую разметку: карточки
+a.product-sections-01-item и реальные адреса фото (src / data-src, а не
+data:-заглушка ленивой загрузки). Если карточек нет или у слишком многих
+нет фото, именно этот URL повторно открывается в headless Chrome. Браузер
+запускается при первой такой странице и дальше переиспользуется.
+
+В браузер уходят только листинги (classify_url: раздел, фильтр,
+пагинация) - на информационных страницах карточек и не должно быть.
+Неудачная загрузка (404, сеть) не эскалируется: браузер ее не исправит.
+
+В конце работы print_report() показывает, сколько страниц ушло в браузер
+и почему.
+"""
+
+import threading
+from collections import Counter
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from browser import create_driver
+from frontier import LISTING_KINDS, classify_url, normalize_url
+from html_backends import CARD_CLASS, CARD_TAG, DEFAULT_BACKEND, extract_cards
+from readiness import scroll_until_stable
+
+
+NO_CARDS = f'нет карточек {CARD_TAG}.{CARD_CLASS}'
+NO_IMAGES = 'у карточек нет src/data-src'
+
+
+def _real_image(src: Optional[str]) -> bool:
+    return bool(src) and not src.startswith('data:')
+
+
+class HybridFetcher:
+    """
+    fetcher.fetch(url) -> HTML страницы (bytes из requests или str из браузера).
+
+    static_fetch - загрузка без браузера: url -> bytes или None
+    pages - PageSource: HTML из браузера пишется в тот же снимок
+    min_image_ratio - доля карточек с настоящим фото, ниже которой
+                      статическая страница считается неполной
+    escalate_kinds - типы страниц (classify_url), которые можно догружать в браузере
+    """
+
+    def __init__(self, static_fetch: Callable[[str], Optional[bytes]], pages=None,
+                 browser_factory: Callable = partial(create_driver, lean=True),
+                 min_image_ratio: float = 0.8, backend: str = DEFAULT_BACKEND,
+                 escalate_kinds: Iterable[str] = LISTING_KINDS):
+        self.static_fetch = static_fetch
+        self.pages = pages
+        self.browser_factory = browser_factory
+        self.min_image_ratio = min_image_ratio
+        self.backend = backend
+        self.escalate_kinds = set(escalate_kinds)
+
+        self._driver = None
+        self._lock = threading.Lock()
+        self.stats = {'static': 0, 'escalated': 0, 'browser_failed': 0, 'failed': 0, 'not_listing': 0}
+        self.reasons: Counter = Counter()
+        self.escalations: List[Dict] = []
+
+    def diagnose(self, html) -> Optional[Tuple[str, str]]:
+        """(причина, подробности), если статической страницы недостаточно, иначе None"""
+        cards = extract_cards(html, self.backend)
+        if not cards:
+            return NO_CARDS, ''
+        with_images = sum(1 for card in cards if _real_image(card['img_src']))
+        if with_images < len(cards) * self.min_image_ratio:
+            return NO_IMAGES, f"{len(cards) - with_images} из {len(cards)}"
+        return None
+
+    def _browser(self):
+        if self._driver is None:
+            print("🌐 Статики не хватило - запускаю браузер...")
+            self._driver = self.browser_factory()
+        return self._driver
+
+    def _fetch_browser(self, url: str) -> Optional[str]:
+        # Один браузер на все эскалации - страницы открываются по очереди
+        with self._lock:
+            try:
+                driver = self._browser()
+                driver.get(url)
+                scroll_until_stable(driver, f'{CARD_TAG}.{CARD_CLASS}')
+                html = driver.page_source
+            except Exception as e:
+                print(f"⚠️  Браузер не загрузил {url}: {str(e)[:80]}")
+                self.stats['browser_failed'] += 1
+                return None
+        if self.pages is not None:
+            self.pages.record(url, html)
+        return html
+
+    def listing(self, url: str) -> bool:
+        """Страница, где должны быть карточки (раздел, фильтр или пагинация)"""
+        return classify_url(normalize_url(url) or url) in self.escalate_kinds
+
+    def fetch(self, url: str):
+        html = self.static_fetch(url)
+        # При воспроизведении снимка в нем уже лежит итоговый HTML
+        if self.pages is not None and self.pages.replaying:
+            return html
+        if not html:
+            # 404 или сеть: браузер тут не поможет
+            self.stats['failed'] += 1
+            return html
+        if not self.listing(url):
+            self.stats['not_listing'] += 1
+            return html
+
+        diagnosis = self.diagnose(html)
+        if diagnosis is None:
+            self.stats['static'] += 1
+            return html
+
+        reason, detail = diagnosis
+        self.stats['escalated'] += 1
+        self.reasons[reason] += 1
+        self.escalations.append({'url': url, 'reason': reason, 'detail': detail})
+        print(f"🔁 {url}: {reason}{f' ({detail})' if detail else ''} - открываю в браузере")
+
+        browser_html = self._fetch_browser(url)
+        return browser_html if browser_html is not None else html
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_report(self):
+        s = self.stats
+        total = s['static'] + s['escalated']
+        print(f"⚡ Листингов без браузера: {s['static']}/{total}, в браузер: {s['escalated']}"
+              + (f" (не удалось: {s['browser_failed']})" if s['browser_failed'] else "")
+              + (f"; не листингов: {s['not_listing']}" if s['not_listing'] else "")
+              + (f"; не загрузились: {s['failed']}" if s['failed'] else ""))
+        for reason, count in self.reasons.most_common():
+            print(f"   {count} × {reason}")
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Параллельная загрузка изображений.
+
+- пул потоков ограниченного размера
+- потоковая запись кусками во временный файл и атомарный rename,
+  поэтому оборванная загрузка не оставляет битый файл
+- дедупликация по SHA-256: одинаковое фото хранится один раз, даже если
+  оно используется несколькими дверями
+- статистика: байт/с и распределение задержек по изображениям
+- DownloadQueue: скачивание по мере разбора страницы, запись двери -
+  сразу как готово ее фото, без списка всех дверей в памяти
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from frontier import SingleFlight
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)',
+    'Accept': 'image/*',
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ImageDownloader:
+    """Загрузчик изображений в одну папку"""
+
+    def __init__(self, dest_dir, workers: int = 8, headers: Optional[Dict] = None,
+                 timeout: int = 15, rate_limiter=None, chunk_size: int = 64 * 1024,
+                 session=None):
+        self.dest_dir = Path(dest_dir)
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.headers = headers or DEFAULT_HEADERS
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.chunk_size = chunk_size
+        # Общая requests.Session (один пул соединений с загрузкой страниц); без нее - своя на поток
+        self.session = session
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._by_hash: Dict[str, str] = {}
+        self.latencies: List[float] = []
+        self.total_bytes = 0
+        self.wall_seconds = 0.0
+        self.duplicates = 0
+        self.failed = 0
+
+    def _session(self):
+        if self.session is not None:
+            return self.session
+        # requests.Session не гарантирует потокобезопасность - своя на поток
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _stream_to_temp(self, response) -> Tuple[str, str, int]:
+        """Потоковая запись во временный файл рядом с целевым, с подсчетом SHA-256"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.dest_dir, prefix='.download-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return tmp, digest.hexdigest(), size
+
+    def _commit(self, tmp: str, filename: str, sha256: str) -> Tuple[str, Optional[str]]:
+        """Атомарный перенос в итоговое имя или удаление дубликата"""
+        with self._lock:
+            existing = self._by_hash.get(sha256)
+            if existing and existing != filename and (self.dest_dir / existing).exists():
+                os.unlink(tmp)
+                self.duplicates += 1
+                return existing, existing
+            os.replace(tmp, self.dest_dir / filename)
+            self._by_hash[sha256] = filename
+            return filename, None
+
+    def register_existing(self, filename: str, sha256: str):
+        """Учесть уже лежащий на диске файл для дедупликации"""
+        with self._lock:
+            self._by_hash.setdefault(sha256, filename)
+
+    def fetch(self, url: str, extra_headers: Optional[Dict] = None):
+        """Один GET со stream=True (ответ закрывает вызывающий)"""
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        headers = dict(self.headers)
+        if extra_headers:
+            headers.update(extra_headers)
+        return self._session().get(url, headers=headers, timeout=self.timeout, stream=True)
+
+    def download(self, url: str, filename: str) -> Dict:
+        """
+        Скачивание одного изображения.
+        filename в результате может отличаться от запрошенного, если такое
+        же фото уже сохранено под другим именем (duplicate_of).
+        """
+        result = {'url': url, 'filename': None, 'path': None, 'ok': False,
+                  'sha256': None, 'bytes': 0, 'seconds': 0.0, 'duplicate_of': None, 'error': None}
+        start = time.perf_counter()
+        try:
+            response = self.fetch(url)
+            try:
+                if response.status_code != 200:
+                    result['error'] = f"HTTP {response.status_code}"
+                    return result
+                tmp, sha256, size = self._stream_to_temp(response)
+            finally:
+                response.close()
+            saved, duplicate_of = self._commit(tmp, filename, sha256)
+            result.update({
+                'filename': saved,
+                'path': str(self.dest_dir / saved),
+                'ok': True,
+                'sha256': sha256,
+                'bytes': size,
+                'duplicate_of': duplicate_of,
+            })
+            return result
+        except Exception as e:
+            result['error'] = str(e)[:100]
+            return result
+        finally:
+            result['seconds'] = time.perf_counter() - start
+            with self._lock:
+                if result['ok']:
+                    self.latencies.append(result['seconds'])
+                    self.total_bytes += result['bytes']
+                else:
+                    self.failed += 1
+
+    def download_many(self, jobs: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        Параллельное скачивание списка (url, filename).
+        Результаты в порядке jobs; одинаковые url скачиваются один раз.
+        """
+        jobs = list(jobs)
+        unique = {}
+        for url, filename in jobs:
+            unique.setdefault(url, filename)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {url: executor.submit(self.download, url, filename)
+                       for url, filename in unique.items()}
+            by_url = {url: future.result() for url, future in futures.items()}
+        self.wall_seconds += time.perf_counter() - start
+
+        return [by_url[url] for url, _ in jobs]
+
+    def summary(self) -> Dict:
+        seconds = self.wall_seconds or sum(self.latencies)
+        return {
+            'downloaded': len(self.latencies),
+            'failed': self.failed,
+            'duplicates': self.duplicates,
+            'bytes': self.total_bytes,
+            'bytes_per_sec': self.total_bytes / seconds if seconds else 0.0,
+            'p50': _percentile(self.latencies, 50),
+            'p90': _percentile(self.latencies, 90),
+            'p99': _percentile(self.latencies, 99),
+            'max': max(self.latencies) if self.latencies else 0.0,
+        }
+
+    def print_report(self):
+        s = self.summary()
+        print(f"📸 Скачано: {s['downloaded']}, ошибок: {s['failed']}, дубликатов: {s['duplicates']}")
+        print(f"   {s['bytes'] / 1024:,.0f} KB, {s['bytes_per_sec'] / 1024:,.0f} KB/s")
+        print(f"   задержка p50 {s['p50'] * 1000:.0f} ms, p90 {s['p90'] * 1000:.0f} ms, "
+              f"p99 {s['p99'] * 1000:.0f} ms, max {s['max'] * 1000:.0f} ms")
+
+
+class DownloadQueue:
+    """
+    Очередь скачивания поверх ImageDownloader:
+
+        with DownloadQueue(downloader) as queue:
+            for door in ...:
+                queue.add(url, filename, lambda result, door=door: finish(door, result))
+
+    callback(result) вызывается в рабочем потоке, как только фото готово;
+    одинаковые url скачиваются один раз (имя файла - от первого добавления).
+    Выход из with ждет все загрузки.
+
+    download - загрузка (url, filename) -> результат; по умолчанию
+    downloader.download, для ImageSync - image_sync.sync_one.
+    """
+
+    def __init__(self, downloader, download: Optional[Callable[[str, str], Dict]] = None):
+        self.downloader = downloader
+        self.download = download or downloader.download
+        self._executor = ThreadPoolExecutor(max_workers=downloader.workers)
+        self._images = SingleFlight(keep=None)
+        self._start = time.perf_counter()
+
+    def _run(self, url: str, filename: str, callback: Callable[[Dict], None]):
+        result = self._images.get(url, lambda u: self.download(u, filename))
+        try:
+            callback(result)
+        except Exception as e:
+            print(f"⚠️  {url[:60]}: {e}")
+
+    def add(self, url: str, filename: str, callback: Callable[[Dict], None]):
+        self._executor.submit(self._run, url, filename, callback)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.downloader.wall_seconds += time.perf_counter() - self._start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
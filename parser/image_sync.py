@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Инкрементальная синхронизация изображений каталога.
+
+В папке изображений лежит манифест .manifest.json:
+
+    {"door_1.jpg": {"url": ..., "file": "door_1.jpg", "etag": ...,
+                    "last_modified": ..., "size": ..., "sha256": ...}}
+
+При повторном запуске:
+- файл с тем же url и размером перепроверяется условным GET
+  (If-None-Match / If-Modified-Since), ответ 304 - ничего не качаем
+- оборванная загрузка лежит в .<имя>.part и докачивается через Range
+  + If-Range; если файл на сервере изменился, сервер вернет 200 целиком,
+  а 416 на уже полный .part просто завершает загрузку
+- одинаковые фото хранятся один раз (file указывает на общий файл)
+- gc() удаляет файлы из манифеста, на которые больше никто не ссылается
+
+Локальная работа на теплом прогоне - чтение манифеста и stat() файлов,
+без пересчета хэшей.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from image_downloader import ImageDownloader
+
+
+MANIFEST_NAME = '.manifest.json'
+
+
+def image_filename(url: str) -> str:
+    """
+    Стабильное имя файла фото по его URL: не зависит от порядка карточек,
+    поэтому новая коллекция в начале каталога не меняет имена остальных
+    """
+    suffix = Path(urlsplit(url).path).suffix.lower() or '.jpg'
+    return f"door_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}{suffix}"
+
+
+def _part_name(filename: str) -> str:
+    return f'.{filename}.part'
+
+
+def _hash_file(path: Path, chunk_size: int = 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest
+
+
+class ImageSync:
+    """Синхронизация списка (url, filename) с папкой изображений"""
+
+    def __init__(self, dest_dir, workers: int = 8, headers: Optional[Dict] = None,
+                 timeout: int = 15, rate_limiter=None, chunk_size: int = 64 * 1024,
+                 session=None):
+        self.dest_dir = Path(dest_dir)
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.dest_dir / MANIFEST_NAME
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        # Сессии по потокам, заголовки и лимит запросов - как у обычной загрузки
+        self.downloader = ImageDownloader(self.dest_dir, workers=workers, headers=headers,
+                                          timeout=timeout, rate_limiter=rate_limiter,
+                                          chunk_size=chunk_size, session=session)
+
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self.stats = {'not_modified': 0, 'downloaded': 0, 'resumed': 0, 'duplicates': 0,
+                      'failed': 0, 'removed': 0, 'bytes': 0}
+        self.local_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    # --- манифест ---
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Битый манифест - просто полная синхронизация
+            return {}
+
+    def save(self):
+        """Атомарная запись манифеста"""
+        tmp = self.manifest_path.with_suffix('.tmp')
+        with self._lock:
+            data = json.dumps(self.manifest, ensure_ascii=False, indent=1, sort_keys=True)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, self.manifest_path)
+
+    def _by_hash(self, sha256: str, exclude: str) -> Optional[str]:
+        for name, entry in self.manifest.items():
+            if name != exclude and entry.get('sha256') == sha256 and entry.get('file'):
+                if (self.dest_dir / entry['file']).exists():
+                    return entry['file']
+        return None
+
+    def _referenced(self, file: str, exclude: str) -> bool:
+        return any(name != exclude and entry.get('file') == file
+                   for name, entry in self.manifest.items())
+
+    def _is_fresh_candidate(self, entry: Optional[Dict], url: str) -> bool:
+        """Локальная проверка без чтения файла: тот же url, файл на месте, размер совпадает"""
+        if not entry or entry.get('url') != url or not entry.get('file'):
+            return False
+        if not (entry.get('etag') or entry.get('last_modified')):
+            return False
+        try:
+            return (self.dest_dir / entry['file']).stat().st_size == entry.get('size')
+        except OSError:
+            return False
+
+    # --- загрузка ---
+
+    def _request_headers(self, filename: str, url: str) -> Tuple[Dict, int]:
+        """Заголовки запроса и смещение докачки (0 - качаем целиком)"""
+        start = time.perf_counter()
+        entry = self.manifest.get(filename)
+        headers = {}
+        offset = 0
+
+        part = self.dest_dir / _part_name(filename)
+        partial = (entry or {}).get('partial')
+        if part.exists() and partial and partial.get('url') == url:
+            validator = partial.get('etag') or partial.get('last_modified')
+            if validator:
+                offset = part.stat().st_size
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+        elif self._is_fresh_candidate(entry, url):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with self._lock:
+            self.local_seconds += time.perf_counter() - start
+        return headers, offset
+
+    def _result(self, url: str, filename: str, status: str, error: Optional[str] = None) -> Dict:
+        entry = self.manifest.get(filename) or {}
+        saved = entry.get('file') if status != 'failed' else None
+        return {
+            'url': url,
+            'filename': saved,
+            'path': str(self.dest_dir / saved) if saved else None,
+            'ok': status != 'failed',
+            'status': status,
+            'sha256': entry.get('sha256'),
+            'error': error,
+        }
+
+    def sync_one(self, url: str, filename: str) -> Dict:
+        headers, offset = self._request_headers(filename, url)
+        try:
+            response = self.downloader.fetch(url, headers)
+        except Exception as e:
+            return self._failed(url, filename, str(e)[:100])
+
+        try:
+            if response.status_code == 304:
+                with self._lock:
+                    self.stats['not_modified'] += 1
+                return self._result(url, filename, 'not_modified')
+            if response.status_code == 206 and offset:
+                return self._receive(response, url, filename, append=True)
+            if response.status_code == 200:
+                return self._receive(response, url, filename, append=False)
+            if response.status_code == 416 and offset:
+                return self._unsatisfiable(response, url, filename, offset)
+            return self._failed(url, filename, f"HTTP {response.status_code}")
+        finally:
+            response.close()
+
+    def _unsatisfiable(self, response, url: str, filename: str, offset: int) -> Dict:
+        """
+        Ответ 416 на докачку: .part уже скачан целиком (загрузка оборвалась
+        после тела, до переименования). Если сервер подтверждает длину
+        (Content-Range: bytes */<size>), .part просто дописывается в каталог,
+        иначе он удаляется и фото качается заново без Range.
+        """
+        part = self.dest_dir / _part_name(filename)
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rpartition('/')[2].strip()
+        if total.isdigit() and int(total) == offset:
+            with self._lock:
+                partial = self.manifest.get(filename, {}).get('partial') or {}
+            return self._finalize(part, url, filename, _hash_file(part), offset,
+                                  partial.get('etag'), partial.get('last_modified'),
+                                  received=0, status='resumed')
+
+        part.unlink(missing_ok=True)
+        try:
+            response = self.downloader.fetch(url, {})
+        except Exception as e:
+            return self._failed(url, filename, str(e)[:100])
+        try:
+            if response.status_code == 200:
+                return self._receive(response, url, filename, append=False)
+            return self._failed(url, filename, f"HTTP {response.status_code}")
+        finally:
+            response.close()
+
+    def _receive(self, response, url: str, filename: str, append: bool) -> Dict:
+        part = self.dest_dir / _part_name(filename)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        # Валидаторы частичной загрузки сохраняются до тела: если загрузка
+        # оборвется, следующий запуск сможет докачать
+        with self._lock:
+            entry = self.manifest.setdefault(filename, {})
+            if not append:
+                entry['partial'] = {'url': url, 'etag': etag, 'last_modified': last_modified}
+
+        digest = _hash_file(part) if append else hashlib.sha256()
+        size = part.stat().st_size if append else 0
+        received = 0
+        try:
+            with open(part, 'ab' if append else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        received += len(chunk)
+        except Exception as e:
+            with self._lock:
+                self.stats['bytes'] += received
+            self.save()
+            return self._failed(url, filename, str(e)[:100])
+
+        return self._finalize(part, url, filename, digest, size + received, etag, last_modified,
+                              received=received, status='resumed' if append else 'downloaded')
+
+    def _finalize(self, part: Path, url: str, filename: str, digest, size: int,
+                  etag: Optional[str], last_modified: Optional[str], received: int,
+                  status: str) -> Dict:
+        """Готовый .part: в каталог под своим именем или ссылкой на дубликат"""
+        sha256 = digest.hexdigest()
+        with self._lock:
+            entry = self.manifest.setdefault(filename, {})
+            self.stats['bytes'] += received
+            self.stats[status] += 1
+            previous = entry.get('file')
+            duplicate_of = self._by_hash(sha256, exclude=filename)
+            if duplicate_of:
+                os.unlink(part)
+                self.stats['duplicates'] += 1
+                saved = duplicate_of
+            else:
+                os.replace(part, self.dest_dir / filename)
+                saved = filename
+            # Старый файл этого имени больше не нужен, если на него никто не ссылается
+            if previous and previous != saved and not self._referenced(previous, exclude=filename):
+                (self.dest_dir / previous).unlink(missing_ok=True)
+            partial = entry.pop('partial', None) or {}
+            entry.update({
+                'url': url,
+                'file': saved,
+                'etag': etag or partial.get('etag'),
+                'last_modified': last_modified or partial.get('last_modified'),
+                'size': size,
+                'sha256': sha256,
+            })
+        return self._result(url, filename, status)
+
+    def _failed(self, url: str, filename: str, error: str) -> Dict:
+        with self._lock:
+            self.stats['failed'] += 1
+        return self._result(url, filename, 'failed', error)
+
+    def sync(self, jobs: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        Синхронизация списка (url, filename), результаты в порядке jobs.
+        filename в результате может указывать на общий файл-дубликат.
+        """
+        jobs = list(jobs)
+        unique = {}
+        for url, filename in jobs:
+            unique.setdefault(filename, url)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {filename: executor.submit(self.sync_one, url, filename)
+                       for filename, url in unique.items()}
+            by_name = {filename: future.result() for filename, future in futures.items()}
+        self.wall_seconds += time.perf_counter() - start
+        self.save()
+
+        return [by_name[filename] for _, filename in jobs]
+
+    def gc(self, keep: Iterable[str]) -> List[str]:
+        """
+        Удаление файлов, которые манифест отслеживает, но которые не нужны
+        ни одному имени из keep. Чужие файлы в папке не трогаются.
+        """
+        keep = set(keep)
+        removed = []
+        with self._lock:
+            tracked = {entry.get('file') for entry in self.manifest.values() if entry.get('file')}
+            for name in [n for n in self.manifest if n not in keep]:
+                del self.manifest[name]
+                part = self.dest_dir / _part_name(name)
+                if part.exists():
+                    part.unlink()
+            referenced = {entry.get('file') for entry in self.manifest.values()}
+            for name in sorted(tracked - referenced):
+                path = self.dest_dir / name
+                if path.exists():
+                    path.unlink()
+                    removed.append(name)
+            self.stats['removed'] += len(removed)
+        self.save()
+        return removed
+
+    def print_report(self):
+        s = self.stats
+        print(f"🔄 Синхронизация изображений: 304 - {s['not_modified']}, скачано - {s['downloaded']}, "
+              f"докачано - {s['resumed']}, дубликатов - {s['duplicates']}, ошибок - {s['failed']}, "
+              f"удалено - {s['removed']}")
+        print(f"   {s['bytes'] / 1024:,.0f} KB, {self.wall_seconds:.2f} s всего, "
+              f"локальная работа {self.local_seconds * 1000:.1f} ms")
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Уменьшенные копии фото для каталога (WebP, и AVIF, если Pillow его умеет).
+
+Для каждого исходника из public/ (например /catalog-images/door_1.jpg или
+/works/IMG_5856.jpeg) строятся варианты нужной ширины в
+public/catalog-images/variants/. Имена содержат начало SHA-256 исходника,
+поэтому браузерный кэш не отдаст старую картинку после замены фото.
+
+Кодирование идет в пуле процессов на все ядра. Исходник, хэш которого
+совпадает с записанным в манифесте и все варианты которого на месте,
+пропускается.
+
+Манифест variants/manifest.json:
+
+    {"/catalog-images/door_1.jpg": {"sha256": ..., "width": 1200, "height": 1600,
+        "variants": [{"format": "webp", "width": 320, "height": 427,
+                      "path": "/catalog-images/variants/door_1-ab12cd34-320.webp"}, ...]}}
+
+Запуск для всех фото каталога: python image_variants.py
+или для отдельных: python image_variants.py /works/IMG_5856.jpeg ...
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / 'public'
+VARIANTS_URL = '/catalog-images/variants'
+VARIANTS_DIR = PUBLIC_DIR / VARIANTS_URL.lstrip('/')
+MANIFEST_PATH = VARIANTS_DIR / 'manifest.json'
+
+WIDTHS = (320, 640, 1024)
+QUALITY = {'webp': 80, 'avif': 60}
+
+
+def available_formats() -> List[str]:
+    """WebP всегда, AVIF - если есть поддержка в Pillow или плагин pillow-avif"""
+    from PIL import features
+
+    formats = ['webp']
+    try:
+        importlib.import_module('pillow_avif')  # регистрирует кодек в Pillow
+        formats.append('avif')
+    except ImportError:
+        try:
+            if features.check('avif'):
+                formats.append('avif')
+        except ValueError:
+            # Старый Pillow не знает такой feature
+            pass
+    return formats
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _build(source: str, stem: str, sha256: str, widths: Iterable[int],
+           formats: Iterable[str], out_dir: str) -> Dict:
+    """Кодирование одного исходника (выполняется в процессе пула)"""
+    from PIL import Image, ImageOps
+
+    if 'avif' in formats:
+        try:
+            importlib.import_module('pillow_avif')
+        except ImportError:
+            pass
+
+    out_dir = Path(out_dir)
+    with Image.open(source) as img:
+        # Фото с телефона: учитываем EXIF-поворот до ресайза
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+        width, height = img.size
+
+        # Не увеличиваем: ширины больше исходной заменяются самой исходной
+        targets = sorted({min(w, width) for w in widths})
+        variants = []
+        for target in targets:
+            resized = img if target == width else img.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS)
+            for fmt in formats:
+                name = f"{stem}-{sha256[:8]}-{target}.{fmt}"
+                resized.save(out_dir / name, fmt.upper(), quality=QUALITY.get(fmt, 80))
+                variants.append({
+                    'format': fmt,
+                    'width': resized.width,
+                    'height': resized.height,
+                    'path': f"{VARIANTS_URL}/{name}",
+                })
+    return {'sha256': sha256, 'width': width, 'height': height, 'variants': variants}
+
+
+class VariantBuilder:
+    """Построение вариантов и манифеста для набора фото из public/"""
+
+    def __init__(self, public_dir=PUBLIC_DIR, out_dir=VARIANTS_DIR, widths=WIDTHS,
+                 formats: Optional[List[str]] = None, workers: Optional[int] = None):
+        self.public_dir = Path(public_dir)
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.out_dir / 'manifest.json'
+        self.widths = tuple(widths)
+        self.formats = formats or available_formats()
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self.stats = {'built': 0, 'skipped': 0, 'missing': 0, 'failed': 0, 'removed': 0}
+        self.seconds = 0.0
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp = self.manifest_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def source_path(self, web_path: str) -> Path:
+        """'/catalog-images/door_1.jpg' -> public/catalog-images/door_1.jpg"""
+        return self.public_dir / web_path.lstrip('/')
+
+    def _up_to_date(self, entry: Optional[Dict], sha256: str) -> bool:
+        if not entry or entry.get('sha256') != sha256:
+            return False
+        if {v['format'] for v in entry['variants']} != set(self.formats):
+            return False
+        return all((self.out_dir / Path(v['path']).name).exists() for v in entry['variants'])
+
+    def _remove_variants(self, entry: Optional[Dict]):
+        for variant in (entry or {}).get('variants', []):
+            path = self.out_dir / Path(variant['path']).name
+            if path.exists():
+                path.unlink()
+                self.stats['removed'] += 1
+
+    def build(self, web_paths: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Варианты для списка путей вида /catalog-images/door_1.jpg.
+        Возвращает записи манифеста для этих путей (отсутствующие пропускаются).
+        """
+        start = time.perf_counter()
+        web_paths = list(dict.fromkeys(web_paths))
+        pending = {}
+        for web_path in web_paths:
+            source = self.source_path(web_path)
+            if not source.is_file():
+                self.stats['missing'] += 1
+                continue
+            sha256 = _sha256(source)
+            if self._up_to_date(self.manifest.get(web_path), sha256):
+                self.stats['skipped'] += 1
+                continue
+            pending[web_path] = (source, sha256)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                futures = {
+                    web_path: executor.submit(_build, str(source), source.stem, sha256,
+                                              self.widths, self.formats, str(self.out_dir))
+                    for web_path, (source, sha256) in pending.items()
+                }
+                for web_path, future in futures.items():
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        print(f"   ⚠️ {web_path}: {str(e)[:80]}")
+                        self.stats['failed'] += 1
+                        continue
+                    old = self.manifest.get(web_path)
+                    if old and old.get('sha256') != entry['sha256']:
+                        self._remove_variants(old)
+                    self.manifest[web_path] = entry
+                    self.stats['built'] += 1
+            self.save()
+
+        self.seconds = time.perf_counter() - start
+        return {path: self.manifest[path] for path in web_paths if path in self.manifest}
+
+    def print_report(self):
+        s = self.stats
+        print(f"🖼️  Варианты ({', '.join(self.formats)} × {', '.join(map(str, self.widths))}): "
+              f"собрано {s['built']}, без изменений {s['skipped']}, нет исходника {s['missing']}, "
+              f"ошибок {s['failed']}, удалено старых {s['removed']} ({self.seconds:.1f} s)")
+
+
+def srcset(entry: Optional[Dict], fmt: str = 'webp') -> str:
+    """Строка для атрибута srcset: '/...-320.webp 320w, /...-640.webp 640w'"""
+    if not entry:
+        return ''
+    return ', '.join(f"{v['path']} {v['width']}w" for v in entry['variants'] if v['format'] == fmt)
+
+
+def build_variants(web_paths: Iterable[str], **kwargs) -> Dict[str, Dict]:
+    """Сборка вариантов с отчетом; без Pillow каталог остается на исходных фото"""
+    try:
+        builder = VariantBuilder(**kwargs)
+    except ImportError:
+        print("⚠️ Pillow не установлен - варианты фото не собраны (pip install Pillow)")
+        return {}
+    result = builder.build(web_paths)
+    builder.print_report()
+    return result
+
+
+def load_manifest(out_dir=VARIANTS_DIR) -> Dict[str, Dict]:
+    path = Path(out_dir) / 'manifest.json'
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def with_srcsets(records: Callable[[], Iterable[Dict]], build: bool = True) -> Iterator[Dict]:
+    """
+    Двери из records() с srcSet / srcSetAvif по одной (для потока JSONL):
+    первый проход собирает пути фото и собирает варианты, второй отдает
+    двери. build=False - варианты уже собраны, только второй проход.
+
+    Сборка запускается отдельным процессом: скрипты парсеров не обернуты в
+    if __name__ == '__main__', а пул процессов при spawn (macOS, Windows)
+    заново импортирует главный модуль, то есть запустил бы парсинг снова.
+    """
+    if build:
+        paths = list(dict.fromkeys(door['image'] for door in records()))
+        subprocess.run([sys.executable, str(Path(__file__).resolve()), *paths], check=False)
+
+    variants = load_manifest()
+    for door in records():
+        entry = variants.get(door['image'])
+        if entry:
+            door['srcSet'] = srcset(entry, 'webp')
+            if srcset(entry, 'avif'):
+                door['srcSetAvif'] = srcset(entry, 'avif')
+        yield door
+
+
+if __name__ == '__main__':
+    # Без аргументов - все фото из public/catalog-images и public/works
+    paths = sys.argv[1:] or [
+        f"/{p.relative_to(PUBLIC_DIR).as_posix()}"
+        for folder in ('catalog-images', 'works')
+        for p in sorted((PUBLIC_DIR / folder).glob('*'))
+        if p.suffix.lower() in ('.jpg', '.jpeg', '.png')
+    ]
+    print(f"📁 Исходников: {len(paths)}")
+    build_variants(paths)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Потоковая запись результатов: каждая запись - строка JSONL сразу после извлечения.
+
+Файл дописывается по мере парсинга (flush после каждой записи, fsync
+каждые fsync_every записей или fsync_seconds секунд), поэтому после
+падения скрипта в нем остается все, что успели разобрать. Итоговые
+JSON/CSV/Excel строятся из потока за один проход: записи читаются по
+одной и раздаются писателям форматов (см. exporter) - память не растет
+вместе с каталогом.
+
+    with JsonlSink('labirint_catalog.jsonl') as sink:
+        for door in doors:
+            sink.write(door)
+    export_stream('labirint_catalog.jsonl', 'labirint_catalog')
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from exporter import cell_value, export_records
+
+
+class JsonlSink:
+    """
+    Дописываемый JSONL-файл (потокобезопасно).
+    csv_path/csv_fields - параллельно писать CSV с заданными колонками
+    (лишние поля записи пропускаются).
+    """
+
+    def __init__(self, path, fsync_every: int = 50, fsync_seconds: float = 5.0,
+                 csv_path=None, csv_fields: Optional[List[str]] = None):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_seconds = fsync_seconds
+        self.count = 0
+
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._last_sync = time.monotonic()
+        self._csv_file = None
+        self._csv = None
+        if csv_path is not None:
+            self._csv_file = open(csv_path, 'w', encoding='utf-8-sig', newline='')
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=csv_fields, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            if self._csv is not None:
+                self._csv.writerow({k: cell_value(v) for k, v in record.items()})
+                self._csv_file.flush()
+            self.count += 1
+            if (self.count % self.fsync_every == 0
+                    or time.monotonic() - self._last_sync >= self.fsync_seconds):
+                self._sync()
+
+    def _sync(self):
+        for f in (self._file, self._csv_file):
+            if f is not None:
+                os.fsync(f.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+            if self._csv_file is not None:
+                self._csv_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path) -> Iterator[Dict]:
+    """Записи по одной; оборванная при падении последняя строка пропускается"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                print(f"⚠️  {Path(path).name}: пропущена неполная строка")
+
+
+def export_stream(path, prefix: str, formats: Iterable[str] = ('json', 'csv', 'xlsx'),
+                  js_path=None, js_options: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Итоговые файлы из JSONL-потока (см. exporter): первый проход собирает
+    колонки, второй пишет все форматы одновременно. Записи читаются по одной.
+    """
+    return export_records(lambda: iter_jsonl(path), prefix, formats, js_path, js_options)
@@ -7,25 +7,63 @@
 
 import requests
 from bs4 import BeautifulSoup
-import json
-import csv
+import argparse
 import time
-import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict, Optional
-from fake_useragent import UserAgent
-from tqdm import tqdm
-import pandas as pd
+
+from batch_extract import extract_price, price_infos
+from catalog_js import DEFAULT_JS_PATH, add_catalog_arguments
+from catalog_store import CatalogStore
+from categories import category_id, classify
+from crawl_state import CrawlState, add_resume_argument
+from delta import Delta, add_delta_argument, card_key
+from detail_extractor import DetailExtractor
+from exporter import export_records
+from frontier import Frontier, SingleFlight, crawl, normalize_url
+from html_backends import BACKENDS, DEFAULT_BACKEND, cards_from_soup, extract_cards
+from http_cache import HttpCache
+from jsonl_sink import JsonlSink, export_stream, iter_jsonl
+from parquet_export import write_history
+from hybrid_fetcher import HybridFetcher
+from rate_limiter import HostRateLimiter
+from snapshots import PageSource, SnapshotStore, add_replay_argument
+from user_agents import UserAgentPool
 
 
 class LabirintParser:
     """Класс для парсинга каталога дверей Лабиринт"""
     
-    def __init__(self):
+    def __init__(self, workers: int = 8, rate: float = 1.0, burst: int = 1,
+                 cache: Optional[HttpCache] = None, use_cache: bool = True,
+                 replay: Optional[str] = None, snapshots: Optional[SnapshotStore] = None,
+                 record: bool = True, backend: str = DEFAULT_BACKEND, hybrid: bool = False,
+                 state: Optional[CrawlState] = None, delta: Optional[Delta] = None,
+                 sink: Optional[JsonlSink] = None):
+        """
+        workers - число потоков для детального парсинга
+        rate/burst - лимит запросов в секунду на хост (token bucket); по умолчанию
+                     1 запрос/с, как прежний sleep(1) между страницами - потоки
+                     ускоряют обход за счет перекрытия задержек сети, а не нагрузки
+        cache - HTTP-кэш с условными запросами (по умолчанию parser/.http_cache)
+        replay - id снимка для разбора без сети ('latest' - последний)
+        record - сохранять загруженные страницы в снимок
+        backend - разбор каталога: 'soup', 'strainer' или 'lxml' (см. html_backends)
+        hybrid - страницы каталога без карточек или фото в статике
+                 догружать в headless Chrome (см. hybrid_fetcher)
+        state - состояние детального обхода в SQLite (см. crawl_state):
+                готовые страницы дверей берутся оттуда, а не из сети
+        delta - сравнение с прошлым запуском (см. delta): детали загружаются
+                только для новых и измененных карточек, журнал изменений
+        sink - JSONL-поток (см. jsonl_sink): каждая дверь пишется, как только
+               ее запись готова, и переживает падение скрипта
+        """
         self.base_url = "https://labirintdoors.ru"
         self.catalog_url = f"{self.base_url}/katalog2"
         self.session = requests.Session()
-        self.ua = UserAgent()
+        self.ua = UserAgentPool()
         self.headers = {
             'User-Agent': self.ua.random,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -35,18 +73,48 @@ class LabirintParser:
             'Upgrade-Insecure-Requests': '1'
         }
         self.doors_data = []
+        self.workers = max(1, workers)
+        self.rate_limiter = HostRateLimiter(rate=rate, burst=burst)
+        self.cache = cache or (HttpCache() if use_cache else None)
+        self.pages = PageSource(replay=replay, store=snapshots, cache=self.cache,
+                                session=self.session, record=record)
+        self.backend = backend
+        self.detail_extractor = DetailExtractor()
+        self.hybrid = HybridFetcher(self.fetch_html, self.pages, backend=backend) if hybrid else None
+        self.state = state
+        self.delta = delta
+        if delta is not None and self.pages.replaying:
+            # Старый снимок не должен затирать отпечатки и журнал текущего каталога
+            delta.readonly = True
+        self.sink = sink
+        # Одна загрузка на URL за запуск, даже если его запросили несколько потоков;
+        # тела страниц не хранятся дольше, чем их ждут (LRU на несколько последних)
+        self.flight = SingleFlight()
+        self.frontier: Optional[Frontier] = None
         
     def get_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
         """Получение и парсинг страницы с retry логикой"""
+        content = self.fetch_html(url, retries)
+        if content is None:
+            return None
+        return BeautifulSoup(content, 'lxml')
+    
+    def fetch_html(self, url: str, retries: int = 3) -> Optional[bytes]:
+        """Получение сырого HTML страницы с retry логикой (один раз за запуск)"""
+        return self.flight.get(url, lambda u: self._fetch_html(u, retries))
+    
+    def _fetch_html(self, url: str, retries: int = 3) -> Optional[bytes]:
+        if self.pages.replaying:
+            try:
+                return self.pages.fetch(url)
+            except KeyError:
+                print(f"❌ Страницы нет в снимке: {url}")
+                return None
+        
         for attempt in range(retries):
             try:
-                response = self.session.get(
-                    url, 
-                    headers=self.headers, 
-                    timeout=30
-                )
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'lxml')
+                self.rate_limiter.wait(url)
+                return self.pages.fetch(url, self.headers, timeout=30)
             except Exception as e:
                 print(f"⚠️  Попытка {attempt + 1}/{retries} не удалась: {e}")
                 if attempt < retries - 1:
@@ -57,62 +125,58 @@ class LabirintParser:
     
     def extract_price(self, text: str) -> Optional[int]:
         """Извлечение цены из текста"""
-        if not text:
-            return None
-        match = re.search(r'(\d+[\s\d]*)\s*руб', text.replace(' ', ''))
-        if match:
-            return int(match.group(1).replace(' ', ''))
-        return None
+        return extract_price(text)
     
-    def parse_catalog_page(self, soup: BeautifulSoup) -> List[Dict]:
-        """Парсинг страницы каталога и извлечение ссылок на товары"""
+    def parse_catalog_page(self, html) -> List[Dict]:
+        """
+        Парсинг страницы каталога и извлечение ссылок на товары.
+        html - сырой HTML (разбирается выбранным бэкендом) или готовый BeautifulSoup
+        """
+        from tqdm import tqdm
+        
         doors = []
         
         # Ищем все элементы товаров по конкретному классу
-        collections = soup.find_all('a', class_='product-sections-01-item')
+        if isinstance(html, BeautifulSoup):
+            collections = cards_from_soup(html)
+        else:
+            collections = extract_cards(html, self.backend)
         
         print(f"🔍 Найдено элементов для парсинга: {len(collections)}")
         
-        for item in tqdm(collections, desc="Парсинг товаров"):
+        # Цены всех карточек одним пакетом: (цена, "от", валюта)
+        prices = price_infos(item['text'] for item in collections)
+        
+        for item, (price, price_from, currency) in tqdm(zip(collections, prices), total=len(collections),
+                                                        desc="Парсинг товаров"):
             try:
                 door_data = {}
                 
                 # Извлечение ссылки (сам элемент - это ссылка)
-                href = item.get('href', '')
+                href = item['href']
                 if href:
                     door_data['url'] = href if href.startswith('http') else f"{self.base_url}{href}"
                 
                 # Извлечение названия из текста ссылки или заголовка внутри
-                text = item.get_text(strip=True)
+                text = item['text']
                 if text and 'Входные двери' in text:
                     door_data['name'] = text
                 elif text:
                     door_data['name'] = f"Входные двери {text}"
                 
-                # Извлечение цены из текста
-                price_match = re.search(r'от\s+(\d+[\s\d]*)\s*руб', text)
-                if price_match:
-                    price_str = price_match.group(1).replace(' ', '')
-                    door_data['price'] = int(price_str)
+                # Цена из текста (извлечена пакетно выше)
+                if price:
+                    door_data['price'] = price
+                    door_data['price_from'] = price_from
+                    door_data['currency'] = currency
                 
                 # Извлечение изображения
-                img = item.find('img')
-                if img:
-                    img_src = img.get('src') or img.get('data-src') or img.get('data-lazy')
-                    if img_src:
-                        door_data['image'] = img_src if img_src.startswith('http') else f"{self.base_url}{img_src}"
+                img_src = item['img_src']
+                if img_src:
+                    door_data['image'] = img_src if img_src.startswith('http') else f"{self.base_url}{img_src}"
                 
                 # Определение категории по тексту
-                if 'LEOLAB' in text or 'LEO' in text:
-                    door_data['category'] = 'Новинки 2025'
-                elif 'PIANO' in text or 'ROYAL' in text or 'ISSIDA' in text:
-                    door_data['category'] = 'Хиты продаж'
-                elif 'терморазрыв' in text.lower() or 'NORD' in text or 'TUNDRA' in text:
-                    door_data['category'] = 'С терморазрывом'
-                elif 'WHITE' in text or 'VERSAL' in text or 'бел' in text.lower():
-                    door_data['category'] = 'Белые двери'
-                else:
-                    door_data['category'] = 'Основной каталог'
+                door_data['category'] = classify(text).name
                 
                 if door_data.get('name'):
                     doors.append(door_data)
@@ -125,146 +189,303 @@ class LabirintParser:
     
     def parse_door_detail(self, url: str) -> Dict:
         """Детальный парсинг страницы конкретной двери"""
-        soup = self.get_page(url)
-        if not soup:
+        html = self.fetch_html(url)
+        if not html:
             return {}
         
-        detail_data = {}
-        
         try:
-            # Извлечение характеристик
-            specs = soup.find_all(['div', 'li', 'tr'], 
-                                 class_=re.compile(r'spec|characteristic|param'))
-            
-            characteristics = {}
-            for spec in specs:
-                key_elem = spec.find(['span', 'td', 'dt'], 
-                                   class_=re.compile(r'key|label|name'))
-                val_elem = spec.find(['span', 'td', 'dd'], 
-                                   class_=re.compile(r'value|data'))
-                
-                if key_elem and val_elem:
-                    key = key_elem.get_text(strip=True)
-                    value = val_elem.get_text(strip=True)
-                    characteristics[key] = value
-            
-            detail_data['characteristics'] = characteristics
-            
-            # Описание
-            description = soup.find(['div', 'p'], 
-                                  class_=re.compile(r'description|about'))
-            if description:
-                detail_data['description'] = description.get_text(strip=True)
-            
-            # Дополнительные изображения
-            images = soup.find_all('img', class_=re.compile(r'gallery|product'))
-            detail_data['images'] = [
-                img.get('src') or img.get('data-src') 
-                for img in images if img.get('src') or img.get('data-src')
-            ]
-            
+            # Шаблон страницы выучивается на первой двери, дальше - готовые XPath
+            return self.detail_extractor.extract(html)
         except Exception as e:
             print(f"⚠️  Ошибка парсинга деталей: {e}")
-        
-        return detail_data
+            return {}
+    
+    def detail(self, url: str) -> Optional[Dict]:
+        """Детали одной двери с отметкой в состоянии обхода; None - не получены"""
+        try:
+            result = self.parse_door_detail(url)
+        except Exception as e:
+            print(f"⚠️  Ошибка детального парсинга {url}: {e}")
+            if self.state is not None:
+                self.state.mark_failed(url, e)
+            return None
+        if self.state is not None:
+            if result:
+                self.state.mark_done(url, result)
+            else:
+                self.state.mark_failed(url, "страница не загружена или не разобрана")
+        return result or None
     
-    def parse_all(self, deep_parse: bool = False):
-        """Полный парсинг каталога"""
+    def discover(self, max_depth: int = 2, max_pages: int = 200) -> Dict[str, bytes]:
+        """
+        Обход разделов, фильтров и пагинации каталога в ширину.
+        Возвращает {url: html} загруженных листингов; все найденные ссылки
+        (в том числе коллекции) остаются в self.frontier.
+        """
+        # В гибридном режиме листинги без карточек догружаются в браузере
+        fetch = self.hybrid.fetch if self.hybrid else self.fetch_html
+        try:
+            pages, self.frontier = crawl(fetch, [self.catalog_url],
+                                         Frontier(max_depth=max_depth), max_pages, self.workers)
+        finally:
+            if self.hybrid:
+                self.hybrid.close()
+                self.hybrid.print_report()
+        self.frontier.print_report()
+        return pages
+    
+    def parse_all(self, deep_parse: bool = False, discover: bool = False):
+        """Полный парсинг каталога (discover - по всем разделам сайта, а не одной странице)"""
         print("🚀 Начинаю парсинг каталога Лабиринт...")
         print(f"📍 URL: {self.catalog_url}")
         
-        # Парсинг главной страницы каталога
-        soup = self.get_page(self.catalog_url)
-        if not soup:
-            print("❌ Не удалось загрузить каталог")
-            return
-        
-        # Извлечение данных
-        self.doors_data = self.parse_catalog_page(soup)
+        if discover:
+            self.doors_data = self.parse_listings(self.discover())
+        else:
+            # Парсинг главной страницы каталога (в гибридном режиме - с догрузкой в браузере)
+            if self.hybrid:
+                with self.hybrid:
+                    html = self.hybrid.fetch(self.catalog_url)
+                self.hybrid.print_report()
+            else:
+                html = self.fetch_html(self.catalog_url)
+            if not html:
+                print("❌ Не удалось загрузить каталог")
+                return
+            
+            # Извлечение данных
+            self.doors_data = self.parse_catalog_page(html)
         
         print(f"\n✅ Найдено дверей: {len(self.doors_data)}")
         
+        # Карточки без изменений с прошлого запуска берут детали оттуда
+        carried = self.delta.plan(self.doors_data) if self.delta is not None else None
+        
         # Детальный парсинг каждой двери (опционально)
+        records = None
         if deep_parse and self.doors_data:
-            print("\n🔎 Начинаю детальный парсинг каждой двери...")
-            for i, door in enumerate(tqdm(self.doors_data, desc="Детальный парсинг")):
-                if door.get('url'):
-                    details = self.parse_door_detail(door['url'])
-                    self.doors_data[i].update(details)
-                    time.sleep(1)  # Respect rate limiting
+            print(f"\n🔎 Начинаю детальный парсинг каждой двери ({self.workers} потоков)...")
+            records = self.parse_details(carried)
+        else:
+            for door in self.doors_data:
+                self.emit(door)
+        
+        if self.delta is not None:
+            self.delta.commit(records)
+            self.delta.print_report()
     
-    def save_to_json(self, filename: str = None):
-        """Сохранение в JSON"""
-        if not filename:
-            filename = f"labirint_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    def parse_listings(self, listings: Dict[str, bytes]) -> List[Dict]:
+        """Карточки со всех листингов, одна дверь - один URL"""
+        doors = []
+        seen = set()
+        for html in listings.values():
+            for door in self.parse_catalog_page(html):
+                key = normalize_url(door.get('url')) or door['name']
+                if key not in seen:
+                    seen.add(key)
+                    doors.append(door)
+        return doors
+    
+    def emit(self, door: Dict):
+        """Готовая запись двери - в JSONL-поток (если он задан)"""
+        if self.sink is not None:
+            self.sink.write(door)
+    
+    def parse_details(self, carried: Optional[List[Optional[Dict]]] = None) -> List[Optional[Dict]]:
+        """
+        Параллельный детальный парсинг, результаты сливаются в doors_data по индексу
+        и сразу уходят в sink (в порядке готовности, а не каталога).
+        carried - записи прошлого запуска (см. Delta.plan): для них страница не загружается.
+        Возвращает итоговые записи дверей, None - детали не получены.
+        """
+        from tqdm import tqdm
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.doors_data, f, ensure_ascii=False, indent=2)
+        records: List[Optional[Dict]] = [None] * len(self.doors_data)
         
-        print(f"💾 Сохранено в JSON: {filename}")
-        return filename
-    
-    def save_to_csv(self, filename: str = None):
-        """Сохранение в CSV"""
-        if not filename:
-            filename = f"labirint_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        def finish(i: int, result: Optional[Dict]):
+            if result:
+                self.doors_data[i].update(result)
+                records[i] = self.doors_data[i]
+            self.emit(self.doors_data[i])
         
-        if not self.doors_data:
-            print("⚠️  Нет данных для сохранения")
-            return
+        if carried is not None:
+            for i, record in enumerate(carried):
+                if record:
+                    finish(i, record)
         
-        df = pd.DataFrame(self.doors_data)
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+        jobs = [(i, door['url']) for i, door in enumerate(self.doors_data)
+                if door.get('url') and records[i] is None]
+        job_indexes = {i for i, _ in jobs}
+        for i, door in enumerate(self.doors_data):
+            # Двери без ссылки: деталей не будет, запись готова сразу
+            if records[i] is None and i not in job_indexes:
+                self.emit(door)
+        if not jobs:
+            return records
         
-        print(f"💾 Сохранено в CSV: {filename}")
-        return filename
-    
-    def save_to_excel(self, filename: str = None):
-        """Сохранение в Excel"""
-        if not filename:
-            filename = f"labirint_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        done = {}
+        if self.state is not None:
+            # Страницы, разобранные до прерывания, повторно не загружаются
+            self.state.add(url for _, url in jobs)
+            done = self.state.payloads()
+            for i, url in jobs:
+                if url in done:
+                    finish(i, done[url])
+            if done:
+                print(f"⏭️  Уже разобрано: {len(done)} из {len(jobs)}")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.detail, url): i
+                for i, url in jobs if url not in done
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Детальный парсинг"):
+                finish(futures[future], future.result())
         
+        stats = self.detail_extractor.stats
+        print(f"🧩 Страниц по шаблону: {stats['template']}, с дозапросом общим поиском: {stats['fallback']}, "
+              f"общим поиском: {stats['generic']}")
+        if self.state is not None:
+            self.state.print_report()
+        return records
+    
+    def save_to_store(self, store: Optional[CatalogStore] = None,
+                      source: str = 'labirint_parser') -> float:
+        """
+        Upsert в SQLite-каталог (см. catalog_store); возвращает время запуска.
+        При --replay данные штампуются временем снимка, а не текущим.
+        """
+        own = store is None
+        store = store or CatalogStore()
+        try:
+            run = store.upsert(self.doors_data, source=source, seen_at=self.pages.seen_at)
+            store.print_report()
+        finally:
+            if own:
+                store.close()
+        return run
+    
+    def export(self, prefix: Optional[str] = None, formats=('json', 'csv', 'xlsx'),
+               js_path=None) -> Dict[str, str]:
+        """
+        Выгрузка doors_data сразу в несколько форматов (см. exporter):
+        таблица строится один раз, форматы пишутся параллельно, Excel - потоково.
+        formats - из 'json', 'csv', 'xlsx', 'js' (catalogData.js для сайта)
+        """
         if not self.doors_data:
             print("⚠️  Нет данных для сохранения")
-            return
-        
-        df = pd.DataFrame(self.doors_data)
-        df.to_excel(filename, index=False, engine='openpyxl')
-        
-        print(f"💾 Сохранено в Excel: {filename}")
-        return filename
+            return {}
+        prefix = prefix or f"labirint_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return export_records(lambda: iter(self.doors_data), prefix, formats, js_path)
+    
+    def _save_one(self, fmt: str, filename: Optional[str]) -> Optional[str]:
+        prefix = filename[:-len(fmt) - 1] if filename and filename.endswith(f'.{fmt}') else filename
+        return self.export(prefix, formats=(fmt,)).get(fmt)
+    
+    def save_to_json(self, filename: str = None):
+        """Сохранение в JSON"""
+        return self._save_one('json', filename)
+    
+    def save_to_csv(self, filename: str = None):
+        """Сохранение в CSV (характеристики - отдельными колонками)"""
+        return self._save_one('csv', filename)
+    
+    def save_to_excel(self, filename: str = None):
+        """Сохранение в Excel (write-only режим openpyxl)"""
+        return self._save_one('xlsx', filename)
     
     def print_summary(self):
         """Вывод статистики"""
-        if not self.doors_data:
+        summary = CatalogSummary()
+        for door in self.doors_data:
+            summary.add(door)
+        summary.print()
+
+
+class CatalogSummary:
+    """
+    Статистика парсинга по мере поступления дверей: хранит только счетчики,
+    а не сами двери (cli.py считает ее на этапе выгрузки).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.priced = 0
+        self.price_sum = 0
+        self.min_price = None
+        self.max_price = None
+        self.categories: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, door: Dict) -> Dict:
+        price = door.get('price')
+        cat = door.get('category', 'Без категории')
+        with self._lock:
+            self.total += 1
+            if price:
+                self.priced += 1
+                self.price_sum += price
+                self.min_price = price if self.min_price is None else min(self.min_price, price)
+                self.max_price = price if self.max_price is None else max(self.max_price, price)
+            self.categories[cat] = self.categories.get(cat, 0) + 1
+        return door
+
+    def print(self):
+        if not self.total:
             print("⚠️  Нет данных")
             return
         
         print("\n" + "="*60)
         print("📊 СТАТИСТИКА ПАРСИНГА")
         print("="*60)
-        print(f"📦 Всего дверей: {len(self.doors_data)}")
+        print(f"📦 Всего дверей: {self.total}")
         
         # Статистика по ценам
-        prices = [d.get('price') for d in self.doors_data if d.get('price')]
-        if prices:
-            print(f"💰 Минимальная цена: {min(prices):,} руб.")
-            print(f"💰 Максимальная цена: {max(prices):,} руб.")
-            print(f"💰 Средняя цена: {sum(prices)//len(prices):,} руб.")
+        if self.priced:
+            print(f"💰 Минимальная цена: {self.min_price:,} руб.")
+            print(f"💰 Максимальная цена: {self.max_price:,} руб.")
+            print(f"💰 Средняя цена: {self.price_sum//self.priced:,} руб.")
         
         # Статистика по категориям
-        categories = {}
-        for door in self.doors_data:
-            cat = door.get('category', 'Без категории')
-            categories[cat] = categories.get(cat, 0) + 1
-        
         print(f"\n📂 Категории:")
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        for cat, count in sorted(self.categories.items(), key=lambda x: x[1], reverse=True):
             print(f"   {cat}: {count}")
         
         print("="*60 + "\n")
 
 
+def save_stream(sink: JsonlSink, source: str = 'labirint_parser', prefix: str = 'labirint_catalog',
+                js_path: Optional[str] = None, parquet: bool = False,
+                js_options: Optional[Dict] = None, seen_at: Optional[float] = None) -> bool:
+    """
+    Итог запуска из JSONL-потока: upsert в SQLite, выгрузка JSON/CSV/Excel
+    (и catalogData.js, если задан js_path; js_options - split/minify, см. catalog_js),
+    с parquet - запись в историю. seen_at - время данных (при --replay -
+    время снимка, см. PageSource.seen_at). False - поток пуст.
+    """
+    if not sink.count:
+        return False
+    print(f"💾 Поток: {sink.path} ({sink.count} записей)")
+    with CatalogStore() as store:
+        run = store.upsert(iter_jsonl(sink.path), source=source, seen_at=seen_at)
+        store.print_report()
+        formats = ('json', 'csv', 'xlsx') + (('js',) if js_path else ())
+        export_stream(sink.path, prefix, formats, js_path=js_path, js_options=js_options)
+        if parquet:
+            if seen_at is None:
+                rows = store.iter_rows(seen_since=run)
+            else:
+                # Снимок: в базе могут быть цены новее него - в историю идут записи самого снимка
+                rows = ({**door, 'key': card_key(door), 'category': category_id(door.get('category')),
+                         'category_name': door.get('category'), 'source': source}
+                        for door in iter_jsonl(sink.path))
+            try:
+                write_history(rows, crawled_at=run)
+            except ImportError:
+                print("💡 Для Parquet: pip install pyarrow")
+    return True
+
+
 def main():
     """Главная функция"""
     print("""
@@ -274,20 +495,40 @@ def main():
     ╚════════════════════════════════════════════════════════╝
     """)
     
-    parser = LabirintParser()
+    argparser = add_replay_argument(argparse.ArgumentParser(description="Парсер каталога Лабиринт"))
+    argparser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                           help="Бэкенд разбора страницы каталога")
+    argparser.add_argument('--hybrid', action='store_true',
+                           help="Догружать в браузере страницы, где статики не хватило")
+    argparser.add_argument('--deep', action='store_true',
+                           help="Детальный парсинг страницы каждой двери")
+    argparser.add_argument('--discover', action='store_true',
+                           help="Обойти все разделы, фильтры и пагинацию каталога")
+    argparser.add_argument('--parquet', action='store_true',
+                           help="Дописать запуск в историю parser/history/ (Parquet, нужен pyarrow)")
+    argparser.add_argument('--js', nargs='?', const=str(DEFAULT_JS_PATH), metavar='PATH',
+                           help="Заодно выгрузить catalogData.js для сайта (по умолчанию src/catalogData.js)")
+    add_catalog_arguments(add_delta_argument(add_resume_argument(argparser)))
+    args = argparser.parse_args()
     
-    # Парсинг каталога
-    parser.parse_all(deep_parse=False)  # deep_parse=True для детального парсинга
+    state = CrawlState('labirint_details', resume=args.resume) if args.deep else None
+    # Каждая готовая дверь сразу дописывается в labirint_catalog.jsonl
+    sink = JsonlSink('labirint_catalog.jsonl')
+    parser = LabirintParser(replay=args.replay, backend=args.backend, hybrid=args.hybrid,
+                            state=state, delta=Delta('labirint_parser', full=args.full), sink=sink)
+    
+    # Парсинг каталога (--deep - с детальным парсингом каждой двери)
+    try:
+        parser.parse_all(deep_parse=args.deep, discover=args.discover)
+    finally:
+        sink.close()
     
     # Вывод статистики
     parser.print_summary()
     
-    # Сохранение результатов
-    if parser.doors_data:
-        parser.save_to_json()
-        parser.save_to_csv()
-        parser.save_to_excel()
-        
+    # Сохранение: каталог в SQLite и JSON/CSV/Excel (все форматы за один проход) - из потока
+    if save_stream(sink, js_path=args.js, parquet=args.parquet,
+                   js_options={'split': args.split, 'minify': args.minify}, seen_at=parser.pages.seen_at):
         print("\n✅ Парсинг завершен успешно!")
     else:
         print("\n❌ Не удалось извлечь данные")
@@ -4,69 +4,70 @@
 Парсер каталога дверей Лабиринт с Selenium (для JS-контента)
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
-import json
-import pandas as pd
-import time
-import re
-from datetime import datetime
-from typing import List, Dict
+import argparse
+from typing import List, Dict, Optional
+
+from batch_extract import extract_price
+from browser import add_browser_arguments, create_driver
+from html_backends import CARD_CLASS
+from jsonl_sink import JsonlSink
+from labirint_parser import CatalogSummary, save_stream
+from readiness import scroll_until_stable
+from categories import classify
+from snapshots import PageSource, add_replay_argument
 
 
 class LabirintSeleniumParser:
     """Парсер с использованием Selenium для JS-контента"""
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, sink: JsonlSink, headless: bool = True, replay: Optional[str] = None,
+                 lean: bool = False):
         self.base_url = "https://labirintdoors.ru"
         self.catalog_url = f"{self.base_url}/katalog2"
-        self.doors_data = []
+        self.driver = None
+        # JSONL-поток: каждая дверь пишется на диск сразу после разбора,
+        # в памяти - только счетчики для статистики
+        self.sink = sink
+        self.summary = CatalogSummary()
         
-        # Настройка Chrome
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
+        # Снимок страниц: запись page_source или воспроизведение без браузера
+        self.pages = PageSource(replay=replay)
+        if self.pages.replaying:
+            print(f"📼 Воспроизведение снимка {self.pages.replay.snapshot_id}, браузер не нужен")
+            return
         
+        # Настройка Chrome (lean - без картинок, шрифтов и сторонних скриптов)
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = create_driver(headless=headless, lean=lean)
             print("✅ Chrome WebDriver запущен")
         except Exception as e:
             print(f"❌ Ошибка запуска Chrome: {e}")
             print("💡 Установите ChromeDriver: brew install chromedriver")
             raise
     
-    def extract_price(self, text: str) -> int:
+    def extract_price(self, text: str) -> Optional[int]:
         """Извлечение цены"""
-        if not text:
-            return None
-        match = re.search(r'(\d+[\s\d]*)\s*руб', text.replace(' ', ''))
-        if match:
-            return int(match.group(1).replace(' ', ''))
-        return None
+        return extract_price(text)
     
     def parse_catalog(self):
         """Парсинг всего каталога"""
         print(f"\n🚀 Начинаю парсинг: {self.catalog_url}")
         
         try:
-            self.driver.get(self.catalog_url)
-            print("⏳ Ждем загрузки JavaScript...")
-            time.sleep(3)  # Ждем загрузки JS
-            
-            # Прокручиваем страницу для загрузки lazy-load контента
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            # Получаем HTML после загрузки JS
-            html = self.driver.page_source
+            if self.pages.replaying:
+                html = self.pages.fetch(self.catalog_url)
+            else:
+                self.driver.get(self.catalog_url)
+                print("⏳ Ждем загрузки JavaScript...")
+                
+                # Прокручиваем, пока lazy-load подгружает новые карточки
+                state = scroll_until_stable(self.driver, f'.{CARD_CLASS}')
+                print(f"   карточек: {state['cards']}, прокруток: {state['rounds']}")
+                
+                # Получаем HTML после загрузки JS
+                html = self.driver.page_source
+                self.pages.record(self.catalog_url, html)
             soup = BeautifulSoup(html, 'lxml')
             
             print("🔍 Парсинг элементов...")
@@ -112,11 +113,6 @@ class LabirintSeleniumParser:
                         'url': href if href.startswith('http') else f"{self.base_url}{href}",
                     }
                     
-                    # Извлечение цены
-                    price = self.extract_price(text)
-                    if price:
-                        door_data['price'] = price
-                    
                     # Поиск изображения рядом
                     img = item.find('img')
                     if img:
@@ -125,83 +121,56 @@ class LabirintSeleniumParser:
                             door_data['image'] = img_src if img_src.startswith('http') else f"{self.base_url}{img_src}"
                     
                     # Категоризация
-                    if any(word in text for word in ['LEOLAB', 'SKYLAB', 'EVOLAB']):
-                        door_data['category'] = 'Новинки 2025'
-                    elif any(word in text for word in ['PIANO', 'ROYAL', 'ISSIDA', 'STORM']):
-                        door_data['category'] = 'Хиты продаж'
-                    elif 'терморазрыв' in text.lower() or any(word in text for word in ['NORD', 'TUNDRA', 'ATLANTIC']):
-                        door_data['category'] = 'С терморазрывом'
-                    elif 'WHITE' in text or 'бел' in text.lower():
-                        door_data['category'] = 'Белые двери'
-                    else:
-                        door_data['category'] = 'Основной каталог'
+                    door_data['category'] = classify(text).name
+                    
+                    price = self.extract_price(text)
+                    if price:
+                        door_data['price'] = price
                     
-                    self.doors_data.append(door_data)
+                    self.sink.write(self.summary.add(door_data))
                     
                 except Exception as e:
                     continue
             
-            print(f"\n✅ Найдено дверей: {len(self.doors_data)}")
+            print(f"\n✅ Найдено дверей: {self.summary.total}")
             
         except Exception as e:
             print(f"❌ Ошибка парсинга: {e}")
         
         finally:
-            self.driver.quit()
-            print("🔚 Browser закрыт")
+            if self.driver:
+                self.driver.quit()
+                print("🔚 Browser закрыт")
     
     def save_results(self):
-        """Сохранение результатов"""
-        if not self.doors_data:
+        """Сохранение результатов: каталог в SQLite и файлы - из JSONL-потока"""
+        self.sink.close()
+        if not save_stream(self.sink, source='labirint_selenium_parser', seen_at=self.pages.seen_at):
             print("⚠️  Нет данных для сохранения")
             return
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # JSON
-        json_file = f"labirint_catalog_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(self.doors_data, f, ensure_ascii=False, indent=2)
-        print(f"💾 JSON: {json_file}")
-        
-        # CSV
-        csv_file = f"labirint_catalog_{timestamp}.csv"
-        df = pd.DataFrame(self.doors_data)
-        df.to_csv(csv_file, index=False, encoding='utf-8-sig')
-        print(f"💾 CSV: {csv_file}")
-        
-        # Excel
-        xlsx_file = f"labirint_catalog_{timestamp}.xlsx"
-        df.to_excel(xlsx_file, index=False, engine='openpyxl')
-        print(f"💾 Excel: {xlsx_file}")
-        
         self.print_stats()
     
     def print_stats(self):
         """Статистика"""
-        if not self.doors_data:
+        summary = self.summary
+        if not summary.total:
             return
         
         print("\n" + "="*60)
         print("📊 СТАТИСТИКА")
         print("="*60)
-        print(f"📦 Всего дверей: {len(self.doors_data)}")
+        print(f"📦 Всего дверей: {summary.total}")
         
         # Цены
-        prices = [d['price'] for d in self.doors_data if d.get('price')]
-        if prices:
-            print(f"💰 Мин: {min(prices):,} ₽")
-            print(f"💰 Макс: {max(prices):,} ₽")
-            print(f"💰 Средняя: {sum(prices)//len(prices):,} ₽")
+        if summary.priced:
+            print(f"💰 Мин: {summary.min_price:,} ₽")
+            print(f"💰 Макс: {summary.max_price:,} ₽")
+            print(f"💰 Средняя: {summary.price_sum//summary.priced:,} ₽")
         
         # Категории
-        cats = {}
-        for d in self.doors_data:
-            cat = d.get('category', 'Другое')
-            cats[cat] = cats.get(cat, 0) + 1
-        
         print(f"\n📂 По категориям:")
-        for cat, cnt in sorted(cats.items(), key=lambda x: x[1], reverse=True):
+        for cat, cnt in sorted(summary.categories.items(), key=lambda x: x[1], reverse=True):
             print(f"   {cat}: {cnt}")
         print("="*60)
 
@@ -214,8 +183,13 @@ def main():
     ╚════════════════════════════════════════════════════════╝
     """)
     
+    args = add_browser_arguments(add_replay_argument(
+        argparse.ArgumentParser(description="Парсер Лабиринт (Selenium)"))).parse_args()
+    
+    # Каждая дверь сразу дописывается в labirint_catalog.jsonl
+    sink = JsonlSink('labirint_catalog.jsonl')
     try:
-        parser = LabirintSeleniumParser(headless=True)
+        parser = LabirintSeleniumParser(sink, headless=True, replay=args.replay, lean=args.lean)
         parser.parse_catalog()
         parser.save_results()
         
@@ -227,6 +201,8 @@ def main():
         print("   1. Установите Chrome: brew install --cask google-chrome")
         print("   2. Установите ChromeDriver: brew install chromedriver")
         print("   3. Разрешите ChromeDriver: xattr -d com.apple.quarantine /opt/homebrew/bin/chromedriver")
+    finally:
+        sink.close()
 
 
 if __name__ == "__main__":
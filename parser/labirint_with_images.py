@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """Парсер с скачиванием изображений"""
 
-import requests
+import argparse
+import threading
+from http_cache import HttpCache
+from batch_extract import extract_price
+from categories import classify
+from image_downloader import DownloadQueue, ImageDownloader
+from jsonl_sink import JsonlSink
+from labirint_parser import CatalogSummary, save_stream
+from rate_limiter import HostRateLimiter
+from snapshots import PageSource, add_replay_argument
 from bs4 import BeautifulSoup
-import json
-import pandas as pd
-import re
-from datetime import datetime
 from pathlib import Path
-import time
 from urllib.parse import urljoin
 
 # Конфигурация
@@ -19,152 +23,135 @@ IMAGES_DIR = Path('images')
 # Создание папки для изображений
 IMAGES_DIR.mkdir(exist_ok=True)
 
+args = add_replay_argument(argparse.ArgumentParser(description="Парсер Лабиринт с изображениями")).parse_args()
+pages = PageSource(replay=args.replay, cache=HttpCache())
+
 print("🚀 Парсер Лабиринт с загрузкой изображений\n")
 print(f"📍 URL: {URL}")
 print(f"📁 Папка изображений: {IMAGES_DIR}\n")
 
-# Функция скачивания изображения
-def download_image(url, filename):
-    """Скачивает изображение и сохраняет локально"""
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code == 200:
-            filepath = IMAGES_DIR / filename
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            return str(filepath)
-        else:
-            print(f"   ❌ Ошибка загрузки: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"   ❌ Ошибка: {e}")
-        return None
+# Параллельная загрузка изображений (лимит запросов вместо sleep)
+downloader = ImageDownloader(IMAGES_DIR, workers=8, headers=HEADERS, timeout=10,
+                             rate_limiter=HostRateLimiter(rate=5.0, burst=5))
 
 # Загрузка страницы
-response = requests.get(URL, headers=HEADERS)
-print(f"✅ Страница загружена ({len(response.content)} bytes)\n")
+content = pages.fetch(URL, HEADERS)
+print(f"✅ Страница загружена ({len(content)} bytes)\n")
 
-soup = BeautifulSoup(response.content, 'lxml')
+soup = BeautifulSoup(content, 'lxml')
 
 # Парсинг всех ссылок
 all_links = soup.find_all('a', href=True)
 print(f"🔗 Найдено ссылок: {len(all_links)}\n")
 
-doors = []
+# Каждая дверь пишется в labirint.jsonl, как только готово ее фото:
+# после падения в файле остается все разобранное, список дверей не копится
+sink = JsonlSink('labirint.jsonl')
+summary = CatalogSummary()
+images = {'local': 0, 'any': 0}
+images_lock = threading.Lock()
 image_counter = 0
 
-print("📸 Начинаю скачивание изображений...\n")
 
-for idx, link in enumerate(all_links):
-    text = link.get_text(strip=True)
-    href = link['href']
-    
-    # Фильтр: ищем только ссылки с дверями
-    if not text or len(text) < 10:
-        continue
-    
-    keywords = ['входн', 'двер', 'лабиринт', 'labirint', 'руб']
-    if not any(kw in text.lower() for kw in keywords):
-        continue
-    
-    # Извлечение цены
-    price_match = re.search(r'(\d+[\s\d]+)\s*руб', text)
-    price = int(price_match.group(1).replace(' ', '')) if price_match else None
-    
-    # Категория
-    if any(w in text for w in ['LEOLAB', 'SKYLAB', 'EVOLAB']):
-        category = 'Новинки 2025'
-    elif any(w in text for w in ['PIANO', 'ROYAL', 'ISSIDA', 'STORM']):
-        category = 'Хиты продаж'
-    elif any(w in text.lower() for w in ['терморазрыв', 'nord', 'tundra']):
-        category = 'С терморазрывом'
-    elif any(w in text for w in ['WHITE', 'VERSAL', 'белые']):
-        category = 'Белые двери'
-    else:
-        category = 'Основной каталог'
-    
-    # Изображение
-    img = link.find('img')
-    image_url = None
-    local_image = None
-    
-    if img:
-        image_url = img.get('src') or img.get('data-src')
-        if image_url:
-            # Полный URL
-            if not image_url.startswith('http'):
-                image_url = urljoin(URL, image_url)
+def finish(door, result=None):
+    """Дверь готова (result - итог скачивания фото): в поток и в статистику"""
+    if result is not None:
+        if result['ok']:
+            door['image'] = result['path']
+        else:
+            print(f"   ❌ {result['url'][:60]}: {result['error']}")
+    with images_lock:
+        images['local'] += bool(door['image'] and door['image'] != door['image_url'])
+        images['any'] += bool(door.get('image'))
+    sink.write(summary.add(door))
+
+
+try:
+    with DownloadQueue(downloader) as queue:
+        for idx, link in enumerate(all_links):
+            text = link.get_text(strip=True)
+            href = link['href']
             
-            # Скачивание изображения
-            image_counter += 1
-            filename = f"door_{image_counter:04d}.jpg"
-            print(f"   📥 [{image_counter}] Загружаю: {filename}")
+            # Фильтр: ищем только ссылки с дверями
+            if not text or len(text) < 10:
+                continue
             
-            local_image = download_image(image_url, filename)
+            keywords = ['входн', 'двер', 'лабиринт', 'labirint', 'руб']
+            if not any(kw in text.lower() for kw in keywords):
+                continue
             
-            if local_image:
-                print(f"   ✅ Сохранено: {local_image}")
+            # Категория
+            category = classify(text).name
             
-            time.sleep(0.3)  # Задержка между запросами
-    
-    door = {
-        'name': text,
-        'price': price,
-        'url': href if href.startswith('http') else urljoin(URL, href),
-        'category': category,
-        'image': local_image or image_url,
-        'image_url': image_url
-    }
-    
-    doors.append(door)
+            # Изображение
+            img = link.find('img')
+            image_url = None
+            local_image = None
+            filename = None
+            
+            if img:
+                image_url = img.get('src') or img.get('data-src')
+                if image_url:
+                    # Полный URL
+                    if not image_url.startswith('http'):
+                        image_url = urljoin(URL, image_url)
+                    
+                    image_counter += 1
+                    filename = f"door_{image_counter:04d}.jpg"
+                    
+                    if pages.replaying:
+                        # Без сети: используем ранее скачанный файл, если есть
+                        if (IMAGES_DIR / filename).exists():
+                            local_image = str(IMAGES_DIR / filename)
+                        filename = None
+            
+            door = {
+                'name': text,
+                'price': extract_price(text),
+                'url': href if href.startswith('http') else urljoin(URL, href),
+                'category': category,
+                'image': local_image or image_url,
+                'image_url': image_url
+            }
+            
+            if filename:
+                # Фото качается в фоне, дверь уйдет в поток после него
+                queue.add(image_url, filename, lambda result, door=door: finish(door, result))
+            else:
+                finish(door)
+finally:
+    sink.close()
 
-print(f"\n✅ Найдено дверей: {len(doors)}")
-print(f"📸 Скачано изображений: {image_counter}\n")
+if downloader.latencies or downloader.failed:
+    downloader.print_report()
 
-if doors:
+print(f"\n✅ Найдено дверей: {summary.total}")
+print(f"📸 Изображений: {images['local']}\n")
+
+if summary.total:
     # Статистика
     print("="*60)
     print("📊 СТАТИСТИКА")
     print("="*60)
-    print(f"📦 Всего: {len(doors)}")
-    
-    prices = [d['price'] for d in doors if d['price']]
-    if prices:
-        print(f"💰 Мин: {min(prices):,} ₽")
-        print(f"💰 Макс: {max(prices):,} ₽")
-        print(f"💰 Средняя: {sum(prices)//len(prices):,} ₽")
+    print(f"📦 Всего: {summary.total}")
     
-    cats = {}
-    for d in doors:
-        cat = d['category']
-        cats[cat] = cats.get(cat, 0) + 1
+    if summary.priced:
+        print(f"💰 Мин: {summary.min_price:,} ₽")
+        print(f"💰 Макс: {summary.max_price:,} ₽")
+        print(f"💰 Средняя: {summary.price_sum//summary.priced:,} ₽")
     
     print(f"\n📂 Категории:")
-    for cat, cnt in sorted(cats.items(), key=lambda x: x[1], reverse=True):
+    for cat, cnt in sorted(summary.categories.items(), key=lambda x: x[1], reverse=True):
         print(f"   {cat}: {cnt}")
     
     # Статистика по изображениям
-    with_images = len([d for d in doors if d.get('image')])
-    print(f"\n📸 С изображениями: {with_images}/{len(doors)} ({with_images*100//len(doors)}%)")
+    with_images = images['any']
+    print(f"\n📸 С изображениями: {with_images}/{summary.total} ({with_images*100//summary.total}%)")
     
     print("="*60 + "\n")
     
-    # Сохранение
-    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # JSON
-    with open(f'labirint_{ts}.json', 'w', encoding='utf-8') as f:
-        json.dump(doors, f, ensure_ascii=False, indent=2)
-    print(f"💾 JSON: labirint_{ts}.json")
-    
-    # CSV
-    df = pd.DataFrame(doors)
-    df.to_csv(f'labirint_{ts}.csv', index=False, encoding='utf-8-sig')
-    print(f"💾 CSV: labirint_{ts}.csv")
-    
-    # Excel
-    df.to_excel(f'labirint_{ts}.xlsx', index=False)
-    print(f"💾 Excel: labirint_{ts}.xlsx")
+    # Сохранение: каталог в SQLite и файлы - из потока
+    save_stream(sink, source='labirint_with_images', prefix='labirint', seen_at=pages.seen_at)
     
     print(f"\n📁 Изображения сохранены в: {IMAGES_DIR}/")
     print(f"   Всего файлов: {len(list(IMAGES_DIR.glob('*.jpg')))}")
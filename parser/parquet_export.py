@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+История каталога в Parquet: каждый запуск дописывает файл в раздел своей даты.
+
+    parser/history/crawl_date=2025-12-10/part-20251210_165906-<id>-0.parquet
+
+- файлы только добавляются, прошлые запуски не перезаписываются
+- category, category_name и source - словарные колонки (Arrow dictionary):
+  несколько значений на тысячи строк хранятся как коды
+- characteristics - map<string, string>, images и features - list<string>,
+  остальные поля записи - JSON в колонке extra
+- чтение с фильтром по дате и категории: pyarrow пропускает целые разделы
+  и row group'ы по статистике, не читая их
+
+Нужен pyarrow (pip install pyarrow).
+
+    python parquet_export.py --since 2025-12-01 --category thermo
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_HISTORY_DIR = Path(__file__).resolve().parent / 'history'
+
+# Поля со своей колонкой; все остальное уходит в extra
+KNOWN_FIELDS = ('key', 'name', 'category', 'category_name', 'price', 'image', 'url', 'source',
+                'description', 'characteristics', 'images', 'features')
+
+
+def history_schema():
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ('crawled_at', pa.timestamp('s')),
+        ('crawl_date', pa.date32()),
+        ('key', pa.string()),
+        ('name', pa.string()),
+        ('category', category),
+        ('category_name', category),
+        ('source', category),
+        ('price', pa.int64()),
+        ('image', pa.string()),
+        ('url', pa.string()),
+        ('description', pa.string()),
+        ('characteristics', pa.map_(pa.string(), pa.string())),
+        ('images', pa.list_(pa.string())),
+        ('features', pa.list_(pa.string())),
+        ('extra', pa.string()),
+    ])
+
+
+def _text_list(value) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [str(item) for item in value]
+
+
+def to_table(doors: Iterable[Dict], crawled_at: datetime):
+    """Записи дверей -> pyarrow.Table по history_schema()"""
+    import pyarrow as pa
+
+    columns = {name: [] for name in history_schema().names}
+    for door in doors:
+        columns['crawled_at'].append(crawled_at)
+        columns['crawl_date'].append(crawled_at.date())
+        for field in ('key', 'name', 'category', 'category_name', 'image', 'url', 'source', 'description'):
+            value = door.get(field)
+            columns[field].append(None if value is None else str(value))
+        price = door.get('price')
+        columns['price'].append(int(price) if isinstance(price, (int, float)) else None)
+        characteristics = door.get('characteristics')
+        columns['characteristics'].append(
+            [(str(k), str(v)) for k, v in characteristics.items()] if characteristics else None)
+        columns['images'].append(_text_list(door.get('images')))
+        columns['features'].append(_text_list(door.get('features')))
+        extra = {k: v for k, v in door.items() if k not in KNOWN_FIELDS and v is not None}
+        columns['extra'].append(json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+    return pa.Table.from_pydict(columns, schema=history_schema())
+
+
+def write_history(doors: Iterable[Dict], root=DEFAULT_HISTORY_DIR,
+                  crawled_at: Optional[float] = None) -> List[str]:
+    """
+    Дописывает запуск в историю (раздел crawl_date=<дата>).
+    crawled_at - время запуска (epoch), по умолчанию сейчас.
+    Возвращает пути записанных файлов.
+    """
+    import pyarrow.dataset as ds
+
+    moment = datetime.fromtimestamp(crawled_at or time.time()).replace(microsecond=0)
+    table = to_table(doors, moment)
+    if table.num_rows == 0:
+        print("⚠️  Нет данных для Parquet")
+        return []
+
+    written = []
+    ds.write_dataset(
+        table,
+        root,
+        format='parquet',
+        partitioning=['crawl_date'],
+        partitioning_flavor='hive',
+        # Уникальное имя на запуск: файлы прошлых запусков той же даты не трогаем
+        basename_template=f"part-{moment.strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    for path in written:
+        print(f"💾 Parquet: {path}")
+    return written
+
+
+def read_history(root=DEFAULT_HISTORY_DIR, since: Optional[date] = None,
+                 until: Optional[date] = None, category: Optional[str] = None,
+                 columns: Optional[List[str]] = None):
+    """
+    История как pandas.DataFrame. Фильтры по дате и категории
+    выполняются при чтении (раздел и статистика row group'ов).
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root, format='parquet', partitioning=ds.partitioning(
+        pa.schema([('crawl_date', pa.date32())]), flavor='hive'))
+    condition = None
+    for expression in (
+        ds.field('crawl_date') >= since if since else None,
+        ds.field('crawl_date') <= until if until else None,
+        ds.field('category') == category if category else None,
+    ):
+        if expression is not None:
+            condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Чтение истории каталога из Parquet")
+    argparser.add_argument('--root', default=str(DEFAULT_HISTORY_DIR))
+    argparser.add_argument('--since', type=date.fromisoformat, help="с даты (ГГГГ-ММ-ДД)")
+    argparser.add_argument('--until', type=date.fromisoformat, help="по дату включительно")
+    argparser.add_argument('--category', help="id категории, например thermo")
+    args = argparser.parse_args()
+
+    start = time.perf_counter()
+    df = read_history(args.root, args.since, args.until, args.category)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"📚 Строк: {len(df)}, запусков: {df['crawled_at'].nunique() if len(df) else 0}, "
+          f"за {elapsed:.0f} мс")
+    if len(df):
+        print(df.groupby('crawl_date')['price'].agg(['count', 'min', 'median', 'max']).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -4,208 +4,282 @@
 Заходит внутрь каждой коллекции и получает фото
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-import time
-import json
+import argparse
+from functools import partial
 import re
+import threading
 from pathlib import Path
-import requests
+
+from batch_extract import extract_price
+from browser import add_browser_arguments, create_driver
+from catalog_js import add_catalog_arguments, write_catalog
+from catalog_store import CatalogStore
+from categories import classify
+from crawl_state import CrawlState, add_resume_argument
+from delta import Delta, add_delta_argument
+from dom_extract import cards_from_html, extract_cards, first_image, first_image_from_html
+from driver_pool import DriverPool
+from frontier import normalize_url
+from image_downloader import DownloadQueue
+from image_sync import ImageSync, image_filename
+from image_variants import with_srcsets
+from jsonl_sink import JsonlSink, iter_jsonl
+from rate_limiter import HostRateLimiter
+from readiness import scroll_until_stable, wait_until_ready
+from snapshots import PageSource, add_replay_argument
 
 URL = "https://labirintdoors.ru/katalog2"
 OUTPUT_DIR = Path('../src')
 IMAGES_DIR = Path('../public/catalog-images')
+POOL_SIZE = 4  # Сколько коллекций открывается параллельно
 
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+args = add_catalog_arguments(add_replay_argument(add_delta_argument(add_resume_argument(
+    add_browser_arguments(argparse.ArgumentParser(description="Глубокий парсер коллекций")))))).parse_args()
+
+# Снимок: каталог и страницы коллекций (page_source) пишутся при живом обходе,
+# с --replay разбираются из снимка без браузера
+pages = PageSource(replay=args.replay)
+# Прогресс по коллекциям пишется в SQLite сразу, --resume продолжает с места падения
+# (у разбора снимка свое задание - живой прогресс он не трогает)
+state = CrawlState('parse_deep_replay' if pages.replaying else 'parse_deep', resume=args.resume)
+# Коллекции, карточка которых не изменилась с прошлого запуска, не открываем;
+# разбор снимка сравнивает, но не затирает отпечатки
+delta = Delta('parse_deep', full=args.full, readonly=pages.replaying)
+
 print("🚀 ГЛУБОКИЙ ПАРСЕР (заходит в каждую коллекцию)")
 print(f"📍 URL: {URL}\n")
 
-chrome_options = Options()
-chrome_options.add_argument('--headless')
-chrome_options.add_argument('--no-sandbox')
-chrome_options.add_argument('--disable-dev-shm-usage')
-chrome_options.add_argument('--user-agent=Mozilla/5.0')
+# Селекторы фото на странице коллекции, по убыванию точности
+IMAGE_SELECTORS = [
+    'img[alt*="дверь"]',
+    'img[src*="door"]',
+    'img[src*=".jpg"]',
+    '.product-image img',
+    '.door-image img',
+    'img'
+]
+
+
+def find_collection_image(driver, item):
+    """Открывает страницу коллекции и возвращает URL первого фото двери"""
+    if pages.replaying:
+        return first_image_from_html(pages.fetch(item['url']), IMAGE_SELECTORS, item['url'])
+    driver.get(item['url'])
+    wait_until_ready(driver, 'img')
+    pages.record(item['url'], driver.page_source)
+    return first_image(driver, IMAGE_SELECTORS)
 
-print("🌐 Запуск браузера...")
-driver = webdriver.Chrome(options=chrome_options)
+
+def visit_collection(driver, item):
+    """find_collection_image с записью результата в состояние обхода"""
+    try:
+        img_url = find_collection_image(driver, item)
+    except Exception as e:
+        state.mark_failed(item['url'], e)
+        raise
+    state.mark_done(item['url'], {'img_url': img_url})
+    return img_url
+
+
+# В режиме --replay браузер не нужен
+driver = None
+if not pages.replaying:
+    print("🌐 Запуск браузера...")
+    driver = create_driver(lean=args.lean)
 
 try:
-    driver.get(URL)
-    time.sleep(3)
-    print("✅ Страница загружена\n")
+    if pages.replaying:
+        print(f"📼 Воспроизведение снимка {pages.replay.snapshot_id}\n")
+        cards = cards_from_html(pages.fetch(URL), 'a[href*="/katalog"]', URL)
+    else:
+        driver.get(URL)
+        scroll_until_stable(driver, 'a[href*="/katalog"]')
+        print("✅ Страница загружена\n")
+        pages.record(URL, driver.page_source)
+        # Текст и ссылки всех карточек - одним запросом к браузеру
+        cards = extract_cards(driver, 'a[href*="/katalog"]')
     
     # Получаем ссылки на все коллекции
     collection_links = []
-    elements = driver.find_elements(By.CSS_SELECTOR, 'a[href*="/katalog"]')
-    
-    for elem in elements:
-        href = elem.get_attribute('href')
-        text = elem.text.strip()
+    for card in cards:
+        href = card['href']
+        text = card['text']
         
         if href and 'labirint' in href.lower() and text and len(text) > 10:
             # Извлекаем название
             name_match = re.search(r'Лабиринт ([А-ЯA-Z\s]+)', text)
             if name_match:
                 name = name_match.group(1).strip()
-                price_match = re.search(r'(\d+[\s\d]*)\s*руб', text)
-                price = int(price_match.group(1).replace(' ', '')) if price_match else 45000
+                price = extract_price(text) or 45000
                 
                 collection_links.append({
                     'name': name,
                     'url': href,
-                    'price': price
+                    'price': price,
+                    'image': card['img']
                 })
     
-    # Убираем дубли
+    # Убираем дубли: одна коллекция - один канонический URL
     seen = set()
     unique_links = []
     for item in collection_links:
-        if item['name'] not in seen:
-            seen.add(item['name'])
+        key = normalize_url(item['url']) or item['name']
+        if key not in seen:
+            seen.add(key)
             unique_links.append(item)
     
     print(f"📦 Найдено уникальных коллекций: {len(unique_links)}\n")
     
-    collections = []
+    kept_files = []  # фото этого запуска: скачанные и неизмененные, уже лежащие на диске
     door_id = 0
     
-    # Заходим в каждую коллекцию
-    for item in unique_links[:20]:  # Первые 20 для скорости
-        door_id += 1
-        door_name = item['name']
-        price = item['price']
-        
-        print(f"🔍 {door_id}. {door_name} - {price:,} ₽")
-        
-        try:
-            # Открываем страницу коллекции
-            driver.get(item['url'])
-            time.sleep(2)
-            
-            # Ищем первое изображение двери
-            img_url = None
-            
-            # Пробуем разные селекторы
-            selectors = [
-                'img[alt*="дверь"]',
-                'img[src*="door"]',
-                'img[src*=".jpg"]',
-                '.product-image img',
-                '.door-image img',
-                'img'
-            ]
-            
-            for selector in selectors:
-                try:
-                    img_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                    img_url = img_elem.get_attribute('src')
-                    if not img_url:
-                        img_url = img_elem.get_attribute('data-src')
-                    if img_url and img_url.startswith('http'):
-                        break
-                except:
-                    continue
-            
-            # Скачиваем фото
-            image_path = f'/catalog-images/door_{door_id}.jpg'
-            local_path = IMAGES_DIR / f'door_{door_id}.jpg'
-            
-            if img_url and img_url.startswith('http'):
-                try:
-                    print(f"   📸 Скачиваю: {img_url[:60]}...")
-                    response = requests.get(img_url, timeout=10)
-                    if response.status_code == 200:
-                        with open(local_path, 'wb') as f:
-                            f.write(response.content)
-                        print(f"   ✅ Сохранено!")
-                    else:
-                        print(f"   ⚠ HTTP {response.status_code}")
-                        image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
-                except Exception as e:
-                    print(f"   ✗ Ошибка: {str(e)[:50]}")
-                    image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
+    # Неизмененные с прошлого запуска коллекции и обработанные до прерывания (--resume) не открываем
+    carried = dict(zip((item['url'] for item in unique_links), delta.plan(unique_links)))
+    delta.print_report()
+    state.add(item['url'] for item in unique_links if carried[item['url']] is None)
+    done = state.payloads()
+    todo = [item for item in unique_links if item['url'] not in done and carried[item['url']] is None]
+    if done:
+        print(f"⏭️  Уже обработано: {len(done)}, осталось: {len(todo)}\n")
+    
+    if pages.replaying:
+        # Страницы коллекций - из снимка, по очереди (без сети это быстро)
+        fresh = {}
+        for item in todo:
+            try:
+                fresh[item['url']] = (visit_collection(None, item), None)
+            except Exception as e:
+                fresh[item['url']] = (None, e)
+    else:
+        # Заходим в оставшиеся коллекции параллельно (пул браузеров)
+        with DriverPool(size=POOL_SIZE, factory=partial(create_driver, lean=args.lean)) as pool:
+            fresh = dict(zip((item['url'] for item in todo), pool.map(visit_collection, todo)))
+        pool.print_report()
+    state.print_report()
+    print()
+    
+    visits = [
+        fresh[item['url']] if item['url'] in fresh
+        else ((done.get(item['url']) or carried[item['url']])['img_url'], None)
+        for item in unique_links
+    ]
+    
+    # Каждая коллекция пишется в parse_deep.jsonl, как только готово ее фото;
+    # в памяти - только счетчики
+    sink = JsonlSink('parse_deep.jsonl')
+    photos = [0]
+    stats_lock = threading.Lock()
+    
+    def finish(link_index, door, img_url, result=None):
+        """Коллекция готова (result - итог синхронизации фото): в поток и в delta"""
+        if result is not None:
+            if result['ok']:
+                door['image'] = f"/catalog-images/{result['filename']}"
             else:
-                print(f"   ⚠ Нет фото, использую заглушку")
+                print(f"   ✗ {door['name']}: {result['error']}")
+        # Итог для delta: в следующий раз неизмененная коллекция будет перенесена
+        delta.record(link_index, {'img_url': img_url, 'image': door['image']})
+        with stats_lock:
+            photos[0] += '/catalog-images/' in door['image']
+        sink.write(door)
+    
+    # Синхронизация фото: неизмененные не качаются заново (ответ 304)
+    image_sync = ImageSync(IMAGES_DIR, workers=8, timeout=10,
+                           rate_limiter=HostRateLimiter(rate=5.0, burst=5))
+    
+    try:
+        with DownloadQueue(image_sync, image_sync.sync_one) as queue:
+            for link_index, (item, (img_url, error)) in enumerate(zip(unique_links, visits)):
+                door_id += 1
+                door_name = item['name']
+                price = item['price']
+                
+                print(f"🔍 {door_id}. {door_name} - {price:,} ₽")
+                
+                if error is not None:
+                    print(f"   ✗ Ошибка: {str(error)[:50]}")
+                    continue
+                
+                # Фото синхронизируется в фоне; до этого - заглушка
                 image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
-            
-            # Определяем категорию
-            name_lower = door_name.lower()
-            if any(word in name_lower for word in ['leo', 'sky', 'evo', 'smart']):
-                category = 'invisible'
-            elif any(word in name_lower for word in ['piano', 'royal', 'issida', 'storm']):
-                category = 'veneer'
-            elif any(word in name_lower for word in ['nord', 'tundra', 'термо', 'атлантик']):
-                category = 'thermo'
-            elif any(word in name_lower for word in ['white', 'versal', 'trendo']):
-                category = 'glass'
-            else:
-                category = 'entrance'
-            
-            door = {
-                'id': door_id,
-                'name': door_name,
-                'price': price,
-                'category': category,
-                'image': image_path,
-                'features': ['Скрытые петли', 'Магнитный замок', 'Доводчик', 'Звукоизоляция до 42 дБ'],
-                'acoustic': '42 дБ',
-                'size': '900×2100 мм',
-                'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
-                'popular': category == 'veneer',
-                'new': category == 'invisible'
-            }
-            
-            collections.append(door)
-            
-        except Exception as e:
-            print(f"   ✗ Ошибка: {str(e)[:50]}")
-        
-        print()
+                # Имя по URL фото, а не по номеру: новая коллекция в начале не сдвигает остальные
+                filename = image_filename(img_url) if img_url else None
+                previous = carried[item['url']]
+                kept = Path(previous['image']).name if previous and previous.get('image') else None
+                download = False
+                
+                if (kept and previous.get('img_url') == img_url and previous['image'] == f'/catalog-images/{kept}'
+                        and (IMAGES_DIR / kept).exists()):
+                    # Карточка и фото не менялись, файл уже скачан
+                    image_path = previous['image']
+                    kept_files.append(kept)
+                elif img_url and img_url.startswith('http'):
+                    kept_files.append(filename)
+                    if not pages.replaying:
+                        download = True
+                    elif (IMAGES_DIR / filename).exists():
+                        # Без сети: используем ранее скачанный файл
+                        image_path = f'/catalog-images/{filename}'
+                else:
+                    print(f"   ⚠ Нет фото, использую заглушку")
+                
+                # Определяем категорию
+                category = classify(door_name).id
+                
+                door = {
+                    'id': door_id,
+                    'name': door_name,
+                    'url': item['url'],
+                    'price': price,
+                    'category': category,
+                    'image': image_path,
+                    'features': ['Скрытые петли', 'Магнитный замок', 'Доводчик', 'Звукоизоляция до 42 дБ'],
+                    'acoustic': '42 дБ',
+                    'size': '900×2100 мм',
+                    'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
+                    'popular': category == 'veneer',
+                    'new': category == 'invisible'
+                }
+                
+                if download:
+                    queue.add(img_url, filename,
+                              lambda result, i=link_index, door=door, url=img_url: finish(i, door, url, result))
+                else:
+                    finish(link_index, door, img_url)
+    finally:
+        sink.close()
+        image_sync.save()
     
-    print(f"✅ Обработано: {len(collections)} коллекций")
-    print(f"📸 Фото скачано: {len([d for d in collections if '/catalog-images/' in d['image']])}\n")
+    print()
+    if sink.count and not pages.replaying:
+        # catalogData.js перезаписывается, старые фото из манифеста больше не нужны
+        image_sync.gc(kept_files)
+    image_sync.print_report()
+    print()
     
-    if collections:
-        # Генерируем catalogData.js
-        output = "// РЕАЛЬНЫЕ данные с labirintdoors.ru + ФОТО\n"
-        output += "// Глубокий парсинг: " + time.strftime('%Y-%m-%d %H:%M:%S') + "\n\n"
-        output += "export const catalogData = {\n"
-        output += "  categories: [\n"
-        output += "    { id: 'all', name: 'Все двери' },\n"
-        output += "    { id: 'invisible', name: 'Новинки 2025' },\n"
-        output += "    { id: 'veneer', name: 'Хиты продаж' },\n"
-        output += "    { id: 'glass', name: 'Белые двери' },\n"
-        output += "    { id: 'entrance', name: 'Основной каталог' },\n"
-        output += "    { id: 'thermo', name: 'С терморазрывом' },\n"
-        output += "  ],\n\n"
-        output += "  doors: [\n"
-        
-        for i, door in enumerate(collections):
-            output += "    {\n"
-            output += f"      id: {door['id']},\n"
-            output += f"      name: '{door['name']}',\n"
-            output += f"      category: '{door['category']}',\n"
-            output += f"      price: {door['price']},\n"
-            output += f"      image: '{door['image']}',\n"
-            output += f"      features: {json.dumps(door['features'], ensure_ascii=False)},\n"
-            output += f"      acoustic: '{door['acoustic']}',\n"
-            output += f"      size: '{door['size']}',\n"
-            output += f"      material: '{door['material']}',\n"
-            output += f"      popular: {str(door['popular']).lower()},\n"
-            output += f"      new: {str(door['new']).lower()}\n"
-            output += "    }" + ("," if i < len(collections) - 1 else "") + "\n"
-        
-        output += "  ]\n"
-        output += "};\n"
-        
-        output_file = OUTPUT_DIR / 'catalogData.js'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(output)
+    # Отпечатки и итоги запуска (записаны по ходу через delta.record)
+    delta.commit()
+    delta.print_report()
+    print()
+    
+    print(f"✅ Обработано: {sink.count} коллекций")
+    print(f"📸 Фото скачано: {photos[0]}\n")
+    
+    if sink.count:
+        stream = lambda: iter_jsonl(sink.path)
         
-        print(f"💾 Сохранено: {output_file}")
+        # catalogData.js с WebP/AVIF в srcset; --split - по модулю на категорию
+        write_catalog(with_srcsets(stream), OUTPUT_DIR / 'catalogData.js', split=args.split, minify=args.minify,
+                      header="РЕАЛЬНЫЕ данные с labirintdoors.ru + ФОТО, глубокий парсинг")
+        # Те же коллекции - в общий каталог (история цен)
+        with CatalogStore() as store:
+            store.upsert(with_srcsets(stream, build=False), source='parse_deep', seen_at=pages.seen_at)
+            store.print_report()
         print("✅ ГОТОВО!")
 
 finally:
-    driver.quit()
+    if driver:
+        driver.quit()
+    state.close()
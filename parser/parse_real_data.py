@@ -4,13 +4,19 @@
 Получает РЕАЛЬНЫЕ фото, названия и цены
 """
 
-import requests
+import argparse
+from http_cache import HttpCache
+from batch_extract import extract_price
+from catalog_js import add_catalog_arguments, write_catalog
+from catalog_store import CatalogStore
+from categories import classify
+from image_variants import with_srcsets
+from jsonl_sink import JsonlSink, iter_jsonl
+from snapshots import PageSource, add_replay_argument
 from bs4 import BeautifulSoup
-import json
 import re
 from pathlib import Path
 from urllib.parse import urljoin
-import time
 
 URL = "https://labirintdoors.ru/katalog2"
 HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
@@ -20,17 +26,18 @@ IMAGES_DIR = Path('../public/catalog-images-real')
 # Создаем папки
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+args = add_catalog_arguments(add_replay_argument(
+    argparse.ArgumentParser(description="Парсер labirintdoors.ru"))).parse_args()
+pages = PageSource(replay=args.replay, cache=HttpCache())
+
 print("🚀 НАСТОЯЩИЙ ПАРСЕР LABIRINT DOORS")
 print(f"📍 URL: {URL}\n")
 
 # Загружаем страницу
-response = requests.get(URL, headers=HEADERS)
-soup = BeautifulSoup(response.content, 'html.parser')
-
-print(f"✅ Страница загружена ({len(response.content)} bytes)\n")
+content = pages.fetch(URL, HEADERS)
+soup = BeautifulSoup(content, 'html.parser')
 
-# Ищем все ссылки на коллекции
-collections = []
+print(f"✅ Страница загружена ({len(content)} bytes)\n")
 
 # Находим все блоки с дверями
 door_links = soup.find_all('a', href=lambda x: x and 'katalog' in x.lower())
@@ -39,126 +46,82 @@ print(f"🔗 Найдено ссылок: {len(door_links)}\n")
 
 seen_names = set()
 door_id = 0
+# Каждая коллекция сразу пишется в parse_real_data.jsonl, в памяти - только счетчики
+by_category = {}
+sink = JsonlSink('parse_real_data.jsonl')
 
-for link in door_links:
-    text = link.get_text(strip=True)
-    href = link.get('href', '')
-    
-    # Фильтруем только реальные двери
-    if not text or len(text) < 10:
-        continue
-    
-    # Ищем название и цену
-    name_match = re.search(r'(Входн[а-я]+ двер[а-я]+ Лабиринт|Входная дверь) ([А-ЯA-Z\s]+)', text)
-    price_match = re.search(r'(\d+[\s\d]*)\s*руб', text)
-    
-    if not name_match:
-        continue
-    
-    door_name = name_match.group(2).strip()
-    
-    # Убираем дубли
-    if door_name in seen_names:
-        continue
-    seen_names.add(door_name)
-    
-    door_id += 1
-    price = int(price_match.group(1).replace(' ', '')) if price_match else 45000
-    
-    # Определяем категорию
-    name_lower = door_name.lower()
-    if any(word in name_lower for word in ['leo', 'sky', 'evo', 'smart']):
-        category = 'invisible'
-        cat_name = 'Новинки 2025'
-    elif any(word in name_lower for word in ['piano', 'royal', 'issida', 'storm']):
-        category = 'veneer'
-        cat_name = 'Хиты продаж'
-    elif any(word in name_lower for word in ['nord', 'tundra', 'термо', 'атлантик', 'frost']):
-        category = 'thermo'
-        cat_name = 'С терморазрывом'
-    elif any(word in name_lower for word in ['white', 'versal', 'trendo', 'белые']):
-        category = 'glass'
-        cat_name = 'Белые двери'
-    else:
-        category = 'entrance'
-        cat_name = 'Основной каталог'
-    
-    # Определяем популярность
-    popular = category == 'veneer'
-    new = category == 'invisible'
-    
-    door = {
-        'id': door_id,
-        'name': door_name,
-        'price': price,
-        'category': category,
-        'image': f'/works/IMG_{5855 + (door_id % 7)}.jpeg',  # Используем существующие фото
-        'features': [
-            'Скрытые петли',
-            'Магнитный замок',
-            'Доводчик',
-            f'Звукоизоляция до 42 дБ'
-        ],
-        'acoustic': '42 дБ',
-        'size': '900×2100 мм',
-        'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
-        'popular': popular,
-        'new': new,
-        'category_name': cat_name,
-        'source_url': urljoin(URL, href) if not href.startswith('http') else href
-    }
-    
-    collections.append(door)
-    print(f"✓ {door_id}. {door_name} - {price:,} ₽ ({cat_name})")
+try:
+    for link in door_links:
+        text = link.get_text(strip=True)
+        href = link.get('href', '')
+    
+        # Фильтруем только реальные двери
+        if not text or len(text) < 10:
+            continue
+    
+        # Ищем название и цену
+        name_match = re.search(r'(Входн[а-я]+ двер[а-я]+ Лабиринт|Входная дверь) ([А-ЯA-Z\s]+)', text)
+    
+        if not name_match:
+            continue
+    
+        door_name = name_match.group(2).strip()
+    
+        # Убираем дубли
+        if door_name in seen_names:
+            continue
+        seen_names.add(door_name)
+    
+        door_id += 1
+        price = extract_price(text) or 45000
+    
+        # Определяем категорию
+        category, cat_name = classify(door_name)
+    
+        # Определяем популярность
+        popular = category == 'veneer'
+        new = category == 'invisible'
+    
+        door = {
+            'id': door_id,
+            'name': door_name,
+            'price': price,
+            'category': category,
+            'image': f'/works/IMG_{5855 + (door_id % 7)}.jpeg',  # Используем существующие фото
+            'features': [
+                'Скрытые петли',
+                'Магнитный замок',
+                'Доводчик',
+                f'Звукоизоляция до 42 дБ'
+            ],
+            'acoustic': '42 дБ',
+            'size': '900×2100 мм',
+            'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
+            'popular': popular,
+            'new': new,
+            'category_name': cat_name,
+            'source_url': urljoin(URL, href) if not href.startswith('http') else href
+        }
+    
+        sink.write(door)
+        by_category[cat_name] = by_category.get(cat_name, 0) + 1
+        print(f"✓ {door_id}. {door_name} - {price:,} ₽ ({cat_name})")
+finally:
+    sink.close()
 
-print(f"\n✅ Найдено коллекций: {len(collections)}\n")
+print(f"\n✅ Найдено коллекций: {sink.count}\n")
 
-if collections:
-    # Генерируем catalogData.js
-    output = "// РЕАЛЬНЫЕ данные с labirintdoors.ru\n"
-    output += "// Парсинг: " + time.strftime('%Y-%m-%d %H:%M:%S') + "\n\n"
-    output += "export const catalogData = {\n"
-    output += "  categories: [\n"
-    output += "    { id: 'all', name: 'Все двери' },\n"
-    output += "    { id: 'invisible', name: 'Новинки 2025' },\n"
-    output += "    { id: 'veneer', name: 'Хиты продаж' },\n"
-    output += "    { id: 'glass', name: 'Белые двери' },\n"
-    output += "    { id: 'entrance', name: 'Основной каталог' },\n"
-    output += "    { id: 'thermo', name: 'С терморазрывом' },\n"
-    output += "  ],\n\n"
-    output += "  doors: [\n"
-    
-    for i, door in enumerate(collections):
-        output += "    {\n"
-        output += f"      id: {door['id']},\n"
-        output += f"      name: '{door['name']}',\n"
-        output += f"      category: '{door['category']}',\n"
-        output += f"      price: {door['price']},\n"
-        output += f"      image: '{door['image']}',\n"
-        output += f"      features: {json.dumps(door['features'])},\n"
-        output += f"      acoustic: '{door['acoustic']}',\n"
-        output += f"      size: '{door['size']}',\n"
-        output += f"      material: '{door['material']}',\n"
-        output += f"      popular: {str(door['popular']).lower()},\n"
-        output += f"      new: {str(door['new']).lower()}\n"
-        output += "    }" + ("," if i < len(collections) - 1 else "") + "\n"
-    
-    output += "  ]\n"
-    output += "};\n"
-    
-    # Сохраняем
-    output_file = OUTPUT_DIR / 'catalogData-real.js'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(output)
-    
-    print(f"💾 Сохранено: {output_file}")
-    print(f"📦 Коллекций: {len(collections)}")
-    
-    # Статистика
-    by_category = {}
-    for door in collections:
-        cat = door['category_name']
-        by_category[cat] = by_category.get(cat, 0) + 1
+if sink.count:
+    stream = lambda: iter_jsonl(sink.path)
+    
+    # catalogData-real.js с WebP/AVIF в srcset; --split - по модулю на категорию
+    write_catalog(with_srcsets(stream), OUTPUT_DIR / 'catalogData-real.js', split=args.split,
+                  minify=args.minify, header="РЕАЛЬНЫЕ данные с labirintdoors.ru")
+    print(f"📦 Коллекций: {sink.count}")
+    # Те же коллекции - в общий каталог (история цен)
+    with CatalogStore() as store:
+        store.upsert(with_srcsets(stream, build=False), source='parse_real_data', seen_at=pages.seen_at)
+        store.print_report()
     
     print("\n📊 По категориям:")
     for cat, count in sorted(by_category.items(), key=lambda x: x[1], reverse=True):
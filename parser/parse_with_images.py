@@ -4,18 +4,27 @@
 Использует Selenium для получения изображений
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import time
-import json
+import argparse
 import re
+import threading
 from pathlib import Path
-import requests
 from urllib.parse import urljoin
 
+from batch_extract import extract_price
+from browser import add_browser_arguments, create_driver
+from catalog_js import add_catalog_arguments, write_catalog
+from catalog_store import CatalogStore
+from categories import classify
+from dom_extract import cards_from_html, extract_cards
+from frontier import normalize_url
+from image_downloader import DownloadQueue
+from image_sync import ImageSync
+from image_variants import with_srcsets
+from jsonl_sink import JsonlSink, iter_jsonl
+from rate_limiter import HostRateLimiter
+from readiness import scroll_until_stable
+from snapshots import PageSource, add_replay_argument
+
 URL = "https://labirintdoors.ru/katalog2"
 OUTPUT_DIR = Path('../src')
 IMAGES_DIR = Path('../public/catalog-images')
@@ -23,195 +32,170 @@ IMAGES_DIR = Path('../public/catalog-images')
 # Создаем папки
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+args = add_catalog_arguments(add_replay_argument(add_browser_arguments(
+    argparse.ArgumentParser(description="Парсер с реальными фото")))).parse_args()
+# Снимок страниц: запись page_source или воспроизведение без браузера
+pages = PageSource(replay=args.replay)
+
 print("🚀 ПАРСЕР С РЕАЛЬНЫМИ ФОТО")
 print(f"📍 URL: {URL}\n")
 
-# Настройка Chrome
-chrome_options = Options()
-chrome_options.add_argument('--headless')  # Без GUI
-chrome_options.add_argument('--no-sandbox')
-chrome_options.add_argument('--disable-dev-shm-usage')
-chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-
-print("🌐 Запуск браузера...")
-driver = webdriver.Chrome(options=chrome_options)
+# В режиме --replay браузер не нужен
+driver = None
+if not pages.replaying:
+    print("🌐 Запуск браузера...")
+    driver = create_driver(lean=args.lean)
 
 try:
-    driver.get(URL)
-    print("✅ Страница загружена\n")
-    
-    # Ждем загрузки контента
-    time.sleep(3)
+    if pages.replaying:
+        print(f"📼 Воспроизведение снимка {pages.replay.snapshot_id}\n")
+        door_cards = cards_from_html(pages.fetch(URL), 'a[href*="katalog"]', URL)
+    else:
+        driver.get(URL)
+        
+        # Ждем, пока карточки перестанут подгружаться
+        state = scroll_until_stable(driver, 'a[href*="katalog"]')
+        print(f"✅ Страница загружена ({state['waited']:.1f} s после последней прокрутки)\n")
+        pages.record(URL, driver.page_source)
+        
+        # Все ссылки на коллекции (текст, href, фото) - одним запросом к браузеру
+        door_cards = extract_cards(driver, 'a[href*="katalog"]')
     
     # Находим все карточки дверей
     print("🔍 Поиск карточек дверей...\n")
     
-    collections = []
     door_id = 0
     
-    # Ищем все ссылки на коллекции
-    door_elements = driver.find_elements(By.CSS_SELECTOR, 'a[href*="katalog"]')
+    print(f"Найдено элементов: {len(door_cards)}\n")
     
-    print(f"Найдено элементов: {len(door_elements)}\n")
+    seen_urls = set()
     
-    seen_names = set()
+    # Каждая коллекция пишется в parse_with_images.jsonl, как только готово ее фото;
+    # в памяти - только счетчики
+    sink = JsonlSink('parse_with_images.jsonl')
+    by_category = {}
+    photos = [0]
+    stats_lock = threading.Lock()
+    kept_files = []  # имена фото этого запуска (остальные из манифеста удаляются)
     
-    for elem in door_elements[:50]:  # Ограничим для скорости
-        try:
-            text = elem.text.strip()
-            href = elem.get_attribute('href')
-            
-            if not text or len(text) < 10:
-                continue
-            
-            # Извлекаем название и цену
-            name_match = re.search(r'(Входн[а-я]+ двер[а-я]+ Лабиринт|Входная дверь) ([А-ЯA-Z\s]+)', text)
-            price_match = re.search(r'(\d+[\s\d]*)\s*руб', text)
-            
-            if not name_match:
-                continue
-            
-            door_name = name_match.group(2).strip()
-            
-            # Убираем дубли
-            if door_name in seen_names:
-                continue
-            seen_names.add(door_name)
-            
-            door_id += 1
-            price = int(price_match.group(1).replace(' ', '')) if price_match else 45000
-            
-            # Ищем изображение внутри элемента
-            img_url = None
-            try:
-                img_elem = elem.find_element(By.TAG_NAME, 'img')
-                img_url = img_elem.get_attribute('src')
-                if not img_url:
-                    img_url = img_elem.get_attribute('data-src')
-            except:
-                pass
-            
-            # Определяем категорию
-            name_lower = door_name.lower()
-            if any(word in name_lower for word in ['leo', 'sky', 'evo', 'smart']):
-                category = 'invisible'
-                cat_name = 'Новинки 2025'
-            elif any(word in name_lower for word in ['piano', 'royal', 'issida', 'storm']):
-                category = 'veneer'
-                cat_name = 'Хиты продаж'
-            elif any(word in name_lower for word in ['nord', 'tundra', 'термо', 'атлантик', 'frost']):
-                category = 'thermo'
-                cat_name = 'С терморазрывом'
-            elif any(word in name_lower for word in ['white', 'versal', 'trendo', 'белые']):
-                category = 'glass'
-                cat_name = 'Белые двери'
+    def finish(door, result=None):
+        """Коллекция готова (result - итог синхронизации фото): в поток и в статистику"""
+        if result is not None:
+            if result['ok']:
+                door['image'] = f"/catalog-images/{result['filename']}"
             else:
-                category = 'entrance'
-                cat_name = 'Основной каталог'
-            
-            # Скачиваем фото
-            image_path = f'/catalog-images/door_{door_id}.jpg'
-            local_image_path = IMAGES_DIR / f'door_{door_id}.jpg'
-            
-            if img_url and img_url.startswith('http'):
+                print(f"   ✗ {door['name']}: {result['error']}")
+        with stats_lock:
+            by_category[door['category']] = by_category.get(door['category'], 0) + 1
+            photos[0] += '/catalog-images/' in door['image']
+        sink.write(door)
+    
+    # Синхронизация фото: неизмененные не качаются заново (ответ 304)
+    image_sync = ImageSync(IMAGES_DIR, workers=8, timeout=10,
+                           rate_limiter=HostRateLimiter(rate=5.0, burst=5))
+    
+    try:
+        with DownloadQueue(image_sync, image_sync.sync_one) as queue:
+            for card in door_cards:
                 try:
-                    print(f"📸 Скачиваю фото для {door_name}...")
-                    img_response = requests.get(img_url, timeout=10)
-                    if img_response.status_code == 200:
-                        with open(local_image_path, 'wb') as f:
-                            f.write(img_response.content)
-                        print(f"   ✓ Сохранено: {local_image_path.name}")
+                    text = card['text']
+                    href = card['href']
+                    
+                    if not text or len(text) < 10:
+                        continue
+                    
+                    # Извлекаем название и цену
+                    name_match = re.search(r'(Входн[а-я]+ двер[а-я]+ Лабиринт|Входная дверь) ([А-ЯA-Z\s]+)', text)
+                    
+                    if not name_match:
+                        continue
+                    
+                    door_name = name_match.group(2).strip()
+                    
+                    # Убираем дубли: одна коллекция - один канонический URL
+                    key = normalize_url(href) or door_name
+                    if key in seen_urls:
+                        continue
+                    seen_urls.add(key)
+                    
+                    door_id += 1
+                    price = extract_price(text) or 45000
+                    
+                    # Изображение внутри элемента (src или data-src)
+                    img_url = card['img']
+                    
+                    # Определяем категорию
+                    category, cat_name = classify(door_name)
+                    
+                    popular = category == 'veneer'
+                    new = category == 'invisible'
+                    
+                    door = {
+                        'id': door_id,
+                        'name': door_name,
+                        'price': price,
+                        'category': category,
+                        # Заглушка, пока фото не синхронизировано
+                        'image': f'/works/IMG_{5855 + (door_id % 7)}.jpeg',
+                        'features': [
+                            'Скрытые петли',
+                            'Магнитный замок',
+                            'Доводчик',
+                            'Звукоизоляция до 42 дБ'
+                        ],
+                        'acoustic': '42 дБ',
+                        'size': '900×2100 мм',
+                        'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
+                        'popular': popular,
+                        'new': new,
+                        'source_url': href,
+                        'image_url': img_url or 'N/A'
+                    }
+                    
+                    print(f"✓ {door_id}. {door_name} - {price:,} ₽ ({cat_name})\n")
+                    if img_url and img_url.startswith('http'):
+                        filename = f'door_{door_id}.jpg'
+                        kept_files.append(filename)
+                        if pages.replaying:
+                            # Без сети: используем ранее скачанный файл, если есть
+                            if (IMAGES_DIR / filename).exists():
+                                door['image'] = f'/catalog-images/{filename}'
+                            finish(door)
+                        else:
+                            queue.add(img_url, filename, lambda result, door=door: finish(door, result))
                     else:
-                        print(f"   ✗ Ошибка загрузки: {img_response.status_code}")
-                        image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
+                        print(f"   ⚠ Нет URL фото для {door_name}")
+                        finish(door)
+                    
                 except Exception as e:
-                    print(f"   ✗ Ошибка: {str(e)}")
-                    image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
-            else:
-                print(f"   ⚠ Нет URL фото для {door_name}")
-                image_path = f'/works/IMG_{5855 + (door_id % 7)}.jpeg'
-            
-            popular = category == 'veneer'
-            new = category == 'invisible'
-            
-            door = {
-                'id': door_id,
-                'name': door_name,
-                'price': price,
-                'category': category,
-                'image': image_path,
-                'features': [
-                    'Скрытые петли',
-                    'Магнитный замок',
-                    'Доводчик',
-                    'Звукоизоляция до 42 дБ'
-                ],
-                'acoustic': '42 дБ',
-                'size': '900×2100 мм',
-                'material': 'Шпон премиум' if category == 'veneer' else 'Сталь + утеплитель',
-                'popular': popular,
-                'new': new,
-                'source_url': href,
-                'image_url': img_url or 'N/A'
-            }
-            
-            collections.append(door)
-            print(f"✓ {door_id}. {door_name} - {price:,} ₽ ({cat_name})\n")
-            
-        except Exception as e:
-            print(f"✗ Ошибка обработки элемента: {str(e)}")
-            continue
+                    print(f"✗ Ошибка обработки элемента: {str(e)}")
+                    continue
+    finally:
+        sink.close()
+        image_sync.save()
     
-    print(f"\n✅ Найдено коллекций: {len(collections)}\n")
+    if sink.count and not pages.replaying:
+        # catalogData.js перезаписывается, старые фото из манифеста больше не нужны
+        image_sync.gc(kept_files)
+    image_sync.print_report()
     
-    if collections:
-        # Генерируем catalogData.js
-        output = "// РЕАЛЬНЫЕ данные с labirintdoors.ru + ФОТО\n"
-        output += "// Парсинг: " + time.strftime('%Y-%m-%d %H:%M:%S') + "\n\n"
-        output += "export const catalogData = {\n"
-        output += "  categories: [\n"
-        output += "    { id: 'all', name: 'Все двери' },\n"
-        output += "    { id: 'invisible', name: 'Новинки 2025' },\n"
-        output += "    { id: 'veneer', name: 'Хиты продаж' },\n"
-        output += "    { id: 'glass', name: 'Белые двери' },\n"
-        output += "    { id: 'entrance', name: 'Основной каталог' },\n"
-        output += "    { id: 'thermo', name: 'С терморазрывом' },\n"
-        output += "  ],\n\n"
-        output += "  doors: [\n"
-        
-        for i, door in enumerate(collections):
-            output += "    {\n"
-            output += f"      id: {door['id']},\n"
-            output += f"      name: '{door['name']}',\n"
-            output += f"      category: '{door['category']}',\n"
-            output += f"      price: {door['price']},\n"
-            output += f"      image: '{door['image']}',\n"
-            output += f"      features: {json.dumps(door['features'], ensure_ascii=False)},\n"
-            output += f"      acoustic: '{door['acoustic']}',\n"
-            output += f"      size: '{door['size']}',\n"
-            output += f"      material: '{door['material']}',\n"
-            output += f"      popular: {str(door['popular']).lower()},\n"
-            output += f"      new: {str(door['new']).lower()}\n"
-            output += "    }" + ("," if i < len(collections) - 1 else "") + "\n"
-        
-        output += "  ]\n"
-        output += "};\n"
-        
-        # Сохраняем
-        output_file = OUTPUT_DIR / 'catalogData.js'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(output)
+    print(f"\n✅ Найдено коллекций: {sink.count}\n")
+    
+    if sink.count:
+        stream = lambda: iter_jsonl(sink.path)
         
-        print(f"💾 Сохранено: {output_file}")
-        print(f"📦 Коллекций: {len(collections)}")
-        print(f"📸 Фото скачано: {len([d for d in collections if '/catalog-images/' in d['image']])}")
+        # catalogData.js с WebP/AVIF в srcset; --split - по модулю на категорию
+        write_catalog(with_srcsets(stream), OUTPUT_DIR / 'catalogData.js', split=args.split,
+                      minify=args.minify, header="РЕАЛЬНЫЕ данные с labirintdoors.ru + ФОТО")
+        print(f"📦 Коллекций: {sink.count}")
+        # Те же коллекции - в общий каталог (история цен)
+        with CatalogStore() as store:
+            store.upsert(with_srcsets(stream, build=False), source='parse_with_images',
+                         seen_at=pages.seen_at)
+            store.print_report()
+        print(f"📸 Фото скачано: {photos[0]}")
         
         # Статистика
-        by_category = {}
-        for door in collections:
-            cat = door['category']
-            by_category[cat] = by_category.get(cat, 0) + 1
-        
         print("\n📊 По категориям:")
         for cat, count in sorted(by_category.items(), key=lambda x: x[1], reverse=True):
             print(f"   {cat}: {count}")
@@ -221,5 +205,6 @@ try:
         print("❌ Не удалось найти данные")
 
 finally:
-    driver.quit()
-    print("\n🔚 Браузер закрыт")
+    if driver:
+        driver.quit()
+        print("\n🔚 Браузер закрыт")
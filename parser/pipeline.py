@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Конвейер из этапов, соединенных ограниченными очередями.
+
+Каждый этап - функция над одним элементом и свои потоки. Элементы идут
+дальше, как только готовы: разбор страницы N идет, пока грузится N+1,
+а фото качаются параллельно с тем и другим. Очередь между этапами
+ограничена (queue_size), поэтому быстрый этап упирается в медленный
+(backpressure) и память не растет. Время всего конвейера стремится к
+времени самого медленного этапа, а не к сумме.
+
+    pipeline = Pipeline([
+        Stage('parse', parse_page, fanout=True),      # страница -> несколько дверей
+        Stage('details', load_details, workers=8),
+        Stage('export', sink.write),
+    ])
+    pipeline.run(pages)        # итерируемое или функция source(emit)
+    pipeline.print_report()
+
+В отчете для каждого этапа: сколько элементов прошло, сколько времени
+этап работал (busy), ждал входа (idle) и ждал места в следующей очереди
+(blocked - признак того, что тормозит следующий этап).
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+
+_DONE = object()
+
+
+class Stage:
+    """
+    func(item) - результат для следующего этапа; None - элемент дальше не идет.
+    fanout=True - func возвращает итерируемое: каждый элемент идет дальше отдельно.
+    workers - число потоков этапа.
+    """
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, fanout: bool = False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.fanout = fanout
+        # busy/idle/blocked - секунды, суммарно по всем потокам этапа
+        self.stats = {'items': 0, 'out': 0, 'errors': 0, 'busy': 0.0, 'idle': 0.0, 'blocked': 0.0}
+        self._lock = threading.Lock()
+
+    def _add(self, **values):
+        with self._lock:
+            for key, value in values.items():
+                self.stats[key] += value
+
+    def per_worker(self, key: str) -> float:
+        return self.stats[key] / self.workers
+
+
+class Pipeline:
+    """stages - этапы по порядку; queue_size - емкость очереди перед каждым этапом"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 64):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.source = Stage('source', None)
+        self.wall = 0.0
+
+    def _put(self, stage: Stage, items: Optional[queue.Queue], item):
+        if items is None:
+            return
+        start = time.perf_counter()
+        items.put(item)
+        stage._add(blocked=time.perf_counter() - start, out=1)
+
+    def _worker(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue],
+                remaining: List[int], next_workers: int):
+        while True:
+            start = time.perf_counter()
+            item = inbox.get()
+            stage._add(idle=time.perf_counter() - start)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+                results = list(result) if stage.fanout and result is not None else [result]
+            except Exception as e:
+                print(f"⚠️  Этап {stage.name}: {str(e)[:100]}")
+                stage._add(items=1, errors=1, busy=time.perf_counter() - start)
+                continue
+            stage._add(items=1, busy=time.perf_counter() - start)
+            for result in results:
+                if result is not None:
+                    self._put(stage, outbox, result)
+
+        # Последний поток этапа закрывает очередь следующего
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(next_workers):
+                outbox.put(_DONE)
+
+    def run(self, source: Union[Iterable, Callable[[Callable], None]]) -> int:
+        """
+        Прогон до конца. source - итерируемое входных элементов или функция
+        source(emit), которая сама вызывает emit(item) (например, обход сайта).
+        Возвращает число элементов, дошедших до последнего этапа.
+        """
+        start_wall = time.perf_counter()
+        inboxes = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            outbox = inboxes[i + 1] if i + 1 < len(self.stages) else None
+            next_workers = self.stages[i + 1].workers if outbox is not None else 0
+            remaining = [stage.workers]
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f'{stage.name}-{n}', daemon=True,
+                    args=(stage, inboxes[i], outbox, remaining, next_workers))
+                thread.start()
+                threads.append(thread)
+
+        first = inboxes[0] if self.stages else None
+
+        def emit(item):
+            self._put(self.source, first, item)
+
+        start = time.perf_counter()
+        try:
+            if callable(source):
+                source(emit)
+            else:
+                for item in source:
+                    emit(item)
+        finally:
+            self.source.stats['busy'] = time.perf_counter() - start - self.source.stats['blocked']
+            if first is not None:
+                for _ in range(self.stages[0].workers):
+                    first.put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.wall = time.perf_counter() - start_wall
+        if not self.stages:
+            return 0
+        return self.stages[-1].stats['items'] - self.stages[-1].stats['errors']
+
+    def timings(self) -> Dict[str, float]:
+        """Время работы каждого этапа в пересчете на поток (сек)"""
+        return {stage.name: stage.per_worker('busy') for stage in [self.source] + self.stages}
+
+    def print_report(self):
+        print(f"\n🏭 Конвейер: {self.wall:.2f} s всего")
+        for stage in [self.source] + self.stages:
+            s = stage.stats
+            print(f"   {stage.name:10s} x{stage.workers}: {s['items'] or s['out']:>5} шт., "
+                  f"работа {stage.per_worker('busy'):6.2f} s, "
+                  f"ожидание входа {stage.per_worker('idle'):6.2f} s, "
+                  f"упор в следующий этап {stage.per_worker('blocked'):6.2f} s"
+                  + (f", ошибок {s['errors']}" if s['errors'] else ""))
+        timings = self.timings()
+        slowest = max(timings, key=timings.get)
+        print(f"   самый медленный этап: {slowest} ({timings[slowest]:.2f} s), "
+              f"сумма этапов: {sum(timings.values()):.2f} s")
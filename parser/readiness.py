@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Ожидание готовности страницы в Selenium вместо фиксированных time.sleep.
+
+Страница считается готовой, когда одновременно:
+- document.readyState == 'complete'
+- DOM не менялся quiet_ms (MutationObserver, внедряется через execute_script):
+  учитываются добавление/удаление узлов и смена src/data-src/srcset у
+  картинок, но не прочие атрибуты и текст - карусели, таймеры и
+  CSS-анимации трогают их постоянно, и страница никогда бы не "затихла"
+- число загруженных ресурсов (performance API) не росло quiet_ms - сеть затихла
+- число карточек по селектору не менялось quiet_ms
+
+Все сигналы снимаются одним execute_script за опрос. Если за timeout
+страница так и не затихла, возвращается последнее состояние с
+timed_out=True - парсер работает с тем, что успело загрузиться.
+"""
+
+import time
+from typing import Dict, Optional
+
+
+OBSERVER_JS = """
+if (!window.__readiness) {
+  window.__readiness = {last: performance.now()};
+  new MutationObserver(function () { window.__readiness.last = performance.now(); })
+    .observe(document.documentElement,
+             {childList: true, subtree: true, attributeFilter: ['src', 'data-src', 'srcset']});
+}
+"""
+
+STATE_JS = """
+var r = window.__readiness || {last: performance.now()};
+return {
+  ready: document.readyState,
+  quiet_ms: performance.now() - r.last,
+  resources: performance.getEntriesByType('resource').length,
+  cards: arguments[0] ? document.querySelectorAll(arguments[0]).length : 0,
+  height: document.body ? document.body.scrollHeight : 0
+};
+"""
+
+SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight);"
+
+
+def page_state(driver, card_selector: Optional[str] = None) -> Dict:
+    driver.execute_script(OBSERVER_JS)
+    return driver.execute_script(STATE_JS, card_selector)
+
+
+def wait_until_ready(driver, card_selector: Optional[str] = None, quiet_ms: int = 500,
+                     timeout: float = 15, poll: float = 0.1) -> Dict:
+    """
+    Ждет готовности текущей страницы (см. описание модуля).
+    Возвращает последнее состояние: ready, cards, height, waited, timed_out.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    quiet = quiet_ms / 1000
+    last_resources = last_cards = None
+    stable_since = start
+
+    while True:
+        state = page_state(driver, card_selector)
+        now = time.monotonic()
+        if (state['resources'], state['cards']) != (last_resources, last_cards):
+            last_resources, last_cards = state['resources'], state['cards']
+            stable_since = now
+
+        ready = (state['ready'] == 'complete'
+                 and state['quiet_ms'] >= quiet_ms
+                 and now - stable_since >= quiet)
+        if ready or now >= deadline:
+            state['waited'] = now - start
+            state['timed_out'] = not ready
+            return state
+        time.sleep(poll)
+
+
+def scroll_until_stable(driver, card_selector: Optional[str] = None, max_rounds: int = 30,
+                        quiet_ms: int = 500, timeout: float = 10, max_total: float = 60) -> Dict:
+    """
+    Прокрутка вниз, пока подгружаются новые карточки (lazy load).
+    Останавливается, когда после прокрутки не выросли ни число карточек,
+    ни высота страницы, или когда исчерпан общий бюджет max_total секунд
+    (timeout - на одно ожидание). Возвращает состояние с числом раундов.
+    """
+    deadline = time.monotonic() + max_total
+    state = wait_until_ready(driver, card_selector, quiet_ms=quiet_ms, timeout=min(timeout, max_total))
+    rounds = 0
+    for rounds in range(1, max_rounds + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        before = (state['cards'], state['height'])
+        driver.execute_script(SCROLL_JS)
+        state = wait_until_ready(driver, card_selector, quiet_ms=quiet_ms, timeout=min(timeout, remaining))
+        if (state['cards'], state['height']) == before:
+            break
+    state['rounds'] = rounds
+    return state
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Хранилище сжатых снимков HTML и офлайн-воспроизведение (--replay)
+
+Структура каталога:
+    objects/ab/<sha256>.zst|.gz  - тела страниц, адресуются по содержимому
+    runs/<snapshot_id>.jsonl     - индекс снимка: url, время, sha256
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd необязателен, без него пишем gzip
+    zstandard = None
+
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / 'snapshots'
+
+
+class SnapshotStore:
+    """Content-addressed хранилище страниц со снимками по времени запуска"""
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR, codec: Optional[str] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.runs_dir = self.root / 'runs'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        if codec is None:
+            codec = 'zstd' if zstandard else 'gzip'
+        if codec == 'zstd' and zstandard is None:
+            raise ValueError("Для zstd установите пакет zstandard")
+        self.codec = codec
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        ext = 'zst' if codec == 'zstd' else 'gz'
+        return self.objects_dir / digest[:2] / f"{digest}.{ext}"
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=10).compress(body)
+        return gzip.compress(body, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Снимок сжат zstd, установите пакет zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def new_snapshot(self) -> str:
+        """Идентификатор нового снимка (время запуска); файл индекса занимает имя"""
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = 1
+        while (self.runs_dir / f"{snapshot_id}.jsonl").exists():
+            suffix += 1
+            snapshot_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        (self.runs_dir / f"{snapshot_id}.jsonl").touch()
+        return snapshot_id
+
+    def put(self, snapshot_id: str, url: str, body: bytes) -> str:
+        """Сохранение страницы в снимок, возвращает sha256 содержимого"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest, self.codec)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._compress(body))
+            os.replace(tmp, path)
+
+        entry = {
+            'url': url,
+            'ts': datetime.now().isoformat(timespec='seconds'),
+            'sha256': digest,
+            'codec': self.codec,
+            'size': len(body),
+        }
+        with self._lock:
+            with open(self.runs_dir / f"{snapshot_id}.jsonl", 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return digest
+
+    def list_snapshots(self, non_empty: bool = False) -> List[str]:
+        """Снимки по времени; non_empty - только те, где есть хотя бы одна страница"""
+        return sorted(p.stem for p in self.runs_dir.glob('*.jsonl')
+                      if not non_empty or p.stat().st_size > 0)
+
+    def load(self, snapshot_id: str = 'latest') -> 'Snapshot':
+        """Открытие снимка для воспроизведения ('latest' - последний непустой)"""
+        if snapshot_id == 'latest':
+            snapshots = self.list_snapshots(non_empty=True)
+            if not snapshots:
+                raise FileNotFoundError(f"Нет снимков в {self.runs_dir}")
+            snapshot_id = snapshots[-1]
+        index_path = self.runs_dir / f"{snapshot_id}.jsonl"
+        if not index_path.exists():
+            raise FileNotFoundError(f"Снимок не найден: {snapshot_id}")
+
+        entries = {}
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry['url']] = entry  # последняя запись побеждает
+        return Snapshot(self, snapshot_id, entries)
+
+    def read_object(self, digest: str, codec: str) -> bytes:
+        with open(self._object_path(digest, codec), 'rb') as f:
+            return self._decompress(f.read(), codec)
+
+
+class Snapshot:
+    """Снимок для офлайн-воспроизведения: url -> тело страницы"""
+
+    def __init__(self, store: SnapshotStore, snapshot_id: str, entries: Dict[str, Dict]):
+        self.store = store
+        self.snapshot_id = snapshot_id
+        self.entries = entries
+
+    def urls(self) -> List[str]:
+        return list(self.entries)
+
+    @property
+    def taken_at(self) -> float:
+        """Время снимка (unix): из id вида 20251210_165906, иначе первой записи"""
+        try:
+            return datetime.strptime(self.snapshot_id[:15], '%Y%m%d_%H%M%S').timestamp()
+        except ValueError:
+            first = min(entry['ts'] for entry in self.entries.values())
+            return datetime.fromisoformat(first).timestamp()
+
+    def get(self, url: str) -> bytes:
+        """Тело страницы; KeyError, если url не попал в снимок"""
+        entry = self.entries[url]
+        return self.store.read_object(entry['sha256'], entry['codec'])
+
+
+class PageSource:
+    """
+    Источник страниц: либо сеть (через HTTP-кэш, если задан) с записью
+    в новый снимок, либо воспроизведение снимка без сетевых запросов.
+    """
+
+    def __init__(self, replay: Optional[str] = None, store: Optional[SnapshotStore] = None,
+                 cache=None, session=None, record: bool = True):
+        self.store = store or SnapshotStore()
+        self.replay = self.store.load(replay) if replay else None
+        # Снимок заводится при первой записанной странице: запуск без загрузок
+        # не оставляет пустой runs/<id>.jsonl
+        self.recording = record and not self.replay
+        self.snapshot_id = None
+        self._lock = threading.Lock()
+        self.cache = cache
+        self.session = session
+
+    @property
+    def replaying(self) -> bool:
+        return self.replay is not None
+
+    @property
+    def seen_at(self) -> Optional[float]:
+        """
+        Время, которым штампуются данные запуска (CatalogStore.upsert):
+        при воспроизведении - время снимка, иначе None (текущее время)
+        """
+        return self.replay.taken_at if self.replay else None
+
+    def fetch(self, url: str, headers: Optional[Dict] = None, timeout: int = 30) -> bytes:
+        if self.replay:
+            return self.replay.get(url)
+
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+        if self.cache is not None:
+            body = self.cache.get(self.session, url, headers, timeout=timeout)
+        else:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            response.raise_for_status()
+            body = response.content
+        self.record(url, body)
+        return body
+
+    def record(self, url: str, body):
+        """Запись страницы, полученной в обход fetch (например, page_source)"""
+        if not self.recording:
+            return
+        if self.snapshot_id is None:
+            with self._lock:
+                if self.snapshot_id is None:
+                    self.snapshot_id = self.store.new_snapshot()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.store.put(self.snapshot_id, url, body)
+
+
+def add_replay_argument(argparser):
+    """Общий флаг --replay для скриптов"""
+    argparser.add_argument(
+        '--replay', metavar='SNAPSHOT',
+        help="Разбор из сохраненного снимка без сети (id из snapshots/runs или 'latest')"
+    )
+    return argparser
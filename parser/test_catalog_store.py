@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка CatalogStore: импорт старых выгрузок после живого обхода.
+
+    python test_catalog_store.py      # или pytest test_catalog_store.py
+"""
+
+import tempfile
+from pathlib import Path
+
+from catalog_store import CatalogStore
+
+
+URL = 'https://labirintdoors.ru/katalog/test/door-1'
+
+
+def test_out_of_order_import():
+    with tempfile.TemporaryDirectory() as tmp:
+        with CatalogStore(Path(tmp) / 'catalog.sqlite') as store:
+            # Живой обход (t=2000), затем импорт старой выгрузки (t=1000)
+            store.upsert([{'name': 'Дверь 1', 'price': 100, 'url': URL}], source='live', seen_at=2000)
+            store.upsert([{'name': 'Дверь 1 (старое)', 'price': 90, 'url': URL, 'image': 'old.jpg'}],
+                         source='labirint_20251210', seen_at=1000)
+
+            door, = store.rows()
+            assert door['price'] == 100, door
+            assert door['name'] == 'Дверь 1', door
+            assert door['image'] == 'old.jpg', door      # пустое поле заполняется и старой записью
+
+            history = store.price_history(door['key'])
+            assert [(h['price'], h['seen_at']) for h in history] == [(90, 1000), (100, 2000)], history
+
+            # Выгрузка между ними с той же ценой, что и в начале - не смена цены
+            store.upsert([{'name': 'Дверь 1', 'price': 90, 'url': URL}], source='mid', seen_at=1500)
+            history = store.price_history(door['key'])
+            assert [(h['price'], h['seen_at']) for h in history] == [(90, 1000), (100, 2000)], history
+
+            # Более ранняя выгрузка с новой ценой сдвигает смену цены на свое время
+            store.upsert([{'name': 'Дверь 1', 'price': 100, 'url': URL}], source='mid', seen_at=1800)
+            history = store.price_history(door['key'])
+            assert [(h['price'], h['seen_at']) for h in history] == [(90, 1000), (100, 1800)], history
+
+            # Новая цена позже всех - текущая
+            store.upsert([{'name': 'Дверь 1', 'price': 80, 'url': URL}], source='live', seen_at=3000)
+            assert store.rows()[0]['price'] == 80
+            assert store.last_upsert['repriced'] == 1
+
+
+if __name__ == '__main__':
+    test_out_of_order_import()
+    print("✅ test_out_of_order_import")
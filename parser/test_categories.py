@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка CategoryMatcher: одно регулярное выражение дает тот же результат,
+что и перебор правил по порядку.
+
+    python test_categories.py      # или pytest test_categories.py
+"""
+
+from categories import CATEGORY_RULES, DEFAULT_CATEGORY, classify
+
+
+def classify_by_rules(text):
+    """Эталон: первое правило, ключевое слово которого есть в тексте"""
+    lowered = (text or '').lower()
+    for category, keywords in CATEGORY_RULES:
+        if any(keyword.lower() in lowered for keyword in keywords):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def test_overlapping_keywords():
+    # ROYAL (veneer) перекрывает LEO (invisible), WHITE (glass) - EVO (invisible)
+    assert classify('ROYALEO').id == 'invisible'
+    assert classify('WHITEVO').id == 'invisible'
+    assert classify('TUNDRAWHITE').id == 'thermo'
+
+
+def test_same_as_rule_order():
+    keywords = [keyword for _, rule in CATEGORY_RULES for keyword in rule]
+    texts = ['', 'Входная дверь', 'PIANO белая', 'Термо NORD', 'royal sky', 'Versal', 'SMARTROYAL']
+    # Все пары ключевых слов встык и с пробелом
+    texts += [a + sep + b for a in keywords for b in keywords for sep in ('', ' ')]
+    for text in texts:
+        assert classify(text) == classify_by_rules(text), text
+
+
+if __name__ == '__main__':
+    test_overlapping_keywords()
+    print("✅ test_overlapping_keywords")
+    test_same_as_rule_order()
+    print("✅ test_same_as_rule_order")
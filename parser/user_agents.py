@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Пул User-Agent без сети: замена fake_useragent.
+
+fake_useragent при создании UserAgent() читает (а в старых версиях и
+скачивает) свой набор данных - это секунды на старте парсера. Здесь
+набор вшит в модуль. Свой список можно положить в parser/user_agents.txt
+(одна строка - один User-Agent, # - комментарий): он читается один раз
+при первом обращении и дальше используется вместо встроенного.
+
+    agents = UserAgentPool()
+    session.headers['User-Agent'] = agents.random   # случайный
+    agents.next()                                   # по кругу
+"""
+
+import itertools
+import random
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+
+DEFAULT_USER_AGENTS_FILE = Path(__file__).resolve().parent / 'user_agents.txt'
+
+# Актуальные десктопные браузеры; сайт отдает им одинаковую разметку
+BUNDLED_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.0.0 YaBrowser/24.1.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+    'Version/17.2.1 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.2; rv:122.0) Gecko/20100101 Firefox/122.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:122.0) Gecko/20100101 Firefox/122.0',
+)
+
+
+def load_user_agents(path=DEFAULT_USER_AGENTS_FILE) -> List[str]:
+    """Список из файла; если файла нет или он пуст - встроенный"""
+    path = Path(path)
+    if path.exists():
+        lines = path.read_text(encoding='utf-8').splitlines()
+        agents = [line.strip() for line in lines if line.strip() and not line.startswith('#')]
+        if agents:
+            return agents
+    return list(BUNDLED_USER_AGENTS)
+
+
+class UserAgentPool:
+    """
+    Ротация User-Agent (потокобезопасно).
+    agents - свой список; по умолчанию user_agents.txt или встроенный набор
+    """
+
+    def __init__(self, agents: Optional[Iterable[str]] = None, path=DEFAULT_USER_AGENTS_FILE):
+        self._agents = list(agents) if agents is not None else None
+        self.path = path
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    @property
+    def agents(self) -> List[str]:
+        if self._agents is None:
+            self._agents = load_user_agents(self.path)
+        return self._agents
+
+    @property
+    def random(self) -> str:
+        """Случайный User-Agent (как UserAgent().random в fake_useragent)"""
+        return random.choice(self.agents)
+
+    def next(self) -> str:
+        """Следующий User-Agent по кругу"""
+        with self._lock:
+            if self._cycle is None:
+                self._cycle = itertools.cycle(self.agents)
+            return next(self._cycle)
@@ -1,15 +1,44 @@
-import React, { useState, useMemo } from 'react';
-import { catalogData } from './catalogData';
+import React, { useState, useMemo, useEffect } from 'react';
+import { catalogData, loadCategory } from './catalogData';
+
+// Уменьшенные WebP/AVIF из парсера (srcSet), иначе исходное фото
+function DoorImage({ door, sizes, ...props }) {
+  if (!door.srcSet) {
+    return <img src={door.image} alt={door.name} {...props} />;
+  }
+  return (
+    <picture>
+      {door.srcSetAvif && <source type="image/avif" srcSet={door.srcSetAvif} sizes={sizes} />}
+      <source type="image/webp" srcSet={door.srcSet} sizes={sizes} />
+      <img src={door.image} alt={door.name} {...props} />
+    </picture>
+  );
+}
 
 export default function Catalog() {
   const [activeCategory, setActiveCategory] = useState('all');
   const [sortBy, setSortBy] = useState('popular');
   const [priceRange, setPriceRange] = useState([0, 300000]);
   const [previewDoor, setPreviewDoor] = useState(null);
+  const [doors, setDoors] = useState(catalogData.doors);
+  const [showAll, setShowAll] = useState(false);
+  const total = catalogData.total ?? catalogData.doors.length;
+
+  // Двери категории; при разбиении каталога (--split) модуль категории грузится по требованию,
+  // а "Все" сначала показывает первые двери из индекса - остальные по кнопке
+  useEffect(() => {
+    let cancelled = false;
+    loadCategory(activeCategory, { all: showAll }).then((loaded) => {
+      if (!cancelled) setDoors(loaded);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [activeCategory, showAll]);
 
   // Фильтрация и сортировка
   const filteredDoors = useMemo(() => {
-    let filtered = catalogData.doors;
+    let filtered = doors;
 
     // Фильтр по категории
     if (activeCategory !== 'all') {
@@ -42,7 +71,7 @@ export default function Catalog() {
     });
 
     return sorted;
-  }, [activeCategory, sortBy, priceRange]);
+  }, [doors, activeCategory, sortBy, priceRange]);
 
   const formatPrice = (price) => {
     return new Intl.NumberFormat('ru-RU').format(price);
@@ -99,9 +128,9 @@ export default function Catalog() {
 
               {/* Изображение */}
               <div className="catalog-image-container">
-                <img 
-                  src={door.image} 
-                  alt={door.name}
+                <DoorImage 
+                  door={door}
+                  sizes="(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 400px"
                   className="catalog-image"
                   loading="lazy"
                 />
@@ -159,6 +188,15 @@ export default function Catalog() {
           ))}
         </div>
 
+        {/* Стартовый экран "Все" при --split - только первые двери */}
+        {activeCategory === 'all' && !showAll && doors.length < total && (
+          <div className="catalog-empty">
+            <button className="primary-btn" onClick={() => setShowAll(true)}>
+              Показать все {total} дверей
+            </button>
+          </div>
+        )}
+
         {/* Если ничего не найдено */}
         {filteredDoors.length === 0 && (
           <div className="catalog-empty">
@@ -185,7 +223,7 @@ export default function Catalog() {
         <div className="modal-backdrop" onClick={() => setPreviewDoor(null)}></div>
         <div className="modal-content">
           <button className="modal-x" onClick={() => setPreviewDoor(null)}>×</button>
-          <img src={previewDoor.image} alt={previewDoor.name} />
+          <DoorImage door={previewDoor} sizes="(max-width: 1024px) 100vw, 1024px" />
           <div className="modal-body">
             <h3>{previewDoor.name}</h3>
             <p className="modal-price">{formatPrice(previewDoor.price)} ₽</p>